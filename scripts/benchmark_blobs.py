@@ -0,0 +1,111 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark writing a catalog with large attachments inline and with the attachments as blobs.
+
+It builds a catalog with resources attaching random content, and writes it with the attachments inline as base64
+text and with the attachments moved to blobs, as split does for every split file that holds them. It then writes the
+merged model back from its raw data with the blobs encoded in memory and with the blobs encoded in chunks. The peak
+memory is measured with tracemalloc.
+
+Usage: python scripts/benchmark_blobs.py [--resources N] [--size MIB]
+"""
+
+import argparse
+import base64
+import datetime
+import json
+import os
+import pathlib
+import tempfile
+import time
+import tracemalloc
+import uuid
+from typing import Callable
+
+from trestle.core import blobs
+from trestle.oscal import catalog
+from trestle.utils import fs
+
+
+def make_catalog(resources: int, size: int) -> catalog.Catalog:
+    """Return a catalog with resources attaching random content of the given size."""
+    metadata = catalog.Metadata(
+        title='Catalog with attachments',
+        last_modified=datetime.datetime.now(datetime.timezone.utc),
+        version='1.0',
+        oscal_version='1.0.0'
+    )
+    back_matter = catalog.BackMatter(
+        resources=[
+            catalog.Resource(
+                uuid=str(uuid.uuid4()),
+                attachments=[
+                    catalog.Base64(filename=f'file{i}.bin', value=base64.b64encode(os.urandom(size)).decode('ascii'))
+                ]
+            ) for i in range(resources)
+        ]
+    )
+    return catalog.Catalog(uuid=str(uuid.uuid4()), metadata=metadata, back_matter=back_matter)
+
+
+def measure(name: str, func: Callable[[], pathlib.Path]) -> None:
+    """Run the function once and print its time, peak memory and the size of the file it wrote."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    path = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{name:<20} {elapsed:8.2f} s {peak / 2**20:10.1f} MiB peak {path.stat().st_size / 2**20:10.1f} MiB written')
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resources', type=int, default=10, help='number of resources with an attachment')
+    parser.add_argument('--size', type=int, default=5, help='size of each attachment in MiB')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = pathlib.Path(tmp)
+        model = make_catalog(args.resources, args.size * 2**20)
+        store = blobs.BlobStore(directory / 'blobs')
+
+        def write(name: str) -> pathlib.Path:
+            model.oscal_write(directory / name)
+            return directory / name
+
+        measure('split inline', lambda: write('inline.json'))
+        blobs.externalize(model, store)
+        measure('split blobs', lambda: write('blobs.json'))
+
+        data = fs.load_file(directory / 'blobs.json')
+
+        def merge_inline() -> pathlib.Path:
+            blobs.internalize(data, store)
+            (directory / 'merged-inline.json').write_text(json.dumps(data, indent=2))
+            return directory / 'merged-inline.json'
+
+        def merge_chunks() -> pathlib.Path:
+            blobs.write_file(data, directory / 'merged.json', store)
+            return directory / 'merged.json'
+
+        measure('merge chunks', merge_chunks)
+        measure('merge inline', merge_inline)
+
+
+if __name__ == '__main__':
+    main()
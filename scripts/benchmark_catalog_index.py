@@ -0,0 +1,99 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark the catalog index against walking the control tree for lookups by control id.
+
+For a sample of control ids it finds the control, its ancestors and its descendants, once by walking the groups and
+controls of the catalog for each id and once with a catalog index, including the time to build the index. The default
+catalog is the NIST SP 800-53 catalog of the test data.
+
+Usage: python scripts/benchmark_catalog_index.py [--catalog FILE] [--lookups N] [--repeat N]
+"""
+
+import argparse
+import pathlib
+import random
+import timeit
+from typing import List, Optional, Tuple
+
+from trestle.core.catalog_index import CatalogIndex
+from trestle.oscal import catalog
+
+Lookup = Tuple[str, List[str], List[str]]
+
+
+def _descendant_ids(control: catalog.Control) -> List[str]:
+    ids = []
+    for child in control.controls or []:
+        ids.append(child.id)
+        ids.extend(_descendant_ids(child))
+    return ids
+
+
+def _walk_find(node, control_id: str, ancestors: List[str]) -> Optional[Lookup]:
+    for control in node.controls or []:
+        if control.id == control_id:
+            return control.id, list(reversed(ancestors)), _descendant_ids(control)
+        found = _walk_find(control, control_id, ancestors + [control.id])
+        if found is not None:
+            return found
+    for group in getattr(node, 'groups', None) or []:
+        found = _walk_find(group, control_id, ancestors)
+        if found is not None:
+            return found
+    return None
+
+
+def walk(cat: catalog.Catalog, ids: List[str]) -> List[Lookup]:
+    """Look up each control by walking the catalog."""
+    return [_walk_find(cat, control_id, []) for control_id in ids]
+
+
+def indexed(cat: catalog.Catalog, ids: List[str]) -> List[Lookup]:
+    """Index the catalog and look up each control in the index."""
+    index = CatalogIndex(cat)
+    return [
+        (
+            index.get_control(control_id).id, [control.id for control in index.iter_ancestors(control_id)], [
+                control.id for control in index.iter_descendants(control_id)
+            ]
+        ) for control_id in ids
+    ]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--catalog', default='tests/data/json/good_catalog.json', help='catalog file')
+    parser.add_argument('--lookups', type=int, default=200, help='number of control ids to look up')
+    parser.add_argument('--repeat', type=int, default=3, help='number of repetitions of each measurement')
+    args = parser.parse_args()
+
+    cat = catalog.Catalog.oscal_read(pathlib.Path(args.catalog))
+    all_ids = CatalogIndex(cat).get_ids()
+    ids = random.Random(0).choices(all_ids, k=args.lookups)
+    assert walk(cat, ids) == indexed(cat, ids)
+
+    measurements = [
+        (f'tree walk, {args.lookups} lookups', lambda: walk(cat, ids)),
+        (f'catalog index, {args.lookups} lookups', lambda: indexed(cat, ids)),
+    ]
+    for name, func in measurements:
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print(f'{name:<40} {best * 1000:10.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# -*- mode:python; coding:utf-8 -*-
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark the bitset control sets against naive list filtering for profile selections.
+
+It selects the controls of many synthetic profiles of a catalog, with id selectors, pattern selectors and excludes,
+and computes the union and the intersection of the selections. The default catalog is the NIST SP 800-53 catalog of
+the test data.
+
+Usage: python scripts/benchmark_control_set.py [--catalog FILE] [--profiles N] [--repeat N]
+"""
+
+import argparse
+import pathlib
+import random
+import re
+import timeit
+from typing import List
+
+from trestle.core.control_set import ControlSet, ControlSpace
+from trestle.oscal import catalog
+from trestle.oscal import profile
+
+PATTERNS = [r'ac-2(\.\d+)?', r'au-.*', r'sc-1\d']
+
+
+def make_profiles(ids: List[str], count: int) -> List[profile.Import]:
+    """Make profile imports selecting random halves of the controls, a pattern and excluding a few controls."""
+    rng = random.Random(0)
+    imports = []
+    for i in range(count):
+        include = profile.Include(
+            id_selectors=[profile.Call(control_id=control_id) for control_id in rng.sample(ids, len(ids) // 2)],
+            pattern_selectors=[profile.Match(pattern=PATTERNS[i % len(PATTERNS)])]
+        )
+        exclude = profile.Exclude(id_selectors=[profile.Call(control_id=c) for c in rng.sample(ids, 20)])
+        imports.append(profile.Import(href='catalog.json', include=include, exclude=exclude))
+    return imports
+
+
+def naive_select(ids: List[str], import_: profile.Import) -> List[str]:
+    """Select controls by filtering the list of control ids."""
+    include_ids = [call.control_id for call in import_.include.id_selectors]
+    patterns = [match.pattern for match in import_.include.pattern_selectors]
+    exclude_ids = [call.control_id for call in import_.exclude.id_selectors]
+    selected = [i for i in ids if i in include_ids or any(re.fullmatch(pattern, i) for pattern in patterns)]
+    return [i for i in selected if i not in exclude_ids]
+
+
+def naive(ids: List[str], imports: List[profile.Import]):
+    """Select the controls of all imports and combine the selections as lists."""
+    selections = [naive_select(ids, import_) for import_ in imports]
+    union = [i for i in ids if any(i in selection for selection in selections)]
+    intersection = [i for i in ids if all(i in selection for selection in selections)]
+    return union, intersection
+
+
+def bitset(space: ControlSpace, imports: List[profile.Import]):
+    """Select the controls of all imports and combine the selections as bitsets."""
+    selections = [space.select(import_.include, import_.exclude) for import_ in imports]
+    return ControlSet.union(space, selections).get_ids(), ControlSet.intersection(space, selections).get_ids()
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--catalog', default='tests/data/json/good_catalog.json', help='catalog file')
+    parser.add_argument('--profiles', type=int, default=10, help='number of profiles')
+    parser.add_argument('--repeat', type=int, default=3, help='number of repetitions of each measurement')
+    args = parser.parse_args()
+
+    space = ControlSpace.from_catalog(catalog.Catalog.oscal_read(pathlib.Path(args.catalog)))
+    ids = space.get_ids()
+    imports = make_profiles(ids, args.profiles)
+    assert naive(ids, imports) == bitset(space, imports)
+
+    measurements = [
+        (f'naive lists, {args.profiles} profiles', lambda: naive(ids, imports)),
+        (f'bitsets, {args.profiles} profiles', lambda: bitset(space, imports)),
+    ]
+    for name, func in measurements:
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print(f'{name:<40} {best * 1000:10.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
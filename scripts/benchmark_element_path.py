@@ -0,0 +1,114 @@
+# -*- mode:python; coding:utf-8 -*-
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Microbenchmark the element paths of trestle on path-heavy split plans.
+
+It times parsing many element arguments, using the parsed paths as dict keys, and building (but not executing) the
+plan for splitting a synthetic catalog with many groups and controls.
+
+Usage: python scripts/benchmark_element_path.py [--groups N] [--controls N] [--repeat N]
+"""
+
+import argparse
+import pathlib
+import tempfile
+import timeit
+
+import trestle.oscal.catalog as catalog
+from trestle.core import const
+from trestle.core.commands import cmd_utils
+from trestle.core.commands.split import SplitCmd
+from trestle.core.models.file_content_type import FileContentType
+
+ELEMENT_ARGS = [
+    'catalog.metadata',
+    'catalog.metadata.roles',
+    'catalog.metadata.parties.*',
+    'catalog.groups.*',
+    'catalog.groups.*.controls.*',
+    'catalog.groups.*.controls.*.controls.*',
+    'catalog.back-matter'
+]
+
+
+def make_catalog(groups: int, controls: int) -> catalog.Catalog:
+    """Make a catalog with the given number of groups and controls per group."""
+    metadata = catalog.Metadata(
+        **{
+            'title': 'Synthetic catalog',
+            'last-modified': '2020-01-01T00:00:00+00:00',
+            'version': '0.0.0',
+            'oscal-version': '1.0.0-Milestone3'
+        }
+    )
+    group_list = [
+        catalog.Group(
+            id=f'g{g}',
+            title=f'Group {g}',
+            controls=[catalog.Control(id=f'g{g}-{c}', title=f'Control {c}') for c in range(controls)]
+        ) for g in range(groups)
+    ]
+    return catalog.Catalog(uuid='ff47836c-877c-4007-bbf3-c9d9bd805000', metadata=metadata, groups=group_list)
+
+
+def parse_paths(repeat: int):
+    """Parse the element arguments the given number of times."""
+    for _ in range(repeat):
+        cmd_utils.parse_element_args(ELEMENT_ARGS, False)
+
+
+def use_paths_as_keys(repeat: int):
+    """Count the parsed paths in a dict, reading their cached parts."""
+    counts = {}
+    element_paths = cmd_utils.parse_element_args(ELEMENT_ARGS, False)
+    for _ in range(repeat):
+        for element_path in element_paths:
+            counts[element_path] = counts.get(element_path, 0) + 1
+            element_path.get_full_path_parts()
+            element_path.get_element_name()
+    return counts
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--groups', type=int, default=200, help='number of groups in the catalog')
+    parser.add_argument('--controls', type=int, default=20, help='number of controls per group')
+    parser.add_argument('--repeat', type=int, default=5, help='number of repetitions of each measurement')
+    args = parser.parse_args()
+
+    cat = make_catalog(args.groups, args.controls)
+    split_paths = cmd_utils.parse_element_args(['catalog.groups.*.controls.*'], False)
+
+    # the split plan must be created within a trestle project, but it is never executed
+    project_dir = tempfile.TemporaryDirectory()
+    base_dir = pathlib.Path(project_dir.name) / 'catalogs' / 'mycatalog'
+    (pathlib.Path(project_dir.name) / const.TRESTLE_CONFIG_DIR).mkdir()
+
+    measurements = [
+        ('parse 1000 element arguments', lambda: parse_paths(1000 // len(ELEMENT_ARGS))),
+        ('100000 dict lookups of paths', lambda: use_paths_as_keys(100000 // len(ELEMENT_ARGS))),
+        (
+            f'split plan of {args.groups * args.controls} controls',
+            lambda: SplitCmd.split_model(cat, split_paths, base_dir, FileContentType.JSON)
+        )
+    ]
+    for name, func in measurements:
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print(f'{name:<40} {best * 1000:10.2f} ms')
+    project_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
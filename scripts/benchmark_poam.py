@@ -0,0 +1,112 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark the time and peak memory of generating POA&Ms from many assessment results files.
+
+It writes synthetic assessment results files made of copies of the findings of the sample assessment results, then
+generates a POA&M from them with the streaming generator, and with a naive generator that builds the whole POA&M model
+in memory. The peak memory is measured with tracemalloc.
+
+Usage: python scripts/benchmark_poam.py [--files N] [--findings N]
+"""
+
+import argparse
+import copy
+import json
+import pathlib
+import tempfile
+import time
+import tracemalloc
+import uuid
+from typing import Any, Callable, Dict, List
+
+from trestle.core.poam_generator import generate_poam, to_poam_item
+from trestle.oscal import assessment_results
+from trestle.oscal import poam
+from trestle.utils import fs
+
+SAMPLE = pathlib.Path('tests/data/json/sample-assessment-results.json')
+
+
+def with_new_uuids(finding: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a finding with new uuids for it and for its observations and risks, which must be unique in a POA&M."""
+    finding = copy.deepcopy(finding)
+    finding['uuid'] = str(uuid.uuid4())
+    for nested in (finding.get('observations') or []) + (finding.get('risks') or []):
+        nested['uuid'] = str(uuid.uuid4())
+    return finding
+
+
+def write_results(directory: pathlib.Path, files: int, findings: int) -> List[pathlib.Path]:
+    """Write assessment results files with the given number of findings each."""
+    data = fs.load_file(str(SAMPLE))
+    results = data['assessment-results']['results_group']
+    templates = results['findings']
+    paths = []
+    for i in range(files):
+        results['findings'] = [with_new_uuids(templates[j % len(templates)]) for j in range(findings)]
+        paths.append(directory / f'results{i}.json')
+        paths[-1].write_text(json.dumps(data))
+    return paths
+
+
+def naive(paths: List[pathlib.Path], output: pathlib.Path) -> None:
+    """Load every results model and build the whole POA&M model before writing it."""
+    items = []
+    metadata = None
+    for path in paths:
+        model = assessment_results.AssessmentResults.oscal_read(path)
+        metadata = metadata or model.metadata
+        for finding in model.results_group.findings:
+            item = to_poam_item(json.loads(finding.json(by_alias=True, exclude_none=True)))
+            if item is not None:
+                items.append(poam.PoamItem.parse_obj(item))
+    poam_items = poam.PoamItems(
+        title='Plan of action and milestones',
+        description='Items',
+        start=model.results_group.start.__root__,
+        poam_item_group=items
+    )
+    metadata = poam.Metadata.parse_obj(json.loads(metadata.json(by_alias=True, exclude_none=True)))
+    poam.PlanOfActionAndMilestones(uuid=str(uuid.uuid4()), metadata=metadata, poam_items=poam_items).oscal_write(output)
+
+
+def measure(name: str, func: Callable[[], None]) -> None:
+    """Run the function once and print its time and peak memory."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{name:<20} {elapsed:8.2f} s {peak / 2**20:10.1f} MiB peak')
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=5, help='number of assessment results files')
+    parser.add_argument('--findings', type=int, default=1000, help='number of findings per file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = pathlib.Path(tmp)
+        paths = write_results(directory, args.files, args.findings)
+        measure('naive', lambda: naive(paths, directory / 'naive.json'))
+        measure('streaming', lambda: generate_poam(paths, directory / 'poam.json'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# -*- mode:python; coding:utf-8 -*-
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark the rendering of the prose of a catalog with its parameters.
+
+It compares the precompiled templates and parameter index of the catalog renderer with substituting the parameter
+references of each prose with a regular expression and a search of the parameters. The default catalog is the NIST
+SP 800-53 catalog of the test data.
+
+Usage: python scripts/benchmark_renderer.py [--catalog FILE] [--repeat N]
+"""
+
+import argparse
+import pathlib
+import timeit
+from typing import List
+
+from trestle.core.renderer import CatalogRenderer, PARAM_PATTERN
+from trestle.core.utils import iter_elements_of_model_type
+from trestle.oscal import catalog
+
+
+def naive_render(cat: catalog.Catalog) -> List[str]:
+    """Render all prose by substituting each reference with a search of the parameters of the catalog."""
+    params = list(iter_elements_of_model_type(cat, catalog.Param))
+
+    def param_text(param_id: str) -> str:
+        param = next((p for p in params if p.id == param_id), None)
+        if param is None:
+            return f'{{{{ {param_id} }}}}'
+        if param.value is not None:
+            return param.value.__root__
+        if param.select is not None:
+            choices = [
+                PARAM_PATTERN.sub(lambda m: param_text(m.group(1)), c.__root__).strip()
+                for c in param.select.alternatives or []
+            ]
+            how_many = param.select.how_many
+            return f'[{f"Selection ({how_many})" if how_many else "Selection"}: {"; ".join(choices)}]'
+        return f'[Assignment: {param.label.__root__ if param.label is not None else param.id}]'
+
+    return [
+        PARAM_PATTERN.sub(lambda m: param_text(m.group(1)), part.prose.__root__)
+        for part in iter_elements_of_model_type(cat, catalog.Part)
+        if part.prose is not None
+    ]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--catalog', default='tests/data/json/good_catalog.json', help='catalog file')
+    parser.add_argument('--repeat', type=int, default=3, help='number of repetitions of each measurement')
+    args = parser.parse_args()
+
+    cat = catalog.Catalog.oscal_read(pathlib.Path(args.catalog))
+    count = len(naive_render(cat))
+    assert sorted(naive_render(cat)) == sorted(prose.text for prose in CatalogRenderer(cat).iter_prose())
+
+    renderer = CatalogRenderer(cat)
+    measurements = [
+        ('naive substitution', lambda: naive_render(cat)),
+        ('renderer, first pass', lambda: list(CatalogRenderer(cat).iter_prose())),
+        ('renderer, compiled templates', lambda: list(renderer.iter_prose())),
+    ]
+    for name, func in measurements:
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print(f'{name:<32} {best * 1000:10.2f} ms {count / best:12.0f} prose/s')
+
+
+if __name__ == '__main__':
+    main()
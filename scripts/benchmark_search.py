@@ -0,0 +1,59 @@
+# -*- mode:python; coding:utf-8 -*-
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark the full-text search of the project index on a catalog.
+
+It times indexing the catalog in a temporary trestle project, an update where nothing changed, and a few searches.
+The default catalog is the NIST SP 800-53 catalog of the test data.
+
+Usage: python scripts/benchmark_search.py [--catalog FILE] [--repeat N]
+"""
+
+import argparse
+import pathlib
+import shutil
+import tempfile
+import timeit
+
+from trestle.core import const
+from trestle.core.index import ProjectIndex
+
+QUERIES = ['account management', 'audit record retention', 'cryptographic key establishment', 'ac 2', 'incident']
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--catalog', default='tests/data/json/good_catalog.json', help='catalog file to index')
+    parser.add_argument('--repeat', type=int, default=5, help='number of repetitions of each measurement')
+    args = parser.parse_args()
+
+    project_dir = tempfile.TemporaryDirectory()
+    project_root = pathlib.Path(project_dir.name)
+    (project_root / const.TRESTLE_CONFIG_DIR).mkdir()
+    model_dir = project_root / 'catalogs' / 'mycatalog'
+    model_dir.mkdir(parents=True)
+    shutil.copyfile(args.catalog, model_dir / f'catalog{pathlib.Path(args.catalog).suffix}')
+
+    with ProjectIndex(project_root) as index:
+        measurements = [('index the catalog', index.rebuild), ('update without changes', index.update)]
+        measurements += [(f'search "{query}"', lambda query=query: index.search(query)) for query in QUERIES]
+        for name, func in measurements:
+            best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+            print(f'{name:<40} {best * 1000:10.2f} ms')
+    project_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# -*- mode:python; coding:utf-8 -*-
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark the model walkers of trestle on synthetic deep and wide catalogs.
+
+The recursive walker that trestle used before the traversal core is timed as a reference. It fails with a
+RecursionError once the nesting of catalog parts exceeds the interpreter recursion limit.
+
+Usage: python scripts/benchmark_traversal.py [--depth N] [--width N] [--repeat N]
+"""
+
+import argparse
+import sys
+import timeit
+
+from pydantic import BaseModel
+
+import trestle.core.validater as validater
+import trestle.oscal.catalog as catalog
+from trestle.core import utils
+from trestle.core.models.elements import Element
+
+
+def recursive_get_elements_of_model_type(object_of_interest, type_of_interest):
+    """Return the objects of the given type using recursion, as a reference."""
+    loi = []
+    if type(object_of_interest) is type_of_interest:
+        loi.append(object_of_interest)
+    if type(object_of_interest) is list:
+        for item in object_of_interest:
+            loi.extend(recursive_get_elements_of_model_type(item, type_of_interest))
+    if isinstance(object_of_interest, BaseModel):
+        for field in object_of_interest.__fields_set__:
+            if field == '__root__':
+                continue
+            loi.extend(recursive_get_elements_of_model_type(getattr(object_of_interest, field), type_of_interest))
+    return loi
+
+
+def make_catalog(depth: int, width: int) -> catalog.Catalog:
+    """Make a catalog of width controls, each with parts nested depth levels deep."""
+    controls = []
+    for c in range(width):
+        part = catalog.Part(id=f'c{c}-part-{depth}', name='item', prose=catalog.Prose(__root__='Leaf prose.'))
+        for i in range(depth - 1, 0, -1):
+            part = catalog.Part(id=f'c{c}-part-{i}', name='item', parts=[part])
+        controls.append(catalog.Control(id=f'ac-{c}', title=f'Control {c}', parts=[part]))
+    metadata = catalog.Metadata(
+        **{
+            'title': 'Synthetic catalog',
+            'last-modified': '2020-01-01T00:00:00+00:00',
+            'version': '0.0.0',
+            'oscal-version': '1.0.0-Milestone3'
+        }
+    )
+    return catalog.Catalog(uuid='ff47836c-877c-4007-bbf3-c9d9bd805000', metadata=metadata, controls=controls)
+
+
+def run(name: str, func, repeat: int) -> None:
+    """Time a function and print the best time of the repetitions."""
+    try:
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f'  {name:<40} {best * 1000:10.2f} ms')
+    except RecursionError:
+        print(f'  {name:<40} {"RecursionError":>13}')
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--depth', type=int, default=sys.getrecursionlimit() * 2, help='nesting depth of the parts')
+    parser.add_argument('--width', type=int, default=20, help='number of controls in the catalog')
+    parser.add_argument('--repeat', type=int, default=5, help='number of repetitions of each measurement')
+    args = parser.parse_args()
+
+    for depth, width in [(10, args.width * 100), (args.depth, args.width)]:
+        cat = make_catalog(depth, width)
+        print(f'catalog with {width} controls of {depth} nested parts:')
+        run(
+            'recursive get_elements_of_model_type',
+            lambda cat=cat: recursive_get_elements_of_model_type(cat, catalog.Part),
+            args.repeat
+        )
+        run(
+            'get_elements_of_model_type',
+            lambda cat=cat: utils.get_elements_of_model_type(cat, catalog.Part),
+            args.repeat
+        )
+        run('find_values_by_name', lambda cat=cat: validater.find_values_by_name(cat, 'id'), args.repeat)
+        run(
+            'find_values_by_name_generic',
+            lambda cat=cat: validater.find_values_by_name_generic(cat, 'id'),
+            args.repeat
+        )
+        run('find_values_by_type', lambda cat=cat: validater.find_values_by_type(cat, catalog.Part), args.repeat)
+        run(
+            'type index build and query',
+            lambda cat=cat: Element(cat).get_type_index().get_instances(catalog.Part),
+            args.repeat
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -23,6 +23,7 @@ import pytest
 from tests import test_utils
 
 from trestle.oscal.catalog import Catalog
+from trestle.oscal.poam import PlanOfActionAndMilestones
 from trestle.oscal.target import TargetDefinition
 from trestle.utils import fs
 
@@ -104,3 +105,11 @@ def sample_catalog():
     file_path = pathlib.Path.joinpath(test_utils.JSON_TEST_DATA_PATH, 'good_catalog.json')
     catalog_obj = Catalog.oscal_read(file_path)
     return catalog_obj
+
+
+@pytest.fixture(scope='function')
+def sample_poam():
+    """Return a valid plan of action and milestones object."""
+    file_path = pathlib.Path.joinpath(test_utils.JSON_TEST_DATA_PATH, 'sample-poam.json')
+    poam_obj = PlanOfActionAndMilestones.oscal_read(file_path)
+    return poam_obj
@@ -307,3 +307,73 @@ def test_get_field_by_alias(sample_target_def: TargetDefinition):
     """Test get field for field alias."""
     assert sample_target_def.metadata.get_field_by_alias('last-modified').name == 'last_modified'
     assert sample_target_def.metadata.get_field_by_alias('last_modified') is None
+
+
+def test_fingerprint(sample_target_def):
+    """Test structural fingerprints of models and their cache invalidation."""
+    catalog = simple_catalog_with_tz()
+    copied = catalog.copy_to(oscatalog.Catalog)
+    assert catalog.fingerprint() == copied.fingerprint()
+
+    # None and unset optional fields do not change the fingerprint
+    copied.groups = None
+    assert catalog.fingerprint() == copied.fingerprint()
+
+    # assignment on a nested model invalidates the cached fingerprint of the root
+    original = sample_target_def.fingerprint()
+    sample_target_def.metadata.title = 'A new title'
+    changed = sample_target_def.fingerprint()
+    assert changed != original
+    sample_target_def.metadata.title = 'Demo target definition for both profiles'
+    assert sample_target_def.fingerprint() == original
+
+    # equivalent datetimes in different timezones are equal
+    diff_tz = TargetDefinition.oscal_read(pathlib.Path('tests/data/yaml/good_target_diff_tz.yaml'))
+    assert diff_tz.fingerprint() == original
+
+    # the same class in different oscal modules has the same structure
+    prop = ostarget.Prop(name='a', value='b')
+    assert prop.fingerprint() == oscatalog.Prop(name='a', value='b').fingerprint()
+    assert prop.fingerprint() != ostarget.Prop(name='a', value='c').fingerprint()
+
+
+def test_fingerprint_invalidation_per_tree(sample_target_def):
+    """Test that an assignment only invalidates the cached fingerprints of the changed model tree."""
+    catalog = simple_catalog_with_tz()
+    digest = catalog.fingerprint()
+    cached = catalog._fingerprint_cache
+    generation = ospydantic.track_model(sample_target_def)
+
+    catalog.metadata.title = 'A new title'
+    assert catalog._fingerprint_cache is None
+    assert catalog.fingerprint() != digest
+    assert ospydantic.get_model_generation(sample_target_def) == generation
+
+    sample_target_def.metadata.title = 'Another title'
+    assert catalog._fingerprint_cache is not None
+    assert catalog._fingerprint_cache != cached
+    assert ospydantic.get_model_generation(sample_target_def) != generation
+
+    # copies do not share the cached fingerprint and parents of the original
+    copied = catalog.metadata.copy()
+    assert copied._fingerprint_cache is None
+    assert copied._parents is None
+
+    # nor do the models below a deep copy, so changes to the copy do not reach the original
+    group = oscatalog.Group(title='Group', controls=[oscatalog.Control(id='ac-1', title='Control')])
+    catalog.groups = [group]
+    digest = catalog.fingerprint()
+    copied = catalog.copy(deep=True)
+    assert copied.groups[0]._parents is None
+    copied.groups[0].controls[0].title = 'Changed control'
+    assert copied.fingerprint() != digest
+    assert catalog.fingerprint() == digest
+    assert catalog._fingerprint_cache is not None
+    assert copied.groups[0].controls[0]._parents[0]() is copied.groups[0]
+
+    # in-place changes are recorded on the model holding them
+    catalog.metadata.properties = [oscatalog.Prop(name='a', value='b')]
+    digest = catalog.fingerprint()
+    catalog.metadata.properties.append(oscatalog.Prop(name='c', value='d'))
+    ospydantic.notify_model_changed(catalog.metadata)
+    assert catalog.fingerprint() != digest
@@ -0,0 +1,194 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+"""Tests for trestle blobs module."""
+import base64
+import datetime
+import io
+import json
+import os
+import pathlib
+import uuid
+from unittest.mock import patch
+
+import pytest
+
+from tests import test_utils
+
+from trestle.core import blobs
+from trestle.core import const
+from trestle.core.commands.split import SplitCmd
+from trestle.core.err import TrestleError
+from trestle.oscal import catalog
+from trestle.utils import fs
+
+import yaml
+
+CONTENT = bytes(range(256)) * 1000
+
+
+def _make_catalog(content: bytes = CONTENT) -> catalog.Catalog:
+    """Return a catalog with two resources attaching the same content."""
+    metadata = catalog.Metadata(
+        title='Catalog with attachments',
+        last_modified=datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc),
+        version='1.0',
+        oscal_version='1.0.0'
+    )
+    value = base64.b64encode(content).decode('ascii')
+    resources = [
+        catalog.Resource(
+            uuid=str(uuid.UUID(int=i, version=4)),
+            attachments=[catalog.Base64(filename=f'file{i}.bin', media_type='application/octet-stream', value=value)]
+        ) for i in range(2)
+    ]
+    return catalog.Catalog(
+        uuid=str(uuid.UUID(int=9, version=4)), metadata=metadata, back_matter=catalog.BackMatter(resources=resources)
+    )
+
+
+def _to_data(model: catalog.Catalog) -> dict:
+    return json.loads(model.json(by_alias=True, exclude_none=True))
+
+
+def test_blob_store(tmp_dir: pathlib.Path) -> None:
+    """Test storing and reading blobs."""
+    store = blobs.BlobStore(tmp_dir / const.BLOB_DIR_NAME)
+    ref = store.put(base64.b64encode(CONTENT).decode('ascii'))
+    assert blobs.is_blob_ref(ref)
+    assert ref in store
+    assert store.read(ref) == CONTENT
+    assert store.get_path(ref).parent.parent == store.get_dir()
+    assert ''.join(store.iter_base64(ref, 3 * 100)) == base64.b64encode(CONTENT).decode('ascii')
+
+    # the same content is stored once
+    assert store.put(base64.b64encode(CONTENT).decode('ascii')) == ref
+    assert len(list(store.get_dir().rglob('*'))) == 2
+
+    store.discard()
+    assert ref not in store
+
+    with pytest.raises(TrestleError):
+        store.get_path('blob:sha256:1234')
+    with pytest.raises(TrestleError):
+        store.read(ref)
+    with pytest.raises(TrestleError):
+        store.put('not base64!')
+    with pytest.raises(TrestleError):
+        list(store.iter_base64(ref, 100))
+
+
+def test_externalize(tmp_dir: pathlib.Path) -> None:
+    """Test moving attachments to blobs and reading them back."""
+    model = _make_catalog()
+    data = _to_data(model)
+    store = blobs.BlobStore(tmp_dir / const.BLOB_DIR_NAME)
+
+    assert blobs.read_attachment(next(blobs.iter_attachments(model))) == CONTENT
+    assert blobs.externalize(model, store) == 2
+    assert blobs.externalize(model, store) == 0
+
+    attachments = list(blobs.iter_attachments(model))
+    assert len(attachments) == 2
+    assert attachments[0].value == attachments[1].value
+    assert blobs.is_blob_ref(attachments[0].value)
+    assert blobs.read_attachment(attachments[0], store) == CONTENT
+    with pytest.raises(TrestleError):
+        blobs.read_attachment(attachments[0])
+
+    # the references are written with the model
+    externalized = _to_data(model)
+    assert len(json.dumps(externalized)) < len(CONTENT)
+
+    stream = io.StringIO()
+    blobs.write_json(externalized, stream, store)
+    assert json.loads(stream.getvalue()) == data
+    assert blobs.is_blob_ref(externalized['back-matter']['resources'][0]['attachments'][0]['value'])
+
+    assert blobs.internalize(externalized, store) == data
+
+
+def test_write_file(tmp_dir: pathlib.Path) -> None:
+    """Test writing models with blobs to JSON and YAML files."""
+    model = _make_catalog(b'attached content')
+    data = {'catalog': _to_data(model)}
+    store = blobs.BlobStore(tmp_dir / const.BLOB_DIR_NAME)
+    blobs.externalize(model, store)
+    externalized = {'catalog': _to_data(model)}
+
+    blobs.write_file(externalized, tmp_dir / 'catalog.json', store)
+    assert fs.load_file(tmp_dir / 'catalog.json') == data
+    assert catalog.Catalog.oscal_read(tmp_dir / 'catalog.json') is not None
+
+    blobs.write_file(externalized, tmp_dir / 'catalog.yaml', store)
+    with open(tmp_dir / 'catalog.yaml', 'r', encoding='utf8') as fp:
+        assert yaml.safe_load(fp) == data
+
+
+def test_split_externalizes_blobs(tmp_dir: pathlib.Path) -> None:
+    """Test that split writes the attachments as blobs of the model."""
+    model = _make_catalog()
+    data = {'catalog': _to_data(model)}
+    catalog_dir = (tmp_dir / 'catalogs' / 'mycatalog').absolute()
+    catalog_file = catalog_dir / 'catalog.json'
+    test_utils.ensure_trestle_config_dir(tmp_dir)
+    fs.ensure_directory(catalog_dir)
+    model.oscal_write(catalog_file)
+
+    blob_dir = catalog_dir / const.BLOB_DIR_NAME
+    cwd = os.getcwd()
+    os.chdir(catalog_dir)
+    try:
+        # the blobs written by a failed split are removed, whatever the failure
+        args = SplitCmd().parser.parse_args(['-f', 'catalog.json', '-e', 'catalog.back-matter', '--externalize-blobs'])
+        with patch.object(SplitCmd, 'split_model', side_effect=KeyboardInterrupt):
+            with pytest.raises(KeyboardInterrupt):
+                SplitCmd()._run(args)
+        assert not [path for path in blob_dir.rglob('*') if path.is_file()]
+
+        SplitCmd()._run(args)
+    finally:
+        os.chdir(cwd)
+
+    assert blobs.get_blob_dir(catalog_dir / 'catalog' / 'back-matter.json') == blob_dir
+    assert [path.read_bytes() for path in blob_dir.rglob('*') if path.is_file()] == [CONTENT]
+
+    back_matter = fs.load_file(catalog_dir / 'catalog' / 'back-matter.json')
+    assert os.path.getsize(catalog_dir / 'catalog' / 'back-matter.json') < len(CONTENT)
+
+    # merge the split files back with the blobs
+    merged = fs.load_file(catalog_dir / 'catalog.json')
+    merged['catalog']['back-matter'] = back_matter['back-matter']
+    blobs.write_file(merged, tmp_dir / 'merged.json', blobs.BlobStore(blob_dir))
+    assert fs.load_file(tmp_dir / 'merged.json') == data
+
+
+def test_split_keeps_attachments(tmp_dir: pathlib.Path) -> None:
+    """Test that split keeps the attachments in the split files by default."""
+    model = _make_catalog(b'attached content')
+    catalog_dir = (tmp_dir / 'catalogs' / 'mycatalog').absolute()
+    test_utils.ensure_trestle_config_dir(tmp_dir)
+    fs.ensure_directory(catalog_dir)
+    model.oscal_write(catalog_dir / 'catalog.json')
+
+    cwd = os.getcwd()
+    os.chdir(catalog_dir)
+    try:
+        SplitCmd()._run(SplitCmd().parser.parse_args(['-f', 'catalog.json', '-e', 'catalog.back-matter']))
+    finally:
+        os.chdir(cwd)
+
+    assert not (catalog_dir / const.BLOB_DIR_NAME).exists()
+    back_matter = fs.load_file(catalog_dir / 'catalog' / 'back-matter.json')
+    assert back_matter['back-matter'] == _to_data(model)['back-matter']
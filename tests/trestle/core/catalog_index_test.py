@@ -0,0 +1,119 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+"""Tests for trestle catalog_index module."""
+
+import gc
+import weakref
+
+import pytest
+
+from trestle.core.base_model import notify_model_changed
+from trestle.core.catalog_index import CatalogIndex, get_catalog_index, natural_key
+from trestle.core.err import TrestleError
+from trestle.core.models.elements import Element, ElementPath
+from trestle.oscal import catalog
+from trestle.oscal import target
+
+
+def _control(control_id: str, *children: catalog.Control) -> catalog.Control:
+    return catalog.Control(id=control_id, title=control_id, controls=list(children) or None)
+
+
+def test_catalog_index(sample_catalog):
+    """Test the positions, parents, depths and groups of the controls of a catalog."""
+    index = CatalogIndex(sample_catalog)
+    assert len(index) == 1177
+    assert 'ac-2.1' in index
+    assert 'xx-1' not in index
+    assert index.get_ids()[:4] == ['ac-1', 'ac-2', 'ac-2.1', 'ac-2.2']
+    assert index.get_position('ac-2.1') == 2
+    assert index.get_position('xx-1') is None
+
+    ac_2 = sample_catalog.groups[0].controls[1]
+    assert index.get_control('ac-2') is ac_2
+    assert index.get_control('ac-2.3') is ac_2.controls[2]
+    assert index.get_parent('ac-2.3') is ac_2
+    assert index.get_parent('ac-2') is None
+    assert index.get_depth('ac-2') == 0
+    assert index.get_depth('ac-2.3') == 1
+    assert index.get_group('ac-2.3') is sample_catalog.groups[0]
+    assert [control.id for control in index.iter_ancestors('ac-2.3')] == ['ac-2']
+    assert [control.id for control in index.iter_descendants('ac-2')] == [c.id for c in ac_2.controls]
+    assert list(index.iter_descendants('ac-2.3')) == []
+    assert list(index.iter_descendants('xx-1')) == []
+    assert index.get_parents()[:3] == [-1, -1, 1]
+    assert len(index.get_groups()) == len(sample_catalog.groups)
+
+
+def test_catalog_index_nesting():
+    """Test nested groups and controls, and controls directly in the catalog."""
+    cat = catalog.Catalog(
+        uuid='74c8ba1e-5cd4-4ad1-bbfd-d888e2f6c724',
+        metadata=catalog.Metadata(title='nested', last_modified='2021-01-01T00:00:00Z', version='1', oscal_version='1'),
+        controls=[_control('z-1')],
+        groups=[
+            catalog.Group(
+                id='g',
+                title='g',
+                groups=[catalog.Group(id='h', title='h', controls=[_control('a-1', _control('a-1.1', _control('x')))])],
+                controls=[_control('b-1')]
+            )
+        ]
+    )
+    index = CatalogIndex(cat)
+    assert index.get_ids() == ['z-1', 'b-1', 'a-1', 'a-1.1', 'x']
+    assert index.get_group('z-1') is None
+    assert index.get_group('x').id == 'h'
+    assert [group.id for group in index.iter_group_ancestors('x')] == ['h', 'g']
+    assert [control.id for control in index.iter_ancestors('x')] == ['a-1.1', 'a-1']
+    assert [control.id for control in index.iter_descendants('a-1')] == ['a-1.1', 'x']
+    assert index.get_depth('x') == 2
+
+    assert not index.is_stale()
+    notify_model_changed()
+    assert index.is_stale()
+
+
+def test_get_catalog_index(sample_catalog, sample_target_def: target.TargetDefinition):
+    """Test that the index of a catalog is cached alongside it and rebuilt once it changes."""
+    element = Element(sample_catalog)
+    catalog_index = get_catalog_index(element)
+    assert get_catalog_index(element) is catalog_index
+    assert get_catalog_index(sample_catalog) is catalog_index
+    assert catalog_index.get_control('ac-2') is sample_catalog.groups[0].controls[1]
+
+    element.set_at(ElementPath('catalog.groups.0.controls'), sample_catalog.groups[0].controls[:1])
+    assert get_catalog_index(element) is not catalog_index
+    assert 'ac-2' not in get_catalog_index(sample_catalog)
+
+    # the cache does not keep the catalog alive
+    other = sample_catalog.copy()
+    get_catalog_index(other)
+    other_ref = weakref.ref(other)
+    del other
+    gc.collect()
+    assert other_ref() is None
+
+    with pytest.raises(TrestleError):
+        get_catalog_index(Element(sample_target_def))
+
+
+def test_natural_order(sample_catalog):
+    """Test that natural order compares the numbers of control ids by value."""
+    assert sorted(['ac-2.10', 'ac-10', 'ac-2.9', 'ac-2', 'ac-1'],
+                  key=natural_key) == ['ac-1', 'ac-2', 'ac-2.9', 'ac-2.10', 'ac-10']
+    ids = CatalogIndex(sample_catalog).get_ids(natural_order=True)
+    assert ids.index('ac-2.9') + 1 == ids.index('ac-2.10')
+    assert len(ids) == 1177
@@ -26,6 +26,8 @@ from trestle.core import const
 from trestle.core.commands import cmd_utils
 from trestle.core.err import TrestleError
 from trestle.core.models.elements import ElementPath
+from trestle.core.models.file_content_type import FileContentType
+from trestle.oscal import target
 from trestle.utils import fs
 
 
@@ -167,3 +169,18 @@ def test_move_to_trash(tmp_dir):
     cmd_utils.move_to_trash(readme_file)
     assert readme_file.exists() is False
     assert cmd_utils.get_trash_file_path(readme_file).exists()
+
+
+def test_get_model(tmp_dir, sample_catalog):
+    """Test loading a model with its type detected from the file."""
+    model = cmd_utils.get_model(test_utils.YAML_TEST_DATA_PATH / 'good_target.yaml')
+    assert isinstance(model, target.TargetDefinition)
+
+    # the model type in a project follows the stripped model of a split
+    _, model_file = test_utils.prepare_trestle_project_dir(
+        tmp_dir, FileContentType.JSON, sample_catalog, test_utils.CATALOGS_DIR
+    )
+    assert cmd_utils.get_model(model_file) == sample_catalog
+
+    with pytest.raises(TrestleError):
+        cmd_utils.get_model(test_utils.JSON_TEST_DATA_PATH / 'good_simple.json')
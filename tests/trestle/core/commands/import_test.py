@@ -0,0 +1,126 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+"""Tests for trestle import command."""
+
+import json
+import shutil
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from tests import test_utils
+
+from trestle import cli
+from trestle.core.commands.import_ import import_file
+from trestle.core.err import TrestleError
+from trestle.oscal import catalog
+from trestle.oscal import target
+
+
+def run_import(testcmd: str) -> None:
+    """Run an import command expected to pass."""
+    with patch.object(sys, 'argv', testcmd.split()):
+        with pytest.raises(SystemExit) as pytest_wrapped_e:
+            cli.run()
+        assert pytest_wrapped_e.value.code is None
+
+
+def test_import_file(tmp_path, sample_target_def):
+    """Test importing a single file."""
+    project = tmp_path / 'project'
+    test_utils.ensure_trestle_config_dir(project)
+    source = tmp_path / 'mytarget.yml'
+    sample_target_def.oscal_write(tmp_path / 'mytarget.yaml')
+    shutil.move(str(tmp_path / 'mytarget.yaml'), str(source))
+
+    result = import_file(str(source), str(project))
+    assert result['imported']
+    assert result['model'] == 'target-definition'
+    destination = project / 'target-definitions' / 'mytarget' / 'target-definition.yaml'
+    assert result['destination'] == str(destination)
+    assert destination.read_bytes() == source.read_bytes()
+    assert target.TargetDefinition.oscal_read(destination) == sample_target_def
+
+    # existing models are not overwritten
+    result = import_file(str(source), str(project))
+    assert not result['imported']
+    assert 'already exists' in result['error']
+
+    result = import_file(str(source), str(project), '.hidden')
+    assert 'Invalid model name' in result['error']
+
+
+def test_import_file_failures(tmp_path):
+    """Test that invalid files are not imported."""
+    project = tmp_path / 'project'
+    test_utils.ensure_trestle_config_dir(project)
+    (tmp_path / 'unknown.json').write_text(json.dumps({'unknown': {}}))
+    (tmp_path / 'invalid.json').write_text(json.dumps({'catalog': {'uuid': 'not a uuid'}}))
+
+    for name in ['unknown', 'invalid']:
+        result = import_file(str(tmp_path / f'{name}.json'), str(project))
+        assert not result['imported']
+        assert result['error'] is not None
+    assert not (project / 'catalogs' / 'invalid').exists()
+
+
+def test_import_cmd(tmp_path, monkeypatch, capsys, sample_catalog, sample_target_def):
+    """Test importing many files in parallel without aborting on failures."""
+    project = tmp_path / 'project'
+    test_utils.ensure_trestle_config_dir(project)
+    sources = tmp_path / 'sources'
+    sources.mkdir()
+    sample_catalog.oscal_write(sources / 'nist.json')
+    sample_target_def.oscal_write(sources / 'mytarget.yaml')
+    (sources / 'broken.json').write_text('{')
+    other = tmp_path / 'other.json'
+    sample_catalog.oscal_write(other)
+    monkeypatch.chdir(project)
+
+    with patch.object(sys, 'argv', f'trestle import -f {sources} -f {other} -j 2'.split()):
+        with pytest.raises(TrestleError):
+            cli.run()
+    output = capsys.readouterr().out
+    assert 'Imported 3 of 4 file(s)' in output
+    assert 'broken.json: failed' in output
+
+    assert catalog.Catalog.oscal_read(project / 'catalogs' / 'nist' / 'catalog.json') == sample_catalog
+    assert catalog.Catalog.oscal_read(project / 'catalogs' / 'other' / 'catalog.json') == sample_catalog
+    target_file = project / 'target-definitions' / 'mytarget' / 'target-definition.yaml'
+    assert target.TargetDefinition.oscal_read(target_file) == sample_target_def
+    assert not list(project.rglob('*.tmp'))
+
+    run_import(f'trestle import -f {other} -o renamed')
+    assert (project / 'catalogs' / 'renamed' / 'catalog.json').exists()
+
+
+def test_import_cmd_failures(tmp_path, monkeypatch, sample_catalog):
+    """Test the arguments of the import command."""
+    sample_catalog.oscal_write(tmp_path / 'a.json')
+    sample_catalog.oscal_write(tmp_path / 'b.json')
+
+    monkeypatch.chdir(tmp_path)
+    for testcmd in ['trestle import', 'trestle import -f a.json']:
+        with patch.object(sys, 'argv', testcmd.split()):
+            with pytest.raises(TrestleError):
+                cli.run()
+
+    test_utils.ensure_trestle_config_dir(tmp_path / 'project')
+    monkeypatch.chdir(tmp_path / 'project')
+    for testcmd in [f'trestle import -f {tmp_path}/*.json -o name', f'trestle import -f {tmp_path}/*.txt']:
+        with patch.object(sys, 'argv', testcmd.split()):
+            with pytest.raises(TrestleError):
+                cli.run()
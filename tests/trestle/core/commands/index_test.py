@@ -0,0 +1,78 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+"""Tests for trestle index command."""
+
+import json
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from tests import test_utils
+
+from trestle import cli
+from trestle.core.err import TrestleError
+from trestle.core.models.file_content_type import FileContentType
+from trestle.oscal import target
+
+
+def run_index(testcmd, capsys):
+    """Run the index command and return its output lines."""
+    with patch.object(sys, 'argv', testcmd.split()):
+        with pytest.raises(SystemExit) as pytest_wrapped_e:
+            cli.run()
+        assert pytest_wrapped_e.value.code is None
+    return capsys.readouterr().out.splitlines()
+
+
+def test_index_cmd(tmp_dir, capsys, monkeypatch):
+    """Test that the index command updates the index and prints the elements found as JSON lines."""
+    target_def = target.TargetDefinition.oscal_read(test_utils.JSON_TEST_DATA_PATH / 'sample-target-definition.json')
+    test_utils.prepare_trestle_project_dir(tmp_dir, FileContentType.YAML, target_def, test_utils.TARGET_DEFS_DIR)
+    monkeypatch.chdir(tmp_dir)
+
+    assert 'Indexed 1 file(s)' in run_index('trestle index', capsys)[0]
+    assert 'Indexed 0 file(s)' in run_index('trestle index', capsys)[0]
+    assert 'Indexed 1 file(s)' in run_index('trestle index --rebuild', capsys)[0]
+
+    party_uuid = target_def.metadata.parties[0].uuid
+    results = [json.loads(line) for line in run_index(f'trestle index --no-update --uuid {party_uuid}', capsys)]
+    assert [result['element_type'] for result in results] == ['Party']
+    assert results[0]['model'] == 'target-definition'
+
+    results = [json.loads(line) for line in run_index('trestle index -r SI-4 -k control', capsys)]
+    assert [result['element_type'] for result in results] == ['ImplementedRequirement']
+    assert run_index('trestle index -t Control', capsys) == []
+
+
+def test_index_cmd_times(tmp_dir, capsys, monkeypatch, sample_poam):
+    """Test that the index command finds timestamps by time range."""
+    test_utils.prepare_trestle_project_dir(tmp_dir, FileContentType.JSON, sample_poam, 'plan-of-action-and-milestones')
+    monkeypatch.chdir(tmp_dir)
+
+    lines = run_index('trestle index --since 2021-01-12T00:00:00Z --until 2021-01-13T00:00:00Z -t PoamItem', capsys)
+    results = [json.loads(line) for line in lines]
+    assert [(result['element_type'], result['field']) for result in results] == [('PoamItem', 'collected')]
+    assert results[0]['time'] == '2021-01-12T15:30:00+00:00'
+    assert len(run_index('trestle index --field date-time-stamp', capsys)) == 2
+    assert run_index('trestle index --since 7d', capsys) == []
+
+
+def test_index_cmd_failures(tmp_dir, monkeypatch):
+    """Test that the index command fails outside of a trestle project."""
+    monkeypatch.chdir(tmp_dir)
+    with patch.object(sys, 'argv', ['trestle', 'index']):
+        with pytest.raises(TrestleError):
+            cli.run()
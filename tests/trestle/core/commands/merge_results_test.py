@@ -0,0 +1,55 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+"""Tests for trestle merge-results command."""
+
+import json
+import shutil
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from tests import test_utils
+
+from trestle import cli
+from trestle.core.err import TrestleError
+from trestle.oscal import assessment_results
+
+
+def test_merge_results_cmd(tmp_path):
+    """Test merging result files into a single file with its provenance."""
+    source = test_utils.JSON_TEST_DATA_PATH / 'sample-assessment-results.json'
+    shutil.copy(source, tmp_path / 'run1.json')
+    shutil.copy(source, tmp_path / 'run2.json')
+    output = tmp_path / 'merged.yaml'
+    provenance = tmp_path / 'provenance.json'
+
+    testcmd = f'trestle merge-results {tmp_path}/run*.json -o {output} --provenance {provenance}'
+    with patch.object(sys, 'argv', testcmd.split()):
+        with pytest.raises(SystemExit) as pytest_wrapped_e:
+            cli.run()
+        assert pytest_wrapped_e.value.code is None
+
+    merged = assessment_results.AssessmentResults.oscal_read(output)
+    assert len(merged.results_group.findings) == 3
+    sources = json.loads(provenance.read_text())
+    assert [len(files) for files in sources.values()] == [2, 2, 2]
+
+
+def test_merge_results_cmd_failures(tmp_path):
+    """Test that merging fails without assessment results."""
+    with patch.object(sys, 'argv', ['trestle', 'merge-results', f'{tmp_path}/*.json', '-o', 'merged.json']):
+        with pytest.raises(TrestleError):
+            cli.run()
@@ -0,0 +1,47 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+"""Tests for trestle poam command."""
+
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from tests import test_utils
+
+from trestle import cli
+from trestle.core.err import TrestleError
+from trestle.oscal import poam
+
+
+def test_poam_cmd(tmp_path):
+    """Test generating a POA&M from assessment results."""
+    source = test_utils.JSON_TEST_DATA_PATH / 'sample-assessment-results.json'
+    output = tmp_path / 'poam.json'
+    with patch.object(sys, 'argv', ['trestle', 'poam', str(source), '-o', str(output), '--title', 'Open items']):
+        with pytest.raises(SystemExit) as pytest_wrapped_e:
+            cli.run()
+        assert pytest_wrapped_e.value.code is None
+
+    generated = poam.PlanOfActionAndMilestones.oscal_read(output)
+    assert generated.metadata.title.__root__ == 'Open items'
+    assert len(generated.poam_items.poam_item_group) == 2
+
+
+def test_poam_cmd_failures(tmp_path):
+    """Test that generating a POA&M fails without assessment results."""
+    with patch.object(sys, 'argv', ['trestle', 'poam', f'{tmp_path}/*.json', '-o', str(tmp_path / 'poam.json')]):
+        with pytest.raises(TrestleError):
+            cli.run()
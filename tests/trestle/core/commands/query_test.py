@@ -0,0 +1,57 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for trestle query command."""
+
+import json
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from trestle import cli
+from trestle.core.err import TrestleError
+
+
+def test_query_cmd(capsys):
+    """Test that the query command prints the results as JSON lines."""
+    query = 'catalog.groups[id=ac].controls[id=ac-2].parameters.id'
+    testcmd = f'trestle query -f tests/data/json/good_catalog.json -q {query}'
+    with patch.object(sys, 'argv', testcmd.split()):
+        with pytest.raises(SystemExit) as pytest_wrapped_e:
+            cli.run()
+        assert pytest_wrapped_e.value.code is None
+    lines = capsys.readouterr().out.splitlines()
+    results = [json.loads(line) for line in lines]
+    assert results[0] == {'path': 'catalog.groups.0.controls.1.parameters.0.id', 'value': 'ac-2_prm_1'}
+
+    testcmd = 'trestle query -f tests/data/json/good_catalog.json -q catalog.metadata.parties -l 1'
+    with patch.object(sys, 'argv', testcmd.split()):
+        with pytest.raises(SystemExit):
+            cli.run()
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert len(results) == 1
+    assert results[0]['path'] == 'catalog.metadata.parties.0'
+    assert 'party-name' in results[0]['value']
+
+
+def test_query_cmd_failures():
+    """Test the failures of the query command."""
+    for testcmd in ['trestle query -q catalog',
+                    'trestle query -f tests/data/json/good_catalog.json',
+                    'trestle query -f tests/data/json/good_catalog.json -q catalog.groups[id=ac']:
+        with patch.object(sys, 'argv', testcmd.split()):
+            with pytest.raises(TrestleError):
+                cli.run()
@@ -0,0 +1,51 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+"""Tests for trestle search command."""
+
+import json
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from tests import test_utils
+
+from trestle import cli
+from trestle.core.err import TrestleError
+from trestle.core.models.file_content_type import FileContentType
+
+
+def test_search_cmd(tmp_dir, sample_catalog, capsys, monkeypatch):
+    """Test that the search command prints the best matching elements as JSON lines."""
+    test_utils.prepare_trestle_project_dir(tmp_dir, FileContentType.JSON, sample_catalog, test_utils.CATALOGS_DIR)
+    monkeypatch.chdir(tmp_dir)
+
+    testcmd = 'trestle search audit record retention -l 2 -t Control'
+    with patch.object(sys, 'argv', testcmd.split()):
+        with pytest.raises(SystemExit) as pytest_wrapped_e:
+            cli.run()
+        assert pytest_wrapped_e.value.code is None
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert len(results) == 2
+    assert results[0]['oscal_id'] == 'au-11'
+    assert results[0]['path'] == 'catalog.groups.2.controls.10'
+
+
+def test_search_cmd_failures(tmp_dir, monkeypatch):
+    """Test that the search command fails outside of a trestle project."""
+    monkeypatch.chdir(tmp_dir)
+    with patch.object(sys, 'argv', ['trestle', 'search', 'audit']):
+        with pytest.raises(TrestleError):
+            cli.run()
@@ -0,0 +1,95 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+"""Tests for trestle stats command."""
+
+import json
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from trestle import cli
+from trestle.core.err import TrestleError
+
+RESULTS = {
+    'assessment-results': {
+        'results-group': {
+            'findings': [
+                {
+                    'objective-status': {
+                        'result': {
+                            'STRVALUE': 'satisfied'
+                        }
+                    }
+                }, {
+                    'objective-status': {
+                        'result': {
+                            'STRVALUE': 'not-satisfied'
+                        }
+                    }, 'risks': [{
+                        'risk-status': 'open'
+                    }]
+                }
+            ]
+        }
+    }
+}
+
+POAM = {'plan-of-action-and-milestones': {'poam-items': {'poam-item-group': [{'risks': [{'risk-status': 'closed'}]}]}}}
+
+
+def run_stats(testcmd, capsys):
+    """Run the stats command and return its output as JSON data."""
+    with patch.object(sys, 'argv', testcmd.split()):
+        with pytest.raises(SystemExit) as pytest_wrapped_e:
+            cli.run()
+        assert pytest_wrapped_e.value.code is None
+    return json.loads(capsys.readouterr().out)
+
+
+def test_stats_cmd(tmp_path, capsys):
+    """Test counting files and merging saved statistics."""
+    (tmp_path / 'results.json').write_text(json.dumps(RESULTS))
+    (tmp_path / 'poam.json').write_text(json.dumps(POAM))
+
+    stats = run_stats(f'trestle stats {tmp_path / "results.json"} -o {tmp_path / "partial.out"} -j 1', capsys)
+    assert stats['files'] == 1
+    assert stats['counts']['findings'] == {'satisfied': 1, 'not-satisfied': 1}
+
+    stats = run_stats(f'trestle stats {tmp_path / "poam.json"} --merge {tmp_path / "partial.out"}', capsys)
+    assert stats['files'] == 2
+    assert stats['counts']['risk-statuses'] == {'open': 1, 'closed': 1}
+
+    assert run_stats(f'trestle stats {tmp_path}/*.json', capsys) == stats
+
+
+def test_stats_cmd_errors(tmp_path, capsys):
+    """Test that files that cannot be counted are reported after the other files are counted."""
+    (tmp_path / 'results.json').write_text(json.dumps(RESULTS))
+    (tmp_path / 'bad.json').write_text('{')
+    with patch.object(sys, 'argv', ['trestle', 'stats', str(tmp_path), '-j', '1']):
+        with pytest.raises(TrestleError):
+            cli.run()
+    stats = json.loads(capsys.readouterr().out)
+    assert stats['files'] == 1
+    assert list(stats['errors']) == [str(tmp_path / 'bad.json')]
+
+
+def test_stats_cmd_outside_project(tmp_path, monkeypatch):
+    """Test that statistics of the current project require a trestle project."""
+    monkeypatch.chdir(tmp_path)
+    with patch.object(sys, 'argv', ['trestle', 'stats']):
+        with pytest.raises(TrestleError):
+            cli.run()
@@ -15,11 +15,19 @@
 # limitations under the License.
 """Tests for models util module."""
 
+import datetime
 import pathlib
+import sys
+import uuid
+
+import pytest
 
 import trestle.core.validater as validater
 import trestle.oscal.catalog as catalog
 import trestle.oscal.target as ostarget
+from trestle.core import const
+from trestle.core.err import TrestleError
+from trestle.core.models.elements import Element, ElementPath
 
 import yaml
 
@@ -64,3 +72,90 @@ def test_has_no_duplicate_values_pydantic():
     good_target_path = yaml_path / 'good_target.yaml'
     good_target = ostarget.TargetDefinition.oscal_read(good_target_path)
     assert not validater.has_no_duplicate_values_by_type(good_target, ostarget.Prop)
+
+
+def test_validation_engine_single_pass(sample_target_def):
+    """Test that several rules are reported from a single traversal."""
+    engine = validater.ValidationEngine(
+        validater.create_rules(
+            [const.VAL_MODE_DUPLICATES, const.VAL_MODE_TIMEZONE, const.VAL_MODE_REFERENCES], ['uuid', 'id']
+        )
+    )
+    assert len(engine.get_rules()) == 4
+    assert engine.validate(sample_target_def) == []
+
+    # naive datetime and dangling reference in the same model
+    sample_target_def.metadata.last_modified = ostarget.LastModified(__root__=datetime.datetime(2020, 1, 1))
+    sample_target_def.metadata.parties[0].location_uuids = [ostarget.LocationUuid(__root__=str(uuid.uuid4()))]
+    violations = engine.validate(sample_target_def)
+    assert len(violations) == 2
+    assert violations[0].rule == const.VAL_MODE_TIMEZONE
+    assert violations[0].paths == ['target-definition.metadata.last-modified']
+    assert violations[1].rule == const.VAL_MODE_REFERENCES
+    assert violations[1].paths == ['target-definition.metadata.parties.0']
+
+    # rules are reset between runs
+    assert len(engine.validate(sample_target_def)) == 2
+
+
+def test_validation_engine_unused(sample_target_def):
+    """Test that unused definitions are reported only by the unused mode."""
+    engine = validater.ValidationEngine(validater.create_rules([const.VAL_MODE_REFERENCES]))
+    assert engine.validate(sample_target_def) == []
+
+    engine = validater.ValidationEngine(validater.create_rules([const.VAL_MODE_UNUSED]))
+    violations = engine.validate(sample_target_def)
+    assert len(violations) == 1
+    assert violations[0].rule == const.VAL_MODE_UNUSED
+    assert violations[0].paths == ['target-definition.metadata.parties.0']
+
+
+def test_validation_engine_duplicate_paths():
+    """Test that duplicate values are reported with the paths where they occur."""
+    bad_target = ostarget.TargetDefinition.oscal_read(pathlib.Path('tests/data/yaml/bad_target_dup_uuid.yaml'))
+    violations = validater.ValidationEngine([validater.DuplicateValuesRule('uuid')]).validate(bad_target)
+    assert len(violations) == 1
+    assert len(violations[0].paths) == 2
+    assert violations[0].paths[0].startswith('target-definition.targets.')
+
+
+def test_validation_engine_deep_model():
+    """Test that the traversal does not recurse on deeply nested data."""
+    data = {'uuid': 'root'}
+    node = data
+    for i in range(sys.getrecursionlimit() + 10):
+        node['parts'] = [{'uuid': str(i)}]
+        node = node['parts'][0]
+    nodes = list(validater.walk(data))
+    assert len(nodes) > sys.getrecursionlimit()
+
+
+def test_create_rules_failures():
+    """Test failures in creating rules for modes."""
+    with pytest.raises(TrestleError):
+        validater.create_rules(['invalid'])
+    with pytest.raises(TrestleError):
+        validater.create_rules([const.VAL_MODE_DUPLICATES])
+    with pytest.raises(TrestleError):
+        validater.ValidationEngine(['not a rule'])
+
+
+def test_find_duplicate_values_by_type(sample_target_def):
+    """Test that duplicate values of a type are reported by path."""
+    groups = validater.find_duplicate_values_by_type(sample_target_def, ostarget.Prop)
+    assert len(groups) > 0
+    for paths in groups:
+        assert len(paths) > 1
+        props = [Element(sample_target_def).get_at(ElementPath(path)) for path in paths]
+        assert all(prop == props[0] for prop in props)
+
+    assert validater.find_duplicate_values_by_type(sample_target_def, ostarget.Metadata) == []
+    assert validater.has_no_duplicate_values_by_type(sample_target_def, ostarget.Metadata)
+
+
+def test_find_duplicate_values_by_type_pruned():
+    """Test that values nested in a value of the same type are not compared."""
+    inner = catalog.Part(id='p', name='item')
+    outer = catalog.Part(id='p', name='item', parts=[catalog.Part(id='p', name='item')])
+    assert validater.find_duplicate_values_by_type([outer, inner], catalog.Part) == []
+    assert validater.find_values_by_type([outer, inner], catalog.Part) == [outer, inner]
@@ -0,0 +1,107 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+"""Tests for trestle control_set module."""
+
+import pathlib
+
+import pytest
+
+from trestle.core.control_set import ControlSet, ControlSpace, iter_bits, select_profile_controls
+from trestle.core.err import TrestleError
+from trestle.oscal import profile
+
+
+def test_control_space(sample_catalog):
+    """Test that the controls of a catalog get positions in document order."""
+    space = ControlSpace.from_catalog(sample_catalog)
+    assert len(space) == 1177
+    assert space.get_ids()[:4] == ['ac-1', 'ac-2', 'ac-2.1', 'ac-2.2']
+    assert space.get_position('ac-2.1') == 2
+    assert space.get_position('xx-1') is None
+    assert len(space.full()) == 1177
+    assert not space.empty()
+
+    with pytest.raises(TrestleError):
+        ControlSpace(['a', 'a'])
+    with pytest.raises(TrestleError):
+        ControlSpace(['a', 'b'], [-1])
+
+
+def test_control_space_select():
+    """Test the selection of controls by ids and patterns, with and without child controls."""
+    space = ControlSpace(['a-1', 'a-1.1', 'a-1.1.1', 'a-2', 'b-1'], [-1, 0, 1, -1, -1])
+    assert space.select_ids(['a-1', 'b-1', 'c-1']).get_ids() == ['a-1', 'b-1']
+    assert space.select_ids(['a-1'], True).get_ids() == ['a-1', 'a-1.1', 'a-1.1.1']
+    assert space.select_pattern(r'a-\d').get_ids() == ['a-1', 'a-2']
+    assert space.select_pattern(r'a-1\.1', True).get_ids() == ['a-1.1', 'a-1.1.1']
+    assert space.select_pattern('-1') == space.empty()
+    # a negated class must not match across ids
+    assert space.select_pattern(r'a-[^.]+').get_ids() == ['a-1', 'a-2']
+    flat = ControlSpace(['ac-1', 'ac-2', 'ac-2.1', 'ac-3'])
+    assert flat.select_pattern('ac-[^.]+').get_ids() == ['ac-1', 'ac-2', 'ac-3']
+    with pytest.raises(TrestleError):
+        space.select_pattern('a-(')
+
+    include = profile.Include(
+        id_selectors=[profile.Call(control_id='a-1', with_child_controls='yes')],
+        pattern_selectors=[profile.Match(pattern='b-.*')]
+    )
+    exclude = profile.Exclude(id_selectors=[profile.Call(control_id='a-1.1')])
+    assert space.select(include, exclude).get_ids() == ['a-1', 'a-1.1.1', 'b-1']
+    assert space.select(None, exclude).get_ids() == ['a-1', 'a-1.1.1', 'a-2', 'b-1']
+    assert space.select(profile.Include(all=profile.All())) == space.full()
+
+
+def test_control_set_algebra():
+    """Test the set operations on selections."""
+    space = ControlSpace(['a', 'b', 'c', 'd'])
+    ab = space.select_ids(['a', 'b'])
+    bc = space.select_ids(['b', 'c'])
+    assert (ab | bc).get_ids() == ['a', 'b', 'c']
+    assert (ab & bc).get_ids() == ['b']
+    assert (ab - bc).get_ids() == ['a']
+    assert (ab ^ bc).get_ids() == ['a', 'c']
+    assert (~ab).get_ids() == ['c', 'd']
+    assert len(ab) == 2
+    assert 'a' in ab and 'c' not in ab and 'z' not in ab
+    assert (ab & bc).issubset(ab)
+    assert not ab.issubset(bc)
+    assert ControlSet.union(space, [ab, bc]) == ab | bc
+    assert ControlSet.intersection(space, [ab, bc]) == ab & bc
+    assert ControlSet.intersection(space, []) == space.full()
+    assert {ab, space.select_ids(['b', 'a'])} == {ab}
+    assert list(iter_bits(0b10110)) == [1, 2, 4]
+
+    with pytest.raises(TrestleError):
+        ab | ControlSpace(['a', 'b']).full()
+    with pytest.raises(TypeError):
+        ab | {'a'}
+
+
+def test_select_profile_controls(sample_catalog):
+    """Test the selection of the controls imported by a profile."""
+    prof = profile.Profile.oscal_read(pathlib.Path('tests/data/json/good_profile.json'))
+    href = prof.imports[0].href
+    space = ControlSpace.from_catalog(sample_catalog)
+    selections = select_profile_controls(prof, {href: space})
+    assert list(selections.keys()) == [href]
+    assert len(selections[href]) == 409
+    assert selections[href].get_ids()[:3] == ['ac-1', 'ac-2', 'ac-2.1']
+
+    prof.imports.append(profile.Import(href=href, include=profile.Include(all=profile.All())))
+    assert select_profile_controls(prof, {href: space})[href] == space.full()
+
+    with pytest.raises(TrestleError):
+        select_profile_controls(prof, {})
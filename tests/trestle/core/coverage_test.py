@@ -0,0 +1,147 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+"""Tests for trestle coverage module."""
+
+import csv
+import json
+import pathlib
+import uuid
+from typing import List, Optional
+
+import pytest
+
+import tests.test_utils as test_utils
+
+from trestle.core import coverage
+from trestle.core.catalog_index import CatalogIndex
+from trestle.core.coverage import CoverageMatrix, combine_statuses
+from trestle.core.err import TrestleError
+from trestle.oscal import ssp
+from trestle.oscal import target
+
+
+def _props(status: Optional[str]) -> Optional[List[ssp.Prop]]:
+    return [ssp.Prop(name=coverage.STATUS_PROP, value=status)] if status else None
+
+
+def _requirement(control_id: str, status: Optional[str] = None, *statement_statuses: str) -> ssp.ImplementedRequirement:
+    statements = {
+        f'{control_id}_smt.{i}': ssp.Statement(uuid=str(uuid.uuid4()), properties=_props(statement_status))
+        for i,
+        statement_status in enumerate(statement_statuses)
+    }
+    return ssp.ImplementedRequirement(
+        uuid=str(uuid.uuid4()), control_id=control_id, properties=_props(status), statements=statements or None
+    )
+
+
+@pytest.fixture(params=[False, True], ids=['bytes', 'numpy'])
+def matrix(request, sample_catalog) -> CoverageMatrix:
+    """Return a coverage matrix of two systems over the sample catalog."""
+    if request.param:
+        pytest.importorskip('numpy')
+    matrix = CoverageMatrix(CatalogIndex(sample_catalog), use_numpy=request.param)
+    matrix.add_system(
+        'one',
+        [
+            _requirement('ac-1'),
+            _requirement('ac-2', 'planned'),
+            _requirement('ac-2.1', None, 'implemented', 'planned'),
+            _requirement('ac-3', None, 'implemented', 'not-applicable'),
+            _requirement('au-1', 'not-applicable'),
+            _requirement('xx-1')
+        ]
+    )
+    matrix.add_system('two', [_requirement('ac-1', 'implemented'), _requirement('ac-1', 'planned')])
+    return matrix
+
+
+def test_combine_statuses():
+    """Test combining the statuses of the parts of an implementation."""
+    assert combine_statuses([]) == coverage.IMPLEMENTED
+    assert combine_statuses([], coverage.PLANNED) == coverage.PLANNED
+    assert combine_statuses([coverage.PLANNED, coverage.PLANNED]) == coverage.PLANNED
+    assert combine_statuses([coverage.PLANNED, coverage.NOT_APPLICABLE]) == coverage.PLANNED
+    assert combine_statuses([coverage.NOT_APPLICABLE]) == coverage.NOT_APPLICABLE
+    assert combine_statuses([coverage.PLANNED, coverage.IMPLEMENTED]) == coverage.PARTIAL
+
+
+def test_coverage_matrix(matrix: CoverageMatrix):
+    """Test the statuses of the controls in the systems."""
+    assert matrix.get_systems() == ['one', 'two']
+    assert len(matrix.get_control_ids()) == 1177
+    assert matrix.get_row('ac-1') == {'one': 'implemented', 'two': 'partial'}
+    assert matrix.get_row('ac-2') == {'one': 'planned', 'two': 'none'}
+    assert matrix.get_status('ac-2.1', 'one') == 'partial'
+    assert matrix.get_status('ac-3', 'one') == 'implemented'
+    assert matrix.get_status('au-1', 'one') == 'not-applicable'
+    assert matrix.get_unknown_ids() == {'one': ['xx-1']}
+
+    with pytest.raises(TrestleError):
+        matrix.get_status('xx-1', 'one')
+    with pytest.raises(TrestleError):
+        matrix.get_status('ac-1', 'three')
+    with pytest.raises(TrestleError):
+        matrix.add_system('one', [])
+
+
+def test_coverage_rollups(matrix: CoverageMatrix):
+    """Test the roll-ups of the matrix by system, control and group."""
+    counts = matrix.get_system_counts()
+    assert counts['one'] == {
+        'none': 1172, 'planned': 1, 'partial': 1, 'alternative': 0, 'implemented': 2, 'not-applicable': 1
+    }
+    assert counts['two']['partial'] == 1
+    assert counts['two']['none'] == 1176
+
+    control_counts = matrix.get_control_counts()
+    assert control_counts['ac-1']['implemented'] == 1
+    assert control_counts['ac-1']['partial'] == 1
+    assert control_counts['ac-4']['none'] == 2
+
+    group_counts = matrix.get_group_counts('one')
+    assert group_counts['ac']['implemented'] == 2
+    assert group_counts['au']['not-applicable'] == 1
+    assert sum(sum(row.values()) for row in group_counts.values()) == 1177
+
+    coverage_by_system = matrix.get_coverage()
+    assert coverage_by_system['one'] == pytest.approx(2 / 1176)
+    assert coverage_by_system['two'] == 0
+
+
+def test_coverage_export(matrix: CoverageMatrix, tmp_path: pathlib.Path):
+    """Test exporting the matrix to CSV and JSON."""
+    matrix.write_csv(tmp_path / 'coverage.csv')
+    with open(tmp_path / 'coverage.csv', newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ['control-id', 'one', 'two']
+    assert rows[1] == ['ac-1', 'implemented', 'partial']
+    assert len(rows) == 1178
+
+    matrix.write_json(tmp_path / 'coverage.json')
+    data = json.loads((tmp_path / 'coverage.json').read_text())
+    assert data['systems'] == ['one', 'two']
+    assert data['controls'][1] == {'control-id': 'ac-2', 'statuses': ['planned', 'none']}
+    assert data['summary'] == matrix.get_system_counts()
+
+
+def test_coverage_of_model(sample_catalog):
+    """Test adding the requirements of a target definition."""
+    target_def = target.TargetDefinition.oscal_read(test_utils.JSON_TEST_DATA_PATH / 'sample-target-definition.json')
+    matrix = CoverageMatrix(CatalogIndex(sample_catalog), use_numpy=False)
+    matrix.add_model('target', target_def)
+    # the sample target definition uses upper case control ids, unlike the catalog
+    assert 'SI-4' in matrix.get_unknown_ids()['target']
+    assert matrix.get_system_counts()['target']['none'] == 1177
@@ -0,0 +1,134 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+"""Tests for trestle hash_verifier module."""
+import datetime
+import hashlib
+import pathlib
+import uuid
+from typing import List
+
+import pytest
+
+from trestle.core import const
+from trestle.core import validater
+from trestle.core.err import TrestleError
+from trestle.core.hash_verifier import HashVerifier, get_hash_name, hash_file, resolve_local_href
+from trestle.oscal import ssp
+from trestle.utils.cache import DiskCache
+
+CONTENT = b'attached content\n' * 100000
+
+
+def _make_ssp_back_matter(rlinks: List[ssp.Rlink]) -> ssp.BackMatter:
+    return ssp.BackMatter(resources=[ssp.Resource(uuid=str(uuid.UUID(int=1, version=4)), rlinks=rlinks)])
+
+
+def test_get_hash_name() -> None:
+    """Test mapping OSCAL hash algorithms to hashlib."""
+    assert get_hash_name('SHA-256') == 'sha256'
+    assert get_hash_name('sha3-512') == 'sha3_512'
+    with pytest.raises(TrestleError):
+        get_hash_name('MD5')
+
+
+def test_resolve_local_href(tmp_dir: pathlib.Path) -> None:
+    """Test resolving rlink hrefs to local files."""
+    assert resolve_local_href('docs/a file.pdf', tmp_dir) == tmp_dir / 'docs' / 'a file.pdf'
+    assert resolve_local_href('docs/a%20file.pdf', tmp_dir) == tmp_dir / 'docs' / 'a file.pdf'
+    assert resolve_local_href('/abs/file.pdf', tmp_dir) == pathlib.Path('/abs/file.pdf')
+    assert resolve_local_href('file:///abs/file.pdf', tmp_dir) == pathlib.Path('/abs/file.pdf')
+    assert resolve_local_href('https://example.com/file.pdf', tmp_dir) is None
+    assert resolve_local_href('#c4ea7b0b-1a4f-4e2a-9d1e-9b8a2cd3a2c1', tmp_dir) is None
+
+
+def test_hash_file(tmp_dir: pathlib.Path) -> None:
+    """Test hashing a file for several algorithms at once."""
+    file_path = tmp_dir / 'file.bin'
+    file_path.write_bytes(CONTENT)
+    assert hash_file(file_path, ['sha256', 'sha3_256']) == {
+        'sha256': hashlib.sha256(CONTENT).hexdigest(), 'sha3_256': hashlib.sha3_256(CONTENT).hexdigest()
+    }
+
+    empty_path = tmp_dir / 'empty.bin'
+    empty_path.write_bytes(b'')
+    assert hash_file(empty_path, ['sha256']) == {'sha256': hashlib.sha256(b'').hexdigest()}
+
+
+def test_verify(tmp_dir: pathlib.Path) -> None:
+    """Test verifying hashes with cached digests."""
+    good_path = tmp_dir / 'good.bin'
+    good_path.write_bytes(CONTENT)
+    bad_path = tmp_dir / 'bad.bin'
+    bad_path.write_bytes(CONTENT + b'changed')
+    sha256 = hashlib.sha256(CONTENT).hexdigest()
+    expected = [
+        (good_path, 'SHA-256', sha256.upper()), (good_path, 'SHA-512', hashlib.sha512(CONTENT).hexdigest()),
+        (bad_path, 'SHA-256', sha256), (tmp_dir / 'missing.bin', 'SHA-256', sha256), (good_path, 'MD5', sha256)
+    ]
+
+    cache = DiskCache(tmp_dir / 'cache', 'hashes')
+    verifier = HashVerifier(cache, workers=2)
+    mismatches = verifier.verify(expected)
+    assert [(mismatch.path, mismatch.algorithm) for mismatch in mismatches] == [
+        (bad_path, 'SHA-256'), (tmp_dir / 'missing.bin', 'SHA-256'), (good_path, 'MD5')
+    ]
+    assert mismatches[0].actual == hashlib.sha256(CONTENT + b'changed').hexdigest()
+    assert mismatches[1].actual is None
+    assert 'expected' in str(mismatches[0])
+    assert 'Cannot verify' in str(mismatches[1])
+    assert verifier.get_hashed_count() == 2
+
+    # unchanged files are not hashed again, by the same verifier or with the disk cache
+    assert len(verifier.verify(expected)) == 3
+    assert verifier.get_hashed_count() == 2
+    verifier = HashVerifier(cache)
+    assert len(verifier.verify(expected)) == 3
+    assert verifier.get_hashed_count() == 0
+
+    # a changed file is hashed again
+    bad_path.write_bytes(CONTENT)
+    assert len(verifier.verify(expected)) == 2
+    assert verifier.get_hashed_count() == 1
+
+
+def test_hash_integrity_rule(tmp_dir: pathlib.Path) -> None:
+    """Test the hashes validation mode on a model."""
+    (tmp_dir / 'good.bin').write_bytes(CONTENT)
+    (tmp_dir / 'bad.bin').write_bytes(b'other content')
+    sha256 = hashlib.sha256(CONTENT).hexdigest()
+    back_matter = _make_ssp_back_matter(
+        [
+            ssp.Rlink(href='good.bin', hashes=[ssp.Hash(algorithm='SHA-256', value=sha256)]),
+            ssp.Rlink(href='bad.bin', hashes=[ssp.Hash(algorithm='SHA-256', value=sha256)]),
+            ssp.Rlink(href='https://example.com/bad.bin', hashes=[ssp.Hash(algorithm='SHA-256', value=sha256)]),
+            ssp.Rlink(href='good.bin')
+        ]
+    )
+    metadata = ssp.Metadata(
+        title='System',
+        last_modified=datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc),
+        version='1.0',
+        oscal_version='1.0.0'
+    )
+    rules = validater.create_rules([const.VAL_MODE_HASHES], base_dir=tmp_dir)
+    engine = validater.ValidationEngine(rules)
+    violations = engine.validate(metadata)
+    assert violations == []
+
+    violations = engine.validate(back_matter)
+    assert len(violations) == 1
+    assert violations[0].rule == const.VAL_MODE_HASHES
+    assert 'bad.bin' in violations[0].message
+    assert violations[0].paths == ['back-matter.resources.0.rlinks.1']
@@ -0,0 +1,170 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+"""Tests for trestle index module."""
+
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from tests import test_utils
+
+from trestle.core.err import TrestleError
+from trestle.core.index import ProjectIndex
+from trestle.core.models.file_content_type import FileContentType
+from trestle.oscal import target
+
+
+def test_project_index(tmp_dir, sample_catalog):
+    """Test that the project index finds elements, properties and references of all models."""
+    target_def = target.TargetDefinition.oscal_read(test_utils.JSON_TEST_DATA_PATH / 'sample-target-definition.json')
+    test_utils.prepare_trestle_project_dir(tmp_dir, FileContentType.JSON, sample_catalog, test_utils.CATALOGS_DIR)
+    test_utils.prepare_trestle_project_dir(tmp_dir, FileContentType.YAML, target_def, test_utils.TARGET_DEFS_DIR)
+
+    with ProjectIndex(tmp_dir) as index:
+        assert index.update() == {'indexed': 2, 'unchanged': 0, 'removed': 0}
+        assert index.get_db_path() == tmp_dir.absolute() / '.trestle' / 'index.sqlite'
+
+        controls = index.find_elements(oscal_id='ac-2')
+        assert len(controls) == 1
+        assert controls[0].file == 'catalogs/my_test_model/catalog.json'
+        assert controls[0].model == 'catalog'
+        assert controls[0].path == 'catalog.groups.0.controls.1'
+        assert controls[0].element_type == 'Control'
+        assert index.find_elements(prop_name='label', prop_value='AC-2') == controls
+        assert index.find_elements(type_name='Control', model='target-definition') == []
+
+        party_uuid = sample_catalog.metadata.parties[0].uuid
+        assert [party.element_type for party in index.find_elements(uuid=party_uuid)] == ['Party']
+        referenced_uuid = sample_catalog.metadata.responsible_parties['creator'].party_uuids[0].__root__
+        party_references = index.find_references(referenced_uuid, 'party')
+        assert [reference.path for reference in party_references] == [
+            'catalog.metadata.responsible-parties.creator', 'catalog.metadata.responsible-parties.contact'
+        ]
+
+        implementations = index.find_references('SI-4', 'control')
+        assert [reference.element_type for reference in implementations] == ['ImplementedRequirement']
+        assert index.find_references('SI-4', 'party') == []
+
+
+def test_project_index_search(tmp_dir, sample_catalog):
+    """Test that the prose of the elements is searched and ranked."""
+    test_utils.prepare_trestle_project_dir(tmp_dir, FileContentType.JSON, sample_catalog, test_utils.CATALOGS_DIR)
+    with ProjectIndex(tmp_dir) as index:
+        index.update()
+
+        results = index.search('Account Management', 3)
+        assert [result.oscal_id for result in results] == ['ac-2', 'ac-2.8', 'ac-2.1']
+        assert results[0].title == 'Account Management'
+        assert results[0].model == 'catalog'
+        assert results[0].score > results[1].score
+        parts = index.search('account management', 20, type_name='Part')
+        assert [result.element_type for result in parts] == ['Part'] * 20
+        assert index.search('account management', model='target-definition') == []
+        assert index.search('the of') == []
+        assert index.search('nonexistentterm') == []
+
+
+def test_project_index_update(tmp_dir, sample_catalog, sample_target_def):
+    """Test that only changed files are indexed again and that deleted files are dropped."""
+    _, catalog_file = test_utils.prepare_trestle_project_dir(
+        tmp_dir, FileContentType.JSON, sample_catalog, test_utils.CATALOGS_DIR
+    )
+    _, target_file = test_utils.prepare_trestle_project_dir(
+        tmp_dir, FileContentType.YAML, sample_target_def, test_utils.TARGET_DEFS_DIR
+    )
+    with ProjectIndex(tmp_dir) as index:
+        index.update()
+
+    with ProjectIndex(tmp_dir) as index:
+        assert index.update() == {'indexed': 0, 'unchanged': 2, 'removed': 0}
+
+        party = sample_target_def.metadata.parties[0]
+        party.uuid = '3c1b5e2e-9a3f-4d55-8f4e-6b1f1d1e2a3c'
+        sample_target_def.oscal_write(target_file)
+        assert index.update() == {'indexed': 1, 'unchanged': 1, 'removed': 0}
+        assert [element.element_type for element in index.find_elements(uuid=party.uuid)] == ['Party']
+
+        catalog_file.unlink()
+        assert index.update() == {'indexed': 0, 'unchanged': 1, 'removed': 1}
+        assert index.find_elements(model='catalog') == []
+        assert [f[0] for f in index.get_files()] == ['target-definitions/my_test_model/target-definition.yaml']
+
+        # a file that cannot be loaded is recorded with its error
+        target_file.write_text('target-definition: {}')
+        assert index.update()['indexed'] == 1
+        assert index.get_files()[0][2] is not None
+        assert index.find_elements(model='target-definition') == []
+
+        assert index.rebuild() == {'indexed': 1, 'unchanged': 0, 'removed': 0}
+
+
+def test_project_index_split(tmp_dir, sample_catalog):
+    """Test that the elements of split sub-elements are indexed at their path in the whole model."""
+    models_path, catalog_file = test_utils.prepare_trestle_project_dir(
+        tmp_dir, FileContentType.JSON, sample_catalog, test_utils.CATALOGS_DIR
+    )
+    sample_catalog.stripped_instance(stripped_fields_aliases=['groups']).oscal_write(catalog_file)
+    groups_path = models_path / 'catalog' / 'groups'
+    groups_path.mkdir(parents=True)
+    for i, group in enumerate(sample_catalog.groups):
+        group.oscal_write(groups_path / f'{i:05}__group.json')
+
+    with ProjectIndex(tmp_dir) as index:
+        assert index.update()['indexed'] == len(sample_catalog.groups) + 1
+
+        controls = index.find_elements(oscal_id='ac-2')
+        assert len(controls) == 1
+        assert controls[0].file == 'catalogs/my_test_model/catalog/groups/00000__group.json'
+        assert controls[0].model == 'catalog'
+        assert controls[0].path == 'catalog.groups.0.controls.1'
+        assert [group.path
+                for group in index.find_elements(type_name='Group')][:2] == ['catalog.groups.0', 'catalog.groups.1']
+        assert index.find_elements(uuid=sample_catalog.metadata.parties[0].uuid
+                                   )[0].file == ('catalogs/my_test_model/catalog.json')
+
+
+def test_project_index_times(tmp_dir, sample_poam):
+    """Test that the timestamps of the models are found by time range."""
+    _, poam_file = test_utils.prepare_trestle_project_dir(
+        tmp_dir, FileContentType.JSON, sample_poam, 'plan-of-action-and-milestones'
+    )
+    with ProjectIndex(tmp_dir) as index:
+        index.update()
+        assert len(index.find_times()) == 11
+
+        start = datetime(2021, 1, 12, tzinfo=timezone.utc)
+        observations = index.find_times(start, type_name='Observation')
+        assert len(observations) == 3
+        assert observations[0].path == 'plan-of-action-and-milestones.poam-items.poam-item-group.1.observations.0'
+        assert observations[0].field == 'collected'
+        assert observations[0].model == 'plan-of-action-and-milestones'
+        assert index.find_times(start, datetime(2021, 1, 13, tzinfo=timezone.utc), 'collected', 'PoamItem')[0].uuid == (
+            sample_poam.poam_items.poam_item_group[1].uuid
+        )
+        assert index.find_times(field='expires', model='catalog') == []
+
+        # results appended to the file are indexed on the next update
+        item = sample_poam.poam_items.poam_item_group[2].copy(update={'uuid': str(uuid.uuid4())})
+        sample_poam.poam_items.poam_item_group.append(item)
+        sample_poam.oscal_write(poam_file)
+        index.update()
+        assert len(index.find_times(start, type_name='Observation')) == 4
+
+
+def test_project_index_failures(tmp_dir):
+    """Test that an index can only be opened in a trestle project."""
+    with pytest.raises(TrestleError):
+        ProjectIndex(tmp_dir)
@@ -15,6 +15,7 @@
 # limitations under the License.
 """Tests for trestle elements module."""
 import pathlib
+import pickle
 
 import pytest
 
@@ -111,6 +112,26 @@ def test_element_path_eq(sample_target_def):
     assert not (ElementPath('target.metadata') == Element(sample_target_def))
 
 
+def test_element_path_interned():
+    """Test that equal paths with the same parent chain are the same immutable object."""
+    parent_path = ElementPath('catalog.groups.*')
+    element_path = ElementPath('group.controls.*', parent_path)
+    assert ElementPath('catalog.groups.*') is parent_path
+    assert ElementPath('group.controls.*', 'catalog.groups.*') is element_path
+    assert ElementPath('group.controls.*', ElementPath('profile.groups.*')) is not element_path
+    assert ElementPath('group.controls.*') is not element_path
+
+    with pytest.raises(AttributeError):
+        element_path._path = ['group', 'parts']
+
+    # paths are hashed consistently with equality
+    paths = {element_path: 'controls', ElementPath('catalog.metadata'): 'metadata'}
+    assert paths[ElementPath('group.controls.*')] == 'controls'
+    assert paths[ElementPath('catalog.metadata')] == 'metadata'
+
+    assert pickle.loads(pickle.dumps(element_path)) is element_path
+
+
 def test_element_path_to_file_path():
     """Test to file path method."""
     assert ElementPath('target-definition.metadata.title'
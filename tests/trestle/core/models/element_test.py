@@ -81,6 +81,37 @@ def test_element_get_at(sample_target_def: target.TargetDefinition):
         assert target_element.get_at(element_path) == target.target_control_implementations[0]
 
 
+def test_element_get_many(sample_target_def: target.TargetDefinition):
+    """Test getting the elements at several paths in a single descent."""
+    element = Element(sample_target_def)
+    metadata_path = ElementPath('target-definition.metadata')
+    element_paths = [
+        ElementPath('target-definition.metadata.title'),
+        ElementPath('target-definition.metadata.parties.*'),
+        ElementPath('target-definition.metadata.parties.0.uuid'),
+        ElementPath('target-definition.targets'),
+        ElementPath('target-definition.metadata.parties.0'),
+        ElementPath('target-definition.metadata.title.0'),
+        ElementPath('target-definition.metadata.missing.field'),
+        ElementPath('metadata.parties.*', metadata_path),
+        metadata_path
+    ]
+    for uuid in sample_target_def.targets:
+        element_paths.append(ElementPath(f'target-definition.targets.{uuid}'))
+
+    results = element.get_many(element_paths)
+    assert len(results) == len(element_paths)
+    for element_path, result in zip(element_paths, results):
+        assert result == element.get_at(element_path)
+    assert results[1] is sample_target_def.metadata.parties
+    assert results[5] is None
+    assert results[6] is None
+
+    # without checking the parent the path is resolved from the element itself
+    assert element.get_many([ElementPath('metadata.parties.*', metadata_path)], False) == [None]
+    assert element.get_many([]) == []
+
+
 def test_element_set_at(sample_target_def: target.TargetDefinition):
     """Test element get method."""
     element = Element(sample_target_def)
@@ -141,6 +172,106 @@ def test_element_set_at(sample_target_def: target.TargetDefinition):
         assert element.set_at(ElementPath('target-definition.metadata.groups.*'), parties)
 
 
+def test_element_type_index(sample_target_def: target.TargetDefinition):
+    """Test the type index of an element."""
+    element = Element(sample_target_def)
+    type_index = element.get_type_index()
+    assert element.get_type_index() is type_index
+
+    parties = type_index.get(target.Party)
+    assert len(parties) == len(sample_target_def.metadata.parties)
+    assert parties[0][0] is sample_target_def.metadata.parties[0]
+    assert parties[0][1] == ElementPath('target-definition.metadata.parties.0')
+    assert type_index.get(target.Party) is parties
+    assert type_index.get(target.TargetDefinition) == [(sample_target_def, None)]
+    assert type_index.get(target.Role) == []
+    assert type_index.get_instances(target.Metadata) == [sample_target_def.metadata]
+    assert target.Party in type_index.get_types()
+
+    party = target.Party(**{'uuid': 'ff47836c-877c-4007-bbf3-c9d9bd805000', 'party-name': 'TEST', 'type': 'person'})
+    element.set_at(ElementPath('target-definition.metadata.parties'), [party])
+    assert element.get_type_index() is not type_index
+    assert element.get_type_index().get_instances(target.Party) == [party]
+
+    # direct assignments to the model are detected as well
+    type_index = element.get_type_index()
+    sample_target_def.metadata.parties = []
+    assert type_index.is_stale()
+    assert element.get_type_index().get(target.Party) == []
+
+
+def test_element_key_selector(sample_target_def: target.TargetDefinition):
+    """Test getting and setting list items by the value of a key field."""
+    element = Element(sample_target_def)
+    parties = [
+        target.Party(**{
+            'uuid': 'ff47836c-877c-4007-bbf3-c9d9bd805000', 'party-name': 'TEST1', 'type': 'organization'
+        }),
+        target.Party(**{
+            'uuid': 'ee88836c-877c-4007-bbf3-c9d9bd805000', 'party-name': 'TEST2', 'type': 'organization'
+        })
+    ]
+    sample_target_def.metadata.parties = parties
+    first, second = sample_target_def.metadata.parties
+    party_path = ElementPath('target-definition.metadata.parties[uuid=ee88836c-877c-4007-bbf3-c9d9bd805000]')
+    assert party_path.get_preceding_path() == ElementPath('target-definition.metadata')
+    assert element.get_at(party_path) is second
+    assert element.get_at(ElementPath(f'{party_path}.party-name')) == second.party_name
+    assert element.get_at(ElementPath('target-definition.metadata.parties[uuid=missing]')) is None
+    assert element.get_at(ElementPath('target-definition.metadata[uuid=missing]')) is None
+    assert element.get_key_position(party_path) == 1
+
+    # replace, remove and append by key
+    new_party = target.Party(**{'uuid': second.uuid, 'party-name': 'TEST3', 'type': 'person'})
+    element.set_at(party_path, new_party)
+    assert sample_target_def.metadata.parties == [first, new_party]
+    element.set_at(party_path, None)
+    assert sample_target_def.metadata.parties == [first]
+    assert element.get_at(party_path) is None
+    element.set_at(party_path, new_party)
+    assert element.get_at(party_path) is new_party
+    element.set_at(party_path, None)
+    element.set_at(party_path, new_party, 0)
+    assert sample_target_def.metadata.parties == [new_party, first]
+
+    # in-place changes to the list are picked up
+    sample_target_def.metadata.parties.reverse()
+    assert element.get_at(party_path) is new_party
+    sample_target_def.metadata.parties.pop()
+    assert element.get_at(party_path) is None
+
+    # in-place replacements of items are picked up
+    sample_target_def.metadata.parties[0] = new_party
+    assert element.get_at(party_path) is new_party
+    sample_target_def.metadata.parties.append(first)
+    other_path = ElementPath(f'target-definition.metadata.parties[uuid={first.uuid}]')
+
+    # replacing an item with a new key exposes the next item with the old key
+    duplicate = target.Party(**{'uuid': first.uuid, 'party-name': 'TEST4', 'type': 'person'})
+    sample_target_def.metadata.parties.append(duplicate)
+    assert element.get_at(other_path) is first
+    element.set_at(other_path, new_party)
+    assert element.get_at(other_path) is duplicate
+
+    with pytest.raises(TrestleError):
+        element.set_at(ElementPath('target-definition.metadata.title[uuid=missing]'), new_party)
+    with pytest.raises(TrestleError):
+        element.set_at(party_path, target.Role(id='role', title='Role'))
+    assert sample_target_def.metadata.parties == [new_party, new_party, duplicate]
+
+
+def test_element_key_selector_path():
+    """Test parsing element paths with key selectors."""
+    element_path = ElementPath('catalog.groups[id=ac].controls[id=ac-2.1].parts')
+    assert element_path.get() == ['catalog', 'groups[id=ac]', 'controls[id=ac-2.1]', 'parts']
+    assert ElementPath.parse_key_selector('controls[id=ac-2.1]') == ('controls', 'id', 'ac-2.1')
+    assert ElementPath.parse_key_selector('controls') is None
+
+    for invalid_path in ['catalog.groups[id=ac', 'catalog.groups[id].controls', 'catalog.groups]']:
+        with pytest.raises(TrestleError):
+            ElementPath(invalid_path)
+
+
 def test_element_str(sample_target_def):
     """Test for magic method str."""
     element = Element(sample_target_def)
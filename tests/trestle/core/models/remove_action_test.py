@@ -62,3 +62,18 @@ def test_remove_action(sample_target_def):
     rac.rollback()
 
     assert element.get_at(sub_element_path) == prev_sub_element
+
+
+def test_remove_action_by_key(sample_target_def):
+    """Test remove action of a list item selected by key."""
+    element = prepare_element(sample_target_def)
+    parties = list(element.get_at(ElementPath('target-definition.metadata.parties')))
+    sub_element_path = ElementPath('target-definition.metadata.parties[uuid=ff47836c-877c-4007-bbf3-c9d9bd805000]')
+
+    rac = RemoveAction(element, sub_element_path)
+    rac.execute()
+    assert element.get_at(sub_element_path) is None
+    assert sample_target_def.metadata.parties == parties[1:]
+
+    rac.rollback()
+    assert sample_target_def.metadata.parties == parties
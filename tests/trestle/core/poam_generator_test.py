@@ -0,0 +1,168 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+"""Tests for trestle poam_generator module."""
+
+import copy
+import pathlib
+import uuid
+from typing import Any, Dict
+
+import pytest
+
+from tests import test_utils
+
+from trestle.core.err import TrestleError
+from trestle.core.poam_generator import PoamGenerator, generate_poam, to_poam_item
+from trestle.oscal import poam
+from trestle.utils import fs
+
+RESULTS_FILE = test_utils.JSON_TEST_DATA_PATH / 'sample-assessment-results.json'
+
+PARTY_UUID = '2f3b7c1e-5d8a-4e6b-9c0d-1a2b3c4d5e6f'
+LOCATION_UUID = '7a8b9c0d-1e2f-4a3b-8c5d-6e7f8a9b0c1d'
+
+
+def _load_results() -> Dict[str, Any]:
+    data = fs.load_file(str(RESULTS_FILE))
+    metadata = data['assessment-results']['metadata']
+    metadata['parties'] = [
+        {
+            'uuid': PARTY_UUID, 'type': 'person', 'party-name': 'Assessor', 'location-uuids': [LOCATION_UUID]
+        }, {
+            'uuid': str(uuid.uuid4()), 'type': 'person', 'party-name': 'Unrelated'
+        }
+    ]
+    metadata['locations'] = [{'uuid': LOCATION_UUID, 'address': {'city': 'Springfield'}}]
+    return data
+
+
+def _with_new_uuids(finding: Dict[str, Any]) -> Dict[str, Any]:
+    finding = copy.deepcopy(finding)
+    finding['uuid'] = str(uuid.uuid4())
+    for nested in (finding.get('observations') or []) + (finding.get('risks') or []):
+        nested['uuid'] = str(uuid.uuid4())
+    return finding
+
+
+def test_to_poam_item():
+    """Test that only unsatisfied findings or findings with open risks become items with their open risks."""
+    findings = _load_results()['assessment-results']['results_group']['findings']
+    password, audit, _ = findings
+    item = to_poam_item(password)
+    assert item['title'] == password['title']
+    assert item['uuid'] != password['uuid']
+    assert to_poam_item(password)['uuid'] == item['uuid']
+    # the same finding in other assessment results gives another item
+    assert to_poam_item(password, str(uuid.uuid4()))['uuid'] != item['uuid']
+    assert [risk['risk-status'] for risk in item['risks']] == ['open']
+    assert to_poam_item(audit) is None
+
+    closed = copy.deepcopy(password)
+    closed['risks'][0]['risk-status'] = 'closed'
+    assert 'risks' not in to_poam_item(closed)
+    audit_with_risk = dict(audit, risks=password['risks'])
+    assert to_poam_item(audit_with_risk)['risks'] == password['risks']
+
+
+def test_poam_generator(tmp_path: pathlib.Path):
+    """Test generating a POA&M with the definitions referenced by its items."""
+    data = _load_results()
+    findings = data['assessment-results']['results_group']['findings']
+    findings[0]['party-uuids'] = [PARTY_UUID]
+    findings[2]['risks'] = [
+        dict(findings[0]['risks'][0], uuid=str(uuid.uuid4()), **{'party-uuids': [str(uuid.uuid4())]})
+    ]
+
+    output = tmp_path / 'poam.json'
+    with PoamGenerator('Open items') as generator:
+        assert generator.add_data(data, 'results.json') == 2
+        generator.write(output)
+        stats = generator.get_stats()
+    assert stats == {'files': 1, 'findings': 3, 'items': 2, 'unresolved': 1}
+
+    generated = poam.PlanOfActionAndMilestones.oscal_read(output)
+    assert generated.metadata.title.__root__ == 'Open items'
+    assert [party.uuid for party in generated.metadata.parties] == [PARTY_UUID]
+    assert [location.uuid for location in generated.metadata.locations] == [LOCATION_UUID]
+    items = generated.poam_items.poam_item_group
+    assert [item.title.__root__ for item in items] == ['Weak password policy', 'Open SSH port']
+    assert str(generated.poam_items.start.__root__.date()) == '2021-02-01'
+
+    # the uuids only depend on the findings the items are generated from
+    generate_poam([RESULTS_FILE], tmp_path / 'again.json')
+    again = poam.PlanOfActionAndMilestones.oscal_read(tmp_path / 'again.json')
+    assert again.uuid == generated.uuid
+    assert [item.uuid for item in again.poam_items.poam_item_group] == [item.uuid for item in items]
+
+
+def test_poam_generator_scale(tmp_path: pathlib.Path):
+    """Test generating a POA&M with many items from several files."""
+    data = _load_results()
+    results = data['assessment-results']['results_group']
+    template = results['findings'][2]
+    with PoamGenerator() as generator:
+        for run in range(4):
+            results['findings'] = [_with_new_uuids(template) for _ in range(500)]
+            generator.add_data(data, f'run{run}.json')
+        generator.write(tmp_path / 'poam.json')
+    generated = poam.PlanOfActionAndMilestones.oscal_read(tmp_path / 'poam.json')
+    assert len(generated.poam_items.poam_item_group) == 2000
+
+
+def test_poam_generator_failures(tmp_path: pathlib.Path):
+    """Test the failures of the generation."""
+    with PoamGenerator() as generator:
+        with pytest.raises(TrestleError):
+            generator.write(tmp_path / 'poam.json')
+        with pytest.raises(TrestleError):
+            generator.add_data({'catalog': {}}, 'catalog.json')
+        generator.add_file(RESULTS_FILE)
+        with pytest.raises(TrestleError):
+            generator.write(tmp_path / 'poam.yaml')
+
+        data = _load_results()
+        del data['assessment-results']['results_group']['findings'][0]['title']
+        with pytest.raises(TrestleError):
+            generator.add_data(data, 'invalid.json')
+
+    # the same findings in a copy of assessment results would give the same items
+    with PoamGenerator() as generator:
+        data = _load_results()
+        generator.add_data(data, 'results.json')
+        with pytest.raises(TrestleError):
+            generator.add_data(data, 'copy.json')
+        # the observations and risks of the findings of other results would still be repeated
+        data['assessment-results']['uuid'] = str(uuid.uuid4())
+        with pytest.raises(TrestleError):
+            generator.add_data(data, 'other.json')
+        findings = data['assessment-results']['results_group']['findings']
+        # a failed file adds no item, even when its first items are valid
+        findings[0] = _with_new_uuids(findings[0])
+        with pytest.raises(TrestleError):
+            generator.add_data(data, 'other.json')
+        assert generator.get_stats() == {'files': 1, 'findings': 3, 'items': 2}
+        data['assessment-results']['results_group']['findings'] = [_with_new_uuids(f) for f in findings]
+        assert generator.add_data(data, 'other.json') == 2
+        generator.write(tmp_path / 'poam.json')
+    assert len(poam.PlanOfActionAndMilestones.oscal_read(tmp_path / 'poam.json').poam_items.poam_item_group) == 4
+
+    # the whole POA&M is validated, including the definitions copied into its metadata
+    with PoamGenerator() as generator:
+        data = _load_results()
+        data['assessment-results']['results_group']['findings'][0]['party-uuids'] = [PARTY_UUID]
+        del data['assessment-results']['metadata']['parties'][0]['type']
+        generator.add_data(data, 'results.json')
+        with pytest.raises(TrestleError):
+            generator.write(tmp_path / 'poam.json')
@@ -0,0 +1,247 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+"""Tests for trestle profile_resolver module."""
+
+import json
+import pathlib
+from typing import Any, Dict
+from unittest.mock import patch
+
+import pytest
+
+from tests import test_utils
+
+from trestle.core.commands import cmd_utils
+from trestle.core.err import TrestleError
+from trestle.core.profile_resolver import ProfileResolver
+from trestle.utils import fs
+from trestle.utils.cache import DiskCache
+
+METADATA = {'title': 'Test', 'last-modified': '2020-01-01T00:00:00+00:00', 'version': '1', 'oscal-version': '1.0.0'}
+
+CATALOG = {
+    'catalog': {
+        'uuid': 'ff47836c-877c-4007-bbf3-c9d9bd805001',
+        'metadata': METADATA,
+        'groups': [
+            {
+                'id': 'ac',
+                'title': 'Access Control',
+                'controls': [
+                    {
+                        'id': 'ac-1',
+                        'title': 'Policy',
+                        'parameters': [{
+                            'id': 'ac-1_prm_1', 'label': 'frequency'
+                        }],
+                        'parts': [
+                            {
+                                'id': 'ac-1_smt', 'name': 'statement', 'prose': 'Review the policy.'
+                            }, {
+                                'id': 'ac-1_gdn', 'name': 'guidance', 'prose': 'Guidance.'
+                            }
+                        ]
+                    },
+                    {
+                        'id': 'ac-2',
+                        'title': 'Account Management',
+                        'controls': [{
+                            'id': 'ac-2.1', 'title': 'Automated'
+                        }, {
+                            'id': 'ac-2.2', 'title': 'Removal'
+                        }]
+                    }
+                ]
+            }, {
+                'id': 'au', 'title': 'Audit', 'controls': [{
+                    'id': 'au-1', 'title': 'Audit Policy'
+                }]
+            }
+        ]
+    }
+}
+
+
+def write_profile(path: pathlib.Path, imports, **kwargs: Any) -> pathlib.Path:
+    """Write a profile with the imports and other fields to a JSON file."""
+    content: Dict[str, Any] = {
+        'uuid': '3ae6cabe-4976-43e4-b921-11c34b432b51', 'metadata': METADATA, 'imports': imports, **kwargs
+    }
+    path.write_text(json.dumps({'profile': content}))
+    return path
+
+
+def test_resolve_flat(tmp_dir):
+    """Test that selected controls are resolved into a flat list of controls."""
+    (tmp_dir / 'catalog.json').write_text(json.dumps(CATALOG))
+    include = {'id-selectors': [{'control-id': 'ac-2', 'with-child-controls': 'yes'}, {'control-id': 'au-1'}]}
+    exclude = {'id-selectors': [{'control-id': 'ac-2.2'}]}
+    path = write_profile(tmp_dir / 'profile.json', [{'href': 'catalog.json', 'include': include, 'exclude': exclude}])
+
+    cat = ProfileResolver().resolve(path)
+    assert [control.id for control in cat.controls] == ['ac-2', 'ac-2.1', 'au-1']
+    assert all(control.controls is None for control in cat.controls)
+    assert cat.groups is None
+    assert cat.metadata.title.__root__ == 'Test'
+    assert ProfileResolver().resolve(path).uuid == cat.uuid
+
+    # resolved catalogs are cached in the trestle project of the profile
+    test_utils.ensure_trestle_config_dir(tmp_dir)
+    assert ProfileResolver.for_project(path).resolve(path) == cat
+    assert (tmp_dir / '.trestle' / 'cache' / 'profile').is_dir()
+
+
+def test_resolve_nested(tmp_dir):
+    """Test that nested profiles are merged as is and modified, and that imports are memoized and cached."""
+    (tmp_dir / 'catalog.json').write_text(json.dumps(CATALOG))
+    write_profile(
+        tmp_dir / 'base.json', [{
+            'href': 'catalog.json', 'include': {
+                'pattern-selectors': [{
+                    'pattern': 'ac-.*'
+                }]
+            }
+        }],
+        merge={'as-is': True}
+    )
+    modify = {
+        'parameter-settings': {
+            'ac-1_prm_1': {
+                'value': 'yearly'
+            }
+        },
+        'alterations': [
+            {
+                'control-id': 'ac-1',
+                'removals': [{
+                    'name-ref': 'guidance'
+                }],
+                'additions': [
+                    {
+                        'properties': [{
+                            'name': 'status', 'value': 'new'
+                        }]
+                    }, {
+                        'id-ref': 'ac-1_smt', 'position': 'before', 'parts': [{
+                            'name': 'objective', 'prose': 'Goal.'
+                        }]
+                    }
+                ]
+            }
+        ]
+    }
+    path = write_profile(
+        tmp_dir / 'profile.json',
+        [{
+            'href': 'base.json', 'exclude': {
+                'id-selectors': [{
+                    'control-id': 'ac-2.1'
+                }]
+            }
+        }, {
+            'href': 'catalog.json'
+        }],
+        merge={'as-is': True},
+        modify=modify
+    )
+
+    cache = DiskCache(tmp_dir / 'cache', 'profile')
+    resolver = ProfileResolver(cache)
+    cat = resolver.resolve(path)
+    assert [group.id for group in cat.groups] == ['ac', 'ac', 'au']
+    ac_1, ac_2 = cat.groups[0].controls
+    assert [control.id for control in ac_2.controls] == ['ac-2.2']
+    # controls imported from the base profile are not imported again from the catalog
+    assert [control.id for control in cat.groups[1].controls] == ['ac-2.1']
+    assert ac_1.parameters[0].value.__root__ == 'yearly'
+    assert [(part.name, part.id) for part in ac_1.parts] == [('objective', None), ('statement', 'ac-1_smt')]
+    assert [prop.name for prop in ac_1.properties] == ['status']
+    assert resolver.get_stats() == {'loaded': 1, 'resolved': 2, 'memo_hits': 1}
+
+    assert resolver.resolve(path) is cat
+    resolver = ProfileResolver(cache)
+    assert resolver.resolve(path) == cat
+    assert resolver.get_stats() == {'loaded': 0, 'resolved': 0, 'memo_hits': 0}
+
+    # a resolved catalog in the disk cache is found without loading any file
+    with patch.object(fs, 'load_file', side_effect=AssertionError):
+        with patch.object(cmd_utils, 'get_model', side_effect=AssertionError):
+            assert ProfileResolver(cache).resolve(path) == cat
+
+    # a change in an imported file changes the resolution
+    write_profile(tmp_dir / 'base.json', [{'href': 'catalog.json', 'include': {'all': {}}}])
+    assert resolver.resolve(path) != cat
+    assert resolver.get_stats()['resolved'] == 2
+
+
+def test_resolve_back_matter_import(tmp_dir):
+    """Test that an import can reference a back-matter resource of the profile."""
+    (tmp_dir / 'catalog.json').write_text(json.dumps(CATALOG))
+    resource_uuid = 'a9d85b3c-62e2-4b87-8a1c-9d8e3a0cb2a1'
+    back_matter = {'resources': [{'uuid': resource_uuid, 'rlinks': [{'href': 'catalog.json'}]}]}
+    path = write_profile(tmp_dir / 'profile.json', [{'href': f'#{resource_uuid}'}], back_matter=back_matter)
+    cat = ProfileResolver().resolve(path)
+    assert [control.id for control in cat.controls] == ['ac-1', 'ac-2', 'ac-2.1', 'ac-2.2', 'au-1']
+    assert cat.back_matter.resources[0].uuid == resource_uuid
+
+
+def test_resolve_failures(tmp_dir):
+    """Test the failures of profile resolution."""
+    (tmp_dir / 'catalog.json').write_text(json.dumps(CATALOG))
+    failing_profiles = [
+        ([{
+            'href': 'missing.json'
+        }], {}),
+        ([{
+            'href': 'https://example.com/catalog.json'
+        }], {}),
+        ([{
+            'href': '#a9d85b3c-62e2-4b87-8a1c-9d8e3a0cb2a1'
+        }], {}),
+        ([{
+            'href': 'catalog.json'
+        }], {
+            'merge': {
+                'custom': {}
+            }
+        }),
+        ([{
+            'href': 'catalog.json'
+        }], {
+            'modify': {
+                'alterations': [{
+                    'control-id': 'xx-1'
+                }]
+            }
+        }),
+        ([{
+            'href': 'catalog.json'
+        }], {
+            'modify': {
+                'parameter-settings': {
+                    'xx-1_prm_1': {
+                        'value': 'x'
+                    }
+                }
+            }
+        }),
+        ([{
+            'href': 'profile.json'
+        }], {}),
+    ]
+    for imports, kwargs in failing_profiles:
+        path = write_profile(tmp_dir / 'profile.json', imports, **kwargs)
+        with pytest.raises(TrestleError):
+            ProfileResolver().resolve(path)
@@ -0,0 +1,121 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for trestle query module."""
+
+import pytest
+
+import trestle.oscal.catalog as catalog
+from trestle.core.err import TrestleError
+from trestle.core.models.elements import Element, ElementPath
+from trestle.core.query import Query, query
+
+
+def paths(results):
+    """Return the paths of query results."""
+    return [path for _, path in results]
+
+
+def test_query_steps(sample_catalog):
+    """Test the steps of a query."""
+    groups = list(query(sample_catalog, 'catalog.groups'))
+    assert [group for group, _ in groups] == sample_catalog.groups
+    assert paths(groups)[1] == 'catalog.groups.1'
+
+    assert list(query(sample_catalog, 'catalog.groups.1')) == [groups[1]]
+    assert list(query(sample_catalog, 'catalog.groups.1000')) == []
+    assert list(query(sample_catalog, 'profile.groups')) == []
+
+    titles = list(query(sample_catalog, 'catalog.metadata.*'))
+    assert titles[0] == (sample_catalog.metadata.title, 'catalog.metadata.title')
+
+    # results can be addressed again with their element path
+    for value, path in query(sample_catalog, 'catalog.groups.controls.parameters'):
+        assert Element(sample_catalog).get_at(ElementPath(path)) is value
+
+
+def test_query_predicates(sample_catalog):
+    """Test predicates on values, nested queries and descendants."""
+    results = list(query(sample_catalog, 'catalog.groups[id=ac].controls[id=ac-2]'))
+    assert len(results) == 1
+    assert results[0][0].id == 'ac-2'
+
+    # the name and value conditions hold for the same property
+    labelled = list(query(sample_catalog, 'catalog.groups.controls[properties[name=label][value=AC-2]]'))
+    assert [control.id for control, _ in labelled] == ['ac-2']
+    assert list(query(sample_catalog, 'catalog.groups.controls[properties[name=sort-id][value=AC-2]]')) == []
+
+    enhancements = list(query(sample_catalog, 'catalog.**.controls.controls[id~^ac-2\\.]'))
+    assert enhancements
+    assert all(control.id.startswith('ac-2.') for control, _ in enhancements)
+    assert paths(query(sample_catalog, '**[id="ac-2.1"]')) == [path for _, path in enhancements[:1]]
+
+    not_ac = list(query(sample_catalog, 'catalog.groups[id!=ac]'))
+    assert len(not_ac) == len(sample_catalog.groups) - 1
+    assert all(isinstance(group, catalog.Group) for group, _ in not_ac)
+
+
+def test_query_indexes(sample_catalog):
+    """Test that queries on an element give the same results as on the model."""
+    element = Element(sample_catalog)
+    for query_string in ['catalog.**.controls[id=ac-2].title', '**.parameters[id=ac-2_prm_1]', 'catalog.groups[id=ac]']:
+        expected = paths(query(sample_catalog, query_string))
+        assert expected
+        assert paths(Query(query_string).evaluate(element)) == expected
+        assert paths(Query(query_string).evaluate(element)) == expected
+
+
+def test_query_duplicate_keys(sample_catalog):
+    """Test that queries on an element select all the items with a duplicated id, as on the model."""
+    duplicated = sample_catalog.copy(deep=True)
+    duplicated.groups.append(duplicated.groups[0].copy(deep=True))
+    element = Element(duplicated)
+    expected = paths(query(duplicated, 'catalog.groups[id=ac]'))
+    assert expected == ['catalog.groups.0', f'catalog.groups.{len(duplicated.groups) - 1}']
+    assert paths(Query('catalog.groups[id=ac]').evaluate(element)) == expected
+    assert paths(Query('catalog.groups[id=ac]').evaluate(element)) == expected
+
+    # the key index is kept up to date when an item with a duplicated id is appended
+    other_id = duplicated.groups[1].id
+    assert len(paths(Query(f'catalog.groups[id={other_id}]').evaluate(element))) == 1
+    element.set_at(ElementPath('catalog.groups[id=new]'), duplicated.groups[1].copy(deep=True))
+    assert len(paths(Query(f'catalog.groups[id={other_id}]').evaluate(element))) == 2
+
+
+def test_query_interleaved(sample_catalog):
+    """Test that evaluations of one query against different targets do not interfere."""
+    other = sample_catalog.copy(deep=True)
+    other.groups = other.groups[1:]
+    controls = Query('catalog.**.controls[id~^ac-2]')
+    expected = paths(controls.evaluate(sample_catalog))
+    other_expected = paths(controls.evaluate(other))
+    assert expected
+    assert other_expected != expected
+
+    first = controls.evaluate(Element(sample_catalog))
+    second = controls.evaluate(Element(other))
+    results = [next(first)]
+    other_results = list(second)
+    results.extend(first)
+    assert paths(results) == expected
+    assert paths(other_results) == other_expected
+
+
+def test_query_invalid():
+    """Test errors on invalid queries."""
+    for query_string in ['catalog.groups[id=ac', 'catalog..groups', 'catalog.groups[id~(]', 'catalog.gro*ups',
+                         '[id=1]']:
+        with pytest.raises(TrestleError):
+            Query(query_string)
@@ -0,0 +1,62 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for trestle references module."""
+
+import uuid
+
+import trestle.oscal.poam as poam
+import trestle.oscal.target as ostarget
+from trestle.core.references import ReferenceIndex
+
+
+def test_reference_index(sample_target_def):
+    """Test that definitions and references are indexed in a single pass."""
+    party_uuid = sample_target_def.metadata.parties[0].uuid
+    dangling_uuid = str(uuid.uuid4())
+    metadata = sample_target_def.metadata
+    metadata.roles = [ostarget.Role(id='maintainer', title='Maintainer'), ostarget.Role(id='spare', title='Spare')]
+    metadata.responsible_parties = {
+        'maintainer': ostarget.ResponsibleParty(party_uuids=[ostarget.PartyUuid(__root__=party_uuid)]),
+        'creator': ostarget.ResponsibleParty(party_uuids=[ostarget.PartyUuid(__root__=dangling_uuid)])
+    }
+
+    index = ReferenceIndex.build(sample_target_def)
+    assert index.is_defined('party', party_uuid)
+    assert index.is_defined('role', 'maintainer')
+    assert index.get_definitions('role', 'maintainer') == ['metadata.roles.0']
+    assert index.get_references('party', party_uuid) == ['metadata.responsible-parties.maintainer']
+    assert index.get_references('role', 'creator') == ['metadata']
+
+    dangling = sorted(index.get_dangling_references())
+    assert dangling == [
+        ('party', dangling_uuid, ['metadata.responsible-parties.creator']), ('role', 'creator', ['metadata'])
+    ]
+    assert index.get_unused_definitions() == [('role', 'spare', ['metadata.roles.1'])]
+
+
+def test_reference_index_uuid_ref(sample_target_def):
+    """Test that `uuid-ref` references resolve to any uuid and mark it as used."""
+    party_uuid = sample_target_def.metadata.parties[0].uuid
+    index = ReferenceIndex.build(sample_target_def)
+    assert index.get_unused_definitions() == [('party', party_uuid, ['metadata.parties.0'])]
+
+    index.visit(poam.SubjectReference(uuid_ref=party_uuid, type='party'), 'subject')
+    assert index.get_unused_definitions() == []
+    assert index.get_dangling_references() == []
+
+    dangling_uuid = str(uuid.uuid4())
+    index.visit(poam.SubjectReference(uuid_ref=dangling_uuid, type='party'), 'other-subject')
+    assert index.get_dangling_references() == [('*', dangling_uuid, ['other-subject'])]
@@ -0,0 +1,96 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+"""Tests for trestle renderer module."""
+
+import pytest
+
+from trestle.core.err import TrestleError
+from trestle.core.renderer import CatalogRenderer, ParamIndex, Template
+from trestle.oscal import catalog
+from trestle.oscal import profile
+
+
+def make_catalog() -> catalog.Catalog:
+    """Make a catalog with prose referencing parameters, including a parameter invoked by a choice."""
+    params = [
+        catalog.Param(id='p1', label='personnel'),
+        catalog.Param(id='p2', select={
+            'how-many': 'one', 'alternatives': ['yearly', ' {{ insert: param, p3 }} ']
+        }),
+        catalog.Param(id='p3', depends_on='p2', label='frequency'),
+        catalog.Param(id='p4', value='the CISO'),
+    ]
+    parts = [
+        catalog.Part(
+            id='c-1_smt',
+            name='statement',
+            prose='Inform {{ p1 }} and {{p4}}:',
+            parts=[catalog.Part(id='c-1_smt.a', name='item', prose='Review {{ p2 }}; keep {{ p9 }}.')]
+        ),
+        catalog.Part(id='c-1_gdn', name='guidance', prose='No parameters.')
+    ]
+    control = catalog.Control(id='c-1', title='Control', parameters=params, parts=parts)
+    group = catalog.Group(id='g', title='Group', controls=[control])
+    metadata = {'title': 'Test', 'last-modified': '2020-01-01T00:00:00+00:00', 'version': '1', 'oscal-version': '1'}
+    return catalog.Catalog(uuid='ff47836c-877c-4007-bbf3-c9d9bd805002', metadata=metadata, groups=[group])
+
+
+def test_template():
+    """Test that prose is compiled into literal text and parameter ids."""
+    template = Template('a {{ x }} b {{ insert: param, y.1 }}')
+    assert template.get_param_ids() == ['x', 'y.1']
+    assert template.render({'x': '1', 'y.1': '2'}) == 'a 1 b 2'
+    assert template.render({}) == 'a {{ x }} b {{ y.1 }}'
+    assert Template('plain').render({}) == 'plain'
+
+
+def test_catalog_renderer():
+    """Test the rendering of the prose of all parts of a catalog."""
+    cat = make_catalog()
+    renderer = CatalogRenderer(cat)
+    rendered = list(renderer.iter_prose())
+    assert [(prose.control_id, prose.part_id, prose.depth)
+            for prose in rendered] == [('c-1', 'c-1_smt', 0), ('c-1', 'c-1_smt.a', 1), ('c-1', 'c-1_gdn', 0)]
+    assert rendered[0].text == 'Inform [Assignment: personnel] and the CISO:'
+    assert rendered[1].text == 'Review [Selection (one): yearly; [Assignment: frequency]]; keep {{ p9 }}.'
+    assert renderer.render_control(cat.groups[0].controls[0]).splitlines() == [
+        rendered[0].text, '  ' + rendered[1].text, 'No parameters.'
+    ]
+    assert list(renderer.iter_prose()) == rendered
+
+
+def test_catalog_renderer_settings():
+    """Test that parameter settings override the fields of the parameters of the catalog."""
+    settings = {'p2': profile.SetParameter(value='monthly'), 'p1': profile.SetParameter(label='staff')}
+    renderer = CatalogRenderer(make_catalog(), settings)
+    texts = [prose.text for prose in renderer.iter_prose()]
+    assert texts[:2] == ['Inform [Assignment: staff] and the CISO:', 'Review monthly; keep {{ p9 }}.']
+
+    settings = {'p3': profile.SetParameter(value='weekly')}
+    assert CatalogRenderer(make_catalog(),
+                           settings).get_param_index().get_text('p2') == '[Selection (one): yearly; weekly]'
+
+
+def test_param_index_cycle():
+    """Test that a cycle of parameters invoked by choices is an error."""
+    params = {
+        'a': catalog.Param(id='a', select={'alternatives': ['{{ b }}']}),
+        'b': catalog.Param(id='b', depends_on='a', select={'alternatives': ['{{ a }}']})
+    }
+    index = ParamIndex(params)
+    assert 'a' in index and 'c' not in index
+    assert index.get_text('c') is None
+    with pytest.raises(TrestleError):
+        index.get_text('a')
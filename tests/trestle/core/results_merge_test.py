@@ -0,0 +1,108 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+"""Tests for trestle results_merge module."""
+
+import copy
+import uuid
+from typing import Any, Dict
+
+import pytest
+
+from tests import test_utils
+
+from trestle.core.err import TrestleError
+from trestle.core.results_merge import ResultsMerger, fingerprint
+from trestle.utils import fs
+
+RESULTS_FILE = test_utils.JSON_TEST_DATA_PATH / 'sample-assessment-results.json'
+
+
+def make_rerun(data: Dict[str, Any], day: int) -> Dict[str, Any]:
+    """Return a rerun of assessment results on another day, with new uuids and times but the same findings."""
+    rerun = copy.deepcopy(data)
+    results = rerun['assessment-results']['results_group']
+    results['uuid'] = str(uuid.uuid4())
+    results['start'] = f'2021-02-{day:02}T06:00:00+00:00'
+    results['end'] = f'2021-02-{day:02}T06:30:00+00:00'
+    for finding in results['findings']:
+        finding['uuid'] = str(uuid.uuid4())
+        finding['collected'] = results['start']
+        for observation in finding['observations']:
+            observation['uuid'] = str(uuid.uuid4())
+    return rerun
+
+
+def test_fingerprint():
+    """Test that fingerprints ignore uuids, times, key order and excluded keys."""
+    finding = {'uuid': 'a', 'title': 'x', 'collected': '1', 'risks': [{'uuid': 'b', 'title': 'y'}], 'observations': []}
+    same = {'title': 'x', 'risks': [{'title': 'y', 'uuid': 'c'}], 'uuid': 'd', 'observations': [{'title': 'z'}]}
+    assert fingerprint(finding, ['observations']) == fingerprint(same, ['observations'])
+    assert fingerprint(finding) != fingerprint(same)
+    assert fingerprint(dict(finding, title='other'), ['observations']) != fingerprint(finding, ['observations'])
+
+
+def test_results_merge():
+    """Test merging reruns with duplicate, changed and new findings."""
+    first = fs.load_file(str(RESULTS_FILE))
+    second = make_rerun(first, 2)
+    findings = second['assessment-results']['results_group']['findings']
+    new_observation = dict(findings[0]['observations'][0], uuid=str(uuid.uuid4()), title='Password history scanned')
+    findings[0]['observations'].append(new_observation)
+    findings[2]['description'] = 'Port 22 is reachable from the internal network only.'
+    third = make_rerun(first, 3)
+    del third['assessment-results']['results_group']['findings'][1:]
+
+    merger = ResultsMerger()
+    merger.add_data(second, 'second.json')
+    merger.add_data(first, 'first.json')
+    merger.add_data(third, 'third.json')
+    assert merger.get_stats() == {
+        'files': 3, 'findings': 7, 'observations': 8, 'distinct-findings': 4, 'distinct-observations': 5
+    }
+
+    merged = merger.get_result()
+    results = merged.results_group
+    assert str(results.start.__root__.date()) == '2021-02-01'
+    assert str(results.end.__root__.date()) == '2021-02-03'
+    assert [finding.title.__root__ for finding in results.findings] == [
+        'Weak password policy', 'Audit logging enabled', 'Open SSH port', 'Open SSH port'
+    ]
+    password = results.findings[0]
+    assert password.uuid == third['assessment-results']['results_group']['findings'][0]['uuid']
+    assert str(password.collected.__root__.date()) == '2021-02-03'
+    titles = [observation.title.__root__ for observation in password.observations]
+    assert titles == ['Password settings scanned', 'Password history scanned']
+
+    provenance = merger.get_provenance()
+    assert [source['file'] for source in provenance[password.uuid]] == ['second.json', 'first.json', 'third.json']
+    assert [source['file'] for source in provenance[results.findings[1].uuid]] == ['second.json', 'first.json']
+
+    # the merged uuids only depend on the distinct findings
+    again = ResultsMerger()
+    again.add_data(first, 'first.json')
+    again.add_data(third, 'third.json')
+    again.add_data(second, 'second.json')
+    assert again.get_result().uuid == merged.uuid
+
+
+def test_results_merge_failures():
+    """Test that only assessment results with results can be merged."""
+    merger = ResultsMerger()
+    with pytest.raises(TrestleError):
+        merger.get_result()
+    with pytest.raises(TrestleError):
+        merger.add_data({'catalog': {}}, 'catalog.json')
+    with pytest.raises(TrestleError):
+        merger.add_data({'assessment-results': {'uuid': str(uuid.uuid4())}}, 'empty.json')
@@ -0,0 +1,42 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+"""Tests for trestle search module."""
+
+from trestle.core import search
+from trestle.oscal import catalog
+
+
+def test_tokenize():
+    """Test that text is split into lower case terms without punctuation and stop words."""
+    assert search.tokenize('The Account-Management of AC-2(1).') == ['account', 'management', 'ac', '2', '1']
+    assert search.tokenize(' -- ') == []
+
+
+def test_get_document():
+    """Test that the prose of an element is weighted by field."""
+    part = catalog.Part(name='statement', title='Audit Review', prose='Review the audit records.')
+    title, terms, length = search.get_document(part)
+    assert title == 'Audit Review'
+    assert terms == {'audit': 3, 'review': 3, 'records': 1}
+    assert length == 7
+    assert search.get_document(catalog.Part(name='item')) == (None, {}, 0)
+
+
+def test_rank():
+    """Test that documents matching more and rarer terms rank higher."""
+    postings = {'audit': [('a', 1, 4), ('b', 1, 4), ('c', 2, 4)], 'retention': [('a', 1, 4)]}
+    scores = search.rank(postings, 10, 4.0)
+    assert scores['a'] > scores['c'] > scores['b']
+    assert search.rank({}, 10, 4.0) == {}
@@ -0,0 +1,124 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+"""Tests for trestle stats module."""
+
+import json
+import pathlib
+from typing import Any, Dict
+
+import pytest
+
+from trestle.core.err import TrestleError
+from trestle.core.stats import Stats, collect_files
+
+
+def _risk(status: str, likelihood: str) -> Dict[str, Any]:
+    return {'risk-status': status, 'risk-metrics': [{'name': 'likelihood', 'STRVALUE': likelihood}]}
+
+
+def _observation(*methods: str) -> Dict[str, Any]:
+    return {'observation-methods': list(methods), 'observation-types': ['finding']}
+
+
+def _finding(result: str, *risks: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'objective-status': {
+            'result': {
+                'STRVALUE': result
+            }
+        },
+        'observations': [_observation('TEST', 'EXAMINE')],
+        'risks': list(risks)
+    }
+
+
+def make_results(count: int) -> Dict[str, Any]:
+    """Make raw assessment results with the given number of findings of each kind."""
+    findings = [_finding('satisfied'), _finding('not-satisfied', _risk('open', 'high'))] * count
+    return {'assessment-results': {'results-group': {'findings': findings}}}
+
+
+def make_poam() -> Dict[str, Any]:
+    """Make a raw plan of action and milestones with two items."""
+    items = [
+        {
+            'observations': [_observation('TEST')], 'risks': [_risk('closed', 'low')]
+        }, {
+            'objective-status': {
+                'result': {
+                    'STRVALUE': 'not-satisfied'
+                }
+            }
+        }
+    ]
+    return {'plan-of-action-and-milestones': {'poam-items': {'poam-item-group': items}}}
+
+
+def test_stats():
+    """Test counting the objects of assessment results and POA&Ms."""
+    stats = Stats()
+    stats.add_data(make_results(2))
+    stats.add_data(make_poam())
+    assert stats.files == 2
+    assert stats.counts['models'] == {'assessment-results': 1, 'plan-of-action-and-milestones': 1}
+    assert stats.counts['findings'] == {'satisfied': 2, 'not-satisfied': 2}
+    assert stats.counts['poam-items'] == {'unknown': 1, 'not-satisfied': 1}
+    assert stats.counts['observation-methods'] == {'TEST': 5, 'EXAMINE': 4}
+    assert stats.counts['observation-types'] == {'finding': 5}
+    assert stats.counts['risk-statuses'] == {'open': 2, 'closed': 1}
+    assert stats.counts['risk-metrics'] == {'likelihood=high': 2, 'likelihood=low': 1}
+
+
+def test_stats_merge(tmp_path: pathlib.Path):
+    """Test that partial statistics merge into the statistics of all the data."""
+    whole = Stats()
+    whole.add_data(make_results(1))
+    whole.add_data(make_poam())
+    first = Stats()
+    first.add_data(make_results(1))
+    second = Stats()
+    second.add_data(make_poam())
+    assert first.merge(second) == whole
+
+    whole.write(tmp_path / 'stats.json')
+    assert Stats.read(tmp_path / 'stats.json') == whole
+    assert Stats.from_dict(json.loads(json.dumps(whole.as_dict()))) == whole
+
+    with pytest.raises(TrestleError):
+        Stats.from_dict({'files': 1})
+    with pytest.raises(TrestleError):
+        Stats(1, {'bad': {}})
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_collect_files(tmp_path: pathlib.Path, jobs: int):
+    """Test collecting the statistics of files, sequentially and in parallel."""
+    files = []
+    for i in range(3):
+        files.append(tmp_path / f'results{i}.json')
+        files[-1].write_text(json.dumps(make_results(i + 1)))
+    stats = collect_files(files, jobs)
+    assert stats.files == 3
+    assert stats.counts['findings'] == {'satisfied': 6, 'not-satisfied': 6}
+    assert stats.errors == {}
+
+    # files that cannot be read or counted are reported and the other files are still counted
+    (tmp_path / 'bad.json').write_text('{"assessment-results": ')
+    (tmp_path / 'empty.json').write_text('[]')
+    stats = collect_files(files + [tmp_path / 'bad.json', tmp_path / 'empty.json'], jobs)
+    assert stats.files == 3
+    assert stats.counts['findings'] == {'satisfied': 6, 'not-satisfied': 6}
+    assert sorted(stats.errors) == [str(tmp_path / 'bad.json'), str(tmp_path / 'empty.json')]
+    assert Stats.from_dict(json.loads(json.dumps(stats.as_dict()))) == stats
@@ -0,0 +1,90 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+"""Tests for trestle time_index module."""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from trestle.core.err import TrestleError
+from trestle.core.time_index import TimeIndex, parse_time
+from trestle.oscal import poam
+
+
+def _time(day: int, hour: int = 0) -> datetime:
+    return datetime(2021, 1, day, hour, tzinfo=timezone.utc)
+
+
+def test_time_index(sample_poam: poam.PlanOfActionAndMilestones):
+    """Test range queries over the timestamps of a POA&M."""
+    index = TimeIndex(sample_poam, 'plan-of-action-and-milestones')
+    # start, 3 collected items, 1 expiry, 4 observations and 2 tracking entries
+    assert len(index) == 11
+    assert index.get_range() == (_time(1), _time(5, 10) + timedelta(days=59))
+
+    collected = index.find(_time(5), _time(13), field='collected', type_name='PoamItem')
+    assert [element.path for element in collected] == [
+        'plan-of-action-and-milestones.poam-items.poam-item-group.0',
+        'plan-of-action-and-milestones.poam-items.poam-item-group.1'
+    ]
+    assert collected[0].uuid == sample_poam.poam_items.poam_item_group[0].uuid
+    assert collected[0].time == _time(5, 10)
+
+    observations = index.find(_time(12), type_name='Observation')
+    assert [element.path.split('.', 2)[2] for element in observations] == [
+        'poam-item-group.1.observations.0', 'poam-item-group.1.observations.1', 'poam-item-group.2.observations.0'
+    ]
+    tracking = index.find(field='date-time-stamp')
+    assert [element.element_type for element in tracking] == ['TrackingEntry', 'TrackingEntry']
+    assert index.find(_time(20, 8), _time(20, 8)) == []
+    assert [element.element_type for element in index.find(_time(20, 8), _time(20, 9))] == ['PoamItem', 'Observation']
+
+    naive = index.find(datetime(2021, 1, 20, 8), datetime(2021, 1, 20, 9))
+    assert len(naive) == 2
+
+
+def test_time_index_incremental(sample_poam: poam.PlanOfActionAndMilestones):
+    """Test that adding a model again only indexes the new timestamps."""
+    index = TimeIndex(sample_poam)
+    assert index.add(sample_poam) == 0
+
+    item = sample_poam.poam_items.poam_item_group[0].copy(update={'uuid': str(uuid.uuid4()), 'expires': None})
+    item.collected = poam.Collected(__root__=_time(3))
+    sample_poam.poam_items.poam_item_group.append(item)
+    # the new item and its observation
+    assert index.add(sample_poam) == 3
+    assert [element.time for element in index.find(_time(3), _time(4))] == [_time(3), _time(3)]
+    assert len(index) == 14
+
+    # changed timestamps replace the indexed ones
+    item.collected = poam.Collected(__root__=_time(2))
+    assert index.add(sample_poam) == 2
+    assert index.find(_time(3), _time(4)) == []
+    item_path = f'poam-items.poam-item-group.{len(sample_poam.poam_items.poam_item_group) - 1}'
+    assert [element.path for element in index.find(_time(2), _time(3))] == [item_path, f'{item_path}.observations.0']
+    assert len(index) == 14
+    assert index.add(sample_poam) == 0
+
+
+def test_parse_time():
+    """Test parsing absolute times and durations before now."""
+    now = _time(10)
+    assert parse_time('7d', now) == _time(3)
+    assert parse_time('12h', now) == datetime(2021, 1, 9, 12, tzinfo=timezone.utc)
+    assert parse_time('30m', now) == datetime(2021, 1, 9, 23, 30, tzinfo=timezone.utc)
+    assert parse_time('2021-01-05T10:00:00Z') == _time(5, 10)
+    with pytest.raises(TrestleError):
+        parse_time('last week')
@@ -0,0 +1,85 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for trestle traversal module."""
+
+import sys
+
+import trestle.core.validater as validater
+import trestle.oscal.catalog as catalog
+import trestle.oscal.target as ostarget
+from trestle.core import utils
+from trestle.core.traversal import traverse, walk
+
+
+def make_deep_catalog(depth: int) -> catalog.Catalog:
+    """Make a catalog with a single control whose parts are nested depth levels deep."""
+    part = catalog.Part(id=f'part-{depth}', name='item')
+    for i in range(depth - 1, 0, -1):
+        part = catalog.Part(id=f'part-{i}', name='item', parts=[part])
+    control = catalog.Control(id='ac-1', title='Control', parts=[part])
+    metadata = catalog.Metadata(
+        **{
+            'title': 'Deep catalog',
+            'last-modified': '2020-01-01T00:00:00+00:00',
+            'version': '0.0.0',
+            'oscal-version': '1.0.0-Milestone3'
+        }
+    )
+    return catalog.Catalog(uuid='ff47836c-877c-4007-bbf3-c9d9bd805000', metadata=metadata, controls=[control])
+
+
+def test_traverse(sample_target_def):
+    """Test the nodes, keys, paths and depths produced by a traversal."""
+    nodes = list(traverse(sample_target_def, 'target-definition'))
+    assert nodes[0].value is sample_target_def
+    assert nodes[0].key is None
+    assert nodes[0].depth == 0
+    assert nodes[1].path == 'target-definition.metadata'
+    assert nodes[1].depth == 1
+
+    party_nodes = [node for node in nodes if isinstance(node.value, ostarget.Party)]
+    assert party_nodes[0].key == 0
+    assert party_nodes[0].path == 'target-definition.metadata.parties.0'
+    assert party_nodes[0].depth == 2
+
+    names = {node.key for node in traverse(sample_target_def, use_aliases=False)}
+    assert 'last_modified' in names
+    assert 'last-modified' not in names
+
+
+def test_traverse_prune(sample_target_def):
+    """Test that the children of pruned nodes are not traversed."""
+    nodes = list(traverse(sample_target_def, prune=lambda node: node.key == 'metadata'))
+    assert any(node.key == 'metadata' for node in nodes)
+    assert not any(node.path.startswith('metadata.') for node in nodes)
+
+    nodes = list(walk(sample_target_def, prune=lambda node: node.depth >= 1))
+    assert all(path.count('.') == 0 for _, path in nodes)
+
+
+def test_deep_catalog():
+    """Test that the walkers do not recurse on deeply nested catalog parts."""
+    depth = sys.getrecursionlimit() + 10
+    deep_catalog = make_deep_catalog(depth)
+
+    assert len(utils.get_elements_of_model_type(deep_catalog, catalog.Part)) == depth
+    assert len(validater.find_values_by_name(deep_catalog, 'id')) == depth + 1
+    assert len(validater.find_values_by_name_generic(deep_catalog, 'id')) == depth + 1
+    assert validater.find_values_by_type(deep_catalog, catalog.Control) == deep_catalog.controls
+
+    deepest = list(traverse(deep_catalog))[-1]
+    assert deepest.value == 'item'
+    assert deepest.path.endswith('parts.0.name')
@@ -54,6 +54,14 @@ def test_get_elements():
     assert (len(group_list) >= 2)
 
 
+def test_iter_elements_of_model_type(sample_target_def):
+    """Test iterating over the elements of a type."""
+    parties = mutils.iter_elements_of_model_type(sample_target_def, target.Party)
+    assert not isinstance(parties, list)
+    assert list(parties) == sample_target_def.metadata.parties
+    assert list(mutils.iter_elements_of_model_type(sample_target_def, target.Role)) == []
+
+
 def test_is_collection_field_type():
     """Test for checking whether the type of a field in an OscalBaseModel object is a collection field."""
     good_catalog = load_good_catalog()
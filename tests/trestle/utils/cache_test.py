@@ -0,0 +1,52 @@
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for trestle cache module."""
+
+import pytest
+
+from trestle.core.err import TrestleError
+from trestle.utils import cache
+
+
+def test_disk_cache(tmp_dir):
+    """Test storing and reading values with hit and miss statistics."""
+    disk_cache = cache.DiskCache(tmp_dir, 'test')
+    key = cache.make_key('content-hash', 'version')
+    assert key != cache.make_key('content-hashversion')
+
+    assert disk_cache.get(key) is None
+    disk_cache.put(key, {'valid': True})
+    assert disk_cache.get(key) == {'valid': True}
+    assert disk_cache.get_stats() == {'hits': 1, 'misses': 1}
+
+    # the directory can be reused by another cache instance
+    assert cache.DiskCache(tmp_dir, 'test').get(key) == {'valid': True}
+    assert cache.DiskCache(tmp_dir, 'other').get(key) is None
+
+    # corrupted entries are misses
+    entry = next(disk_cache.get_dir().rglob(f'{key}.json'))
+    entry.write_text('{')
+    assert disk_cache.get(key) is None
+
+    with pytest.raises(TrestleError):
+        cache.DiskCache(tmp_dir, '')
+
+
+def test_hash_file(tmp_file):
+    """Test hashing the content of a file."""
+    tmp_file.write_text('content')
+    digest = cache.hash_file(tmp_file)
+    assert len(digest) == 64
+    tmp_file.write_text('other content')
+    assert cache.hash_file(tmp_file) != digest
@@ -15,6 +15,7 @@
 
 import os
 import pathlib
+import sys
 from typing import Dict, List
 
 import pytest
@@ -23,6 +24,7 @@ from tests import test_utils
 
 from trestle.core.const import IDX_SEP
 from trestle.core.err import TrestleError
+from trestle.core.models.file_content_type import FileContentType
 from trestle.oscal import catalog
 from trestle.utils import fs
 
@@ -392,6 +394,22 @@ def test_get_stripped_contextual_model(tmp_dir):
     check_stripped_group()
 
 
+def test_find_node():
+    """Test finding nodes under a key up to a maximum depth."""
+    data = {'a': {'x': [1], 'b': {'x': [2], 'c': {'x': [3]}}}, 'x': [0], 'l': [{'x': [4]}], 'y': {'x': 'str'}}
+    assert list(fs.find_node(data, 'x')) == [[1], [0], [4]]
+    assert list(fs.find_node(data, 'x', max_depth=2)) == [[1], [2], [0], [4]]
+    assert list(fs.find_node(data, 'x', max_depth=0)) == [[0]]
+    assert list(fs.find_node(data, 'x', depth=2)) == []
+    assert list(fs.find_node(data, 'x', instance_type=str)) == ['str']
+
+    deep = node = {}
+    for _ in range(sys.getrecursionlimit() + 10):
+        node['x'] = [{}]
+        node = node['x'][0]
+    assert len(list(fs.find_node(deep, 'x', max_depth=sys.getrecursionlimit() + 10))) == sys.getrecursionlimit() + 10
+
+
 def test_get_singular_alias():
     """Test get_singular_alias function."""
     # Not of collection type
@@ -468,3 +486,52 @@ def test_contextual_get_singular_alias(tmp_dir):
     assert 'control' == fs.get_singular_alias(alias_path='group.controls.*.controls', contextual_mode=True)
 
     os.chdir(cwd)
+
+
+def test_get_root_model_by_alias():
+    """Test finding root model types by their alias."""
+    assert fs.get_root_model_by_alias('catalog') == (catalog.Catalog, 'catalogs')
+    with pytest.raises(TrestleError):
+        fs.get_root_model_by_alias('invalid')
+
+    assert fs.get_root_alias({'catalog': {}}) == 'catalog'
+    with pytest.raises(TrestleError):
+        fs.get_root_alias({'catalog': {}, 'profile': {}})
+
+
+def test_get_project_model_files(tmp_dir, sample_catalog):
+    """Test listing the root files of models in a project."""
+    _, model_file = test_utils.prepare_trestle_project_dir(
+        tmp_dir, FileContentType.JSON, sample_catalog, test_utils.CATALOGS_DIR
+    )
+    dist_file = tmp_dir / 'dist' / test_utils.CATALOGS_DIR / 'my_test_model.json'
+    fs.ensure_directory(dist_file.parent)
+    sample_catalog.oscal_write(dist_file)
+    # split sub-elements are not root files of a model
+    fs.ensure_directory(model_file.parent / 'catalog')
+    sample_catalog.metadata.oscal_write(model_file.parent / 'catalog' / 'metadata.json')
+
+    assert fs.get_project_model_files(tmp_dir) == [model_file, dist_file]
+
+    group_file = model_file.parent / 'catalog' / 'groups' / '00001__group.json'
+    fs.ensure_directory(group_file.parent)
+    sample_catalog.groups[1].oscal_write(group_file)
+    assert fs.get_project_model_files(
+        tmp_dir, split=True
+    ) == [model_file, group_file, model_file.parent / 'catalog' / 'metadata.json', dist_file]
+
+
+def test_get_model_file_element_path(tmp_dir, sample_catalog):
+    """Test getting the element path of the content of split model files."""
+    models_path, model_file = test_utils.prepare_trestle_project_dir(
+        tmp_dir, FileContentType.JSON, sample_catalog, test_utils.CATALOGS_DIR
+    )
+    assert fs.get_model_file_element_path(model_file) == 'catalog'
+    assert fs.get_model_file_element_path(models_path / 'catalog' / 'metadata.json') == 'catalog.metadata'
+    assert fs.get_model_file_element_path(
+        models_path / 'catalog' / 'groups' / '00012__group' / 'controls' / '00000__control.json'
+    ) == 'catalog.groups.12.controls.0'
+    assert fs.get_model_file_element_path(
+        models_path / 'catalog' / 'metadata' / 'responsible-parties' / 'creator__responsible-party.json'
+    ) == 'catalog.metadata.responsible-parties.creator'
+    assert fs.get_model_file_element_path(tmp_dir / 'dist' / test_utils.CATALOGS_DIR / 'my_test_model.json') is None
@@ -15,13 +15,20 @@
 # limitations under the License.
 """Tests for cli module."""
 
+import hashlib
+import json
+import pathlib
+import shutil
 import sys
 from unittest.mock import patch
 
 import pytest
 
+from tests import test_utils
+
 from trestle import cli
-from trestle.core.err import TrestleValidationError
+from trestle.core.err import TrestleError, TrestleValidationError
+from trestle.core.models.file_content_type import FileContentType
 
 
 def test_run():
@@ -38,3 +45,160 @@ def test_run():
         with pytest.raises(TrestleValidationError) as pytest_wrapped_e:
             cli.run()
         assert pytest_wrapped_e.type == TrestleValidationError
+
+
+def test_run_multiple_modes():
+    """Test validation with several modes in one run."""
+    testcmd = 'trestle validate -f tests/data/yaml/good_target.yaml -m duplicates -i uuid -i id -m timezone'
+    testcmd += ' -m references'
+    with patch.object(sys, 'argv', testcmd.split()):
+        with pytest.raises(SystemExit) as pytest_wrapped_e:
+            cli.run()
+        assert pytest_wrapped_e.value.code is None
+
+    testcmd = 'trestle validate -f tests/data/yaml/good_target.yaml -m duplicates'
+    with patch.object(sys, 'argv', testcmd.split()):
+        with pytest.raises(TrestleError):
+            cli.run()
+
+    testcmd = 'trestle validate -f tests/data/yaml/good_target.yaml -m unknown'
+    with patch.object(sys, 'argv', testcmd.split()):
+        with pytest.raises(TrestleError):
+            cli.run()
+
+
+def test_validate_project(tmp_dir, sample_catalog, sample_target_def):
+    """Test validation of all the models of a trestle project in parallel."""
+    test_utils.prepare_trestle_project_dir(tmp_dir, FileContentType.JSON, sample_catalog, test_utils.CATALOGS_DIR)
+    test_utils.prepare_trestle_project_dir(tmp_dir, FileContentType.YAML, sample_target_def, test_utils.TARGET_DEFS_DIR)
+    summary_file = tmp_dir / 'summary.txt'
+
+    testcmd = f'trestle validate -f {tmp_dir} -j 2 -m duplicates -i uuid --summary {summary_file}'
+    with patch.object(sys, 'argv', testcmd.split()):
+        with pytest.raises(SystemExit) as pytest_wrapped_e:
+            cli.run()
+        assert pytest_wrapped_e.value.code is None
+
+    summary = json.loads(summary_file.read_text())
+    assert summary['total'] == 2
+    assert summary['valid'] == 2
+    assert {result['model'] for result in summary['files']} == {'catalog', 'target-definition'}
+    assert all(result['seconds'] >= 0 for result in summary['files'])
+
+    # an invalid file does not abort validation of the others
+    shutil.copyfile('tests/data/yaml/bad_target_dup_uuid.yaml', tmp_dir / 'bad_target.yaml')
+    shutil.copyfile('tests/data/json/bad_simple.json', tmp_dir / 'bad_simple.json')
+    testcmd = f'trestle validate -f {tmp_dir}/**/*.* -j 2 -m duplicates -i uuid --summary {summary_file}'
+    with patch.object(sys, 'argv', testcmd.split()):
+        with pytest.raises(TrestleValidationError):
+            cli.run()
+
+    summary = json.loads(summary_file.read_text())
+    assert summary['total'] == 4
+    assert summary['invalid'] == 2
+    errors = [result for result in summary['files'] if result['error'] is not None]
+    assert len(errors) == 1
+    assert errors[0]['file'].endswith('bad_simple.json')
+
+    # fail fast stops at the first invalid file
+    testcmd = f'trestle validate -f {tmp_dir}/**/*.* -j 1 --fail-fast --summary {summary_file}'
+    with patch.object(sys, 'argv', testcmd.split()):
+        with pytest.raises(TrestleValidationError):
+            cli.run()
+
+    summary = json.loads(summary_file.read_text())
+    assert summary['total'] == 1
+    assert summary['invalid'] == 1
+    assert summary['skipped'] == 3
+
+    testcmd = f'trestle validate -f {tmp_dir}/does_not_exist'
+    with patch.object(sys, 'argv', testcmd.split()):
+        with pytest.raises(TrestleError):
+            cli.run()
+
+
+def run_validate_summary(testcmd: str, summary_file: pathlib.Path) -> dict:
+    """Run a validate command expected to pass and return its summary."""
+    with patch.object(sys, 'argv', f'{testcmd} --summary {summary_file}'.split()):
+        with pytest.raises(SystemExit) as pytest_wrapped_e:
+            cli.run()
+        assert pytest_wrapped_e.value.code is None
+
+    return json.loads(summary_file.read_text())
+
+
+def test_validate_cache(tmp_dir, sample_catalog, sample_target_def):
+    """Test that passes are cached by content, trestle version and rule set."""
+    test_utils.prepare_trestle_project_dir(tmp_dir, FileContentType.JSON, sample_catalog, test_utils.CATALOGS_DIR)
+    _, target_file = test_utils.prepare_trestle_project_dir(
+        tmp_dir, FileContentType.YAML, sample_target_def, test_utils.TARGET_DEFS_DIR
+    )
+    summary_file = tmp_dir / 'summary.txt'
+    testcmd = f'trestle validate -f {tmp_dir} -j 1 -m duplicates -i uuid'
+
+    summary = run_validate_summary(testcmd, summary_file)
+    assert summary['cache']['hits'] == 0
+    assert summary['cache']['misses'] == 2
+    assert pathlib.Path(summary['cache']['dir']) == (tmp_dir / '.trestle' / 'cache' / 'validate').absolute()
+
+    summary = run_validate_summary(testcmd, summary_file)
+    assert summary['cache']['hits'] == 2
+    assert all(result['cached'] for result in summary['files'])
+    assert {result['model'] for result in summary['files']} == {'catalog', 'target-definition'}
+
+    # a changed file or a different rule set is validated again
+    sample_target_def.metadata.title = 'A new title'
+    sample_target_def.oscal_write(target_file)
+    summary = run_validate_summary(testcmd, summary_file)
+    assert summary['cache']['hits'] == 1
+    summary = run_validate_summary(f'{testcmd} -m timezone', summary_file)
+    assert summary['cache']['hits'] == 0
+
+    # a portable cache directory can be given explicitly or the cache can be skipped
+    cache_dir = tmp_dir / 'ci-cache'
+    summary = run_validate_summary(f'{testcmd} --cache-dir {cache_dir}', summary_file)
+    assert summary['cache']['misses'] == 2
+    assert cache_dir.is_dir()
+    summary = run_validate_summary(f'{testcmd} --no-cache', summary_file)
+    assert summary['cache']['dir'] is None
+    assert not any(result['cached'] for result in summary['files'])
+
+
+def test_validate_hashes(tmp_dir, sample_catalog):
+    """Test that the hashes mode verifies linked files and caches their digests rather than the results."""
+    catalog_dir, catalog_file = test_utils.prepare_trestle_project_dir(
+        tmp_dir, FileContentType.JSON, sample_catalog, test_utils.CATALOGS_DIR
+    )
+    content = b'attached content'
+    (catalog_dir / 'attachment.txt').write_bytes(content)
+    data = json.loads(catalog_file.read_text())
+    data['catalog']['back-matter'] = {
+        'resources': [
+            {
+                'uuid': '4e3b1a4b-6f3c-4c6e-9b8a-2f1d9f0c3a11',
+                'rlinks': [
+                    {
+                        'href': 'attachment.txt',
+                        'hashes': [{
+                            'algorithm': 'SHA-256', 'value': hashlib.sha256(content).hexdigest()
+                        }]
+                    }
+                ]
+            }
+        ]
+    }
+    catalog_file.write_text(json.dumps(data))
+    summary_file = tmp_dir / 'summary.txt'
+    testcmd = f'trestle validate -f {catalog_file} -m hashes'
+
+    summary = run_validate_summary(testcmd, summary_file)
+    assert summary['files'][0]['valid']
+    assert (tmp_dir / '.trestle' / 'cache' / 'hashes').is_dir()
+
+    (catalog_dir / 'attachment.txt').write_bytes(b'changed content')
+    with patch.object(sys, 'argv', f'{testcmd} --summary {summary_file}'.split()):
+        with pytest.raises(TrestleValidationError):
+            cli.run()
+    summary = json.loads(summary_file.read_text())
+    assert summary['cache']['hits'] == 0
+    assert 'attachment.txt' in summary['files'][0]['violations'][0]
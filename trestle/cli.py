@@ -21,11 +21,17 @@ from trestle.core.commands.add import AddCmd
 from trestle.core.commands.assemble import AssembleCmd
 from trestle.core.commands.create import CreateCmd
 from trestle.core.commands.import_ import ImportCmd
+from trestle.core.commands.index import IndexCmd
 from trestle.core.commands.init import InitCmd
 from trestle.core.commands.merge import MergeCmd
+from trestle.core.commands.merge_results import MergeResultsCmd
+from trestle.core.commands.poam import PoamCmd
+from trestle.core.commands.query import QueryCmd
 from trestle.core.commands.remove import RemoveCmd
 from trestle.core.commands.replicate import ReplicateCmd
+from trestle.core.commands.search import SearchCmd
 from trestle.core.commands.split import SplitCmd
+from trestle.core.commands.stats import StatsCmd
 from trestle.core.commands.validate import ValidateCmd
 
 
@@ -33,7 +39,22 @@ class Trestle(Command):
     """Manage OSCAL files in a human friendly manner."""
 
     subcommands = [
-        InitCmd, CreateCmd, SplitCmd, MergeCmd, ReplicateCmd, AddCmd, RemoveCmd, ValidateCmd, ImportCmd, AssembleCmd
+        InitCmd,
+        CreateCmd,
+        SplitCmd,
+        MergeCmd,
+        MergeResultsCmd,
+        PoamCmd,
+        ReplicateCmd,
+        AddCmd,
+        RemoveCmd,
+        ValidateCmd,
+        ImportCmd,
+        AssembleCmd,
+        QueryCmd,
+        IndexCmd,
+        SearchCmd,
+        StatsCmd
     ]
 
     def _init_arguments(self):
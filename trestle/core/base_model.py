@@ -16,11 +16,14 @@
 """Pydantic base model and utility functions."""
 
 import datetime
+import hashlib
 import logging
 import pathlib
-from typing import List, Optional, Type
+import weakref
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
 
-from pydantic import BaseModel, Extra, Field, create_model
+from pydantic import BaseModel, Extra, Field, PrivateAttr, create_model
 from pydantic.fields import ModelField
 from pydantic.parse import load_file
 
@@ -31,6 +34,10 @@ import yaml
 
 logger = logging.getLogger(__name__)
 
+# Number of changes recorded without naming the changed model, which invalidate every cache derived from a model.
+# Changes to a known model are recorded in the model and its tracked ancestors instead, see `notify_model_changed`.
+_model_generation = 0
+
 
 def robust_datetime_serialization(input_dt: datetime.datetime) -> str:
     """Return a nicely formatted string for time as OSCAL likes it."""
@@ -64,6 +71,48 @@ class OscalBaseModel(BaseModel):
         # Validate on assignment of variables to ensure no escapes
         validate_assignment = True
 
+    # weak references from the models of a tree to their parents
+    __slots__ = ('__weakref__', )
+
+    # (generation, digest) of the last computed fingerprint
+    _fingerprint_cache: Optional[Tuple[int, bytes]] = PrivateAttr(default=None)
+    # number of changes to the model and to its tracked descendants
+    _version: int = PrivateAttr(default=0)
+    # weak references to the models holding this one, recorded when a tree is tracked or fingerprinted
+    _parents: Optional[List[weakref.ref]] = PrivateAttr(default=None)
+
+    def __setattr__(self, name, value):
+        """Set a field value and invalidate the cached fingerprints of the model and its ancestors."""
+        super().__setattr__(name, value)
+        if name not in self.__private_attributes__:
+            notify_model_changed(self)
+
+    def _copy_and_set_values(self, values, fields_set, *, deep):
+        """Copy the model without its cached fingerprint and parents, which belong to the original.
+
+        A deep copy also copies the private attributes of the models below it, so they are reset in the whole copy.
+        """
+        copied = super()._copy_and_set_values(values, fields_set, deep=deep)
+        stack = [copied]
+        while stack:
+            node = stack.pop()
+            object.__setattr__(node, '_fingerprint_cache', None)
+            object.__setattr__(node, '_parents', None)
+            if deep:
+                stack.extend(_iter_child_models(node))
+        return copied
+
+    def fingerprint(self) -> str:
+        """Return a canonical structural fingerprint of the model as a hex string.
+
+        Models with equal content have equal fingerprints: None fields are ignored, dict keys are sorted and timezone
+        aware datetimes are normalized to UTC. Fields left at a non-None default are part of the fingerprint, so a model
+        has the same fingerprint as one where the default is set explicitly. The fingerprint is cached per instance and
+        invalidated by an assignment to a field of the model or of any model below it. In-place changes to lists or
+        dicts (e.g. `append`) must be recorded with `notify_model_changed`.
+        """
+        return model_digest(self).hex()
+
     @classmethod
     def create_stripped_model_type(
         cls, stripped_fields: List[str] = None, stripped_fields_aliases: List[str] = None
@@ -248,6 +297,7 @@ class OscalBaseModel(BaseModel):
         recast_object = existing_oscal_object.copy_to(self.__class__)
         # This is a sanity check
         assert (self.__class__ == recast_object.__class__)
+        notify_model_changed(self)
         for raw_field in self.__dict__.keys():
             self.__dict__[raw_field] = recast_object.__dict__[raw_field]
 
@@ -259,3 +309,181 @@ class OscalBaseModel(BaseModel):
             alias_to_field[field.alias] = field
 
         return alias_to_field
+
+
+def get_model_generation(model: Any = None) -> Any:
+    """Return a value that changes whenever the model, or any model if none is given, may have changed.
+
+    Caches derived from a model can record the value and compare it later to detect that they may be stale. Changes
+    below the model are only seen once the model has been tracked with `track_model` or fingerprinted.
+    """
+    if isinstance(model, OscalBaseModel):
+        return _model_generation, model._version
+    if model is not None:
+        # a collection of models changes with its items
+        return _model_generation, tuple(child._version for child in _iter_child_models(model))
+    return _model_generation
+
+
+def notify_model_changed(model: Optional[OscalBaseModel] = None) -> None:
+    """Record a change to a model that is not an assignment to a field, such as an in-place change to a list.
+
+    The cached fingerprints and the generations of the model and of its tracked ancestors are updated. Without a model,
+    every cache that checks the model generation is invalidated. Assignments to model fields are recorded
+    automatically.
+    """
+    global _model_generation
+    if model is None:
+        _model_generation += 1
+        return
+
+    seen = set()
+    stack = [model]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        object.__setattr__(node, '_version', node._version + 1)
+        object.__setattr__(node, '_fingerprint_cache', None)
+        if node._parents:
+            parents = [parent for parent in (ref() for ref in node._parents) if parent is not None]
+            if len(parents) < len(node._parents):
+                object.__setattr__(node, '_parents', [weakref.ref(parent) for parent in parents])
+            stack.extend(parents)
+
+
+def track_model(model: Any) -> Any:
+    """Link every model below the model to its parents, so that their changes are seen by it, and return its generation.
+
+    Caches derived from a whole model tree call this once when they are built, and then compare
+    `get_model_generation(model)` to the returned value.
+    """
+    stack = [model]
+    while stack:
+        parent = stack.pop()
+        for child in _iter_child_models(parent):
+            if isinstance(parent, OscalBaseModel):
+                _add_parent(child, parent)
+            stack.append(child)
+    return get_model_generation(model)
+
+
+def _add_parent(child: OscalBaseModel, parent: OscalBaseModel) -> None:
+    parents = child._parents
+    if parents is None:
+        object.__setattr__(child, '_parents', [weakref.ref(parent)])
+    elif not any(ref() is parent for ref in parents):
+        parents.append(weakref.ref(parent))
+
+
+def _iter_child_models(node: Any) -> Iterator[OscalBaseModel]:
+    """Iterate over the models directly held by a model, dict or list, looking into nested dicts and lists."""
+    values = list(node.__dict__.values()) if isinstance(node, BaseModel) else [node]
+    while values:
+        value = values.pop()
+        if isinstance(value, OscalBaseModel):
+            yield value
+        elif isinstance(value, dict):
+            values.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            values.extend(value)
+
+
+def _encode_scalar(value: Any) -> bytes:
+    """Encode a leaf value into canonical bytes tagged with its kind."""
+    if isinstance(value, Enum):
+        value = value.value
+
+    if isinstance(value, bool):
+        return b'b1' if value else b'b0'
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None and value.utcoffset() is not None:
+            return b't' + value.astimezone(datetime.timezone.utc).isoformat().encode()
+        return b'n' + value.isoformat().encode()
+    if isinstance(value, (int, float)):
+        return b'd' + repr(value).encode()
+    if isinstance(value, str):
+        return b's' + value.encode()
+    return b'o' + str(value).encode()
+
+
+def _update(hasher, data: bytes) -> None:
+    # length prefix keeps the encoding unambiguous
+    hasher.update(b'%d:' % len(data))
+    hasher.update(data)
+
+
+def _children(node: Any) -> List[Tuple[bytes, Any]]:
+    """Return the labelled children of a model, dict or list in canonical order.
+
+    None values are skipped. All other fields of a model are included whether they were set or left at their default.
+    """
+    if isinstance(node, BaseModel):
+        children = []
+        for name, field in node.__fields__.items():
+            value = getattr(node, name, None)
+            if value is not None:
+                children.append((field.alias.encode(), value))
+        return children
+    if isinstance(node, dict):
+        return [(str(key).encode(), node[key]) for key in sorted(node.keys(), key=str) if node[key] is not None]
+    return [(b'', item) for item in node]
+
+
+def model_digest(obj: Any) -> bytes:
+    """Compute the fingerprint digest of a model, dict, list or scalar.
+
+    The digest of a container is computed from the digests of its children (post-order), using an explicit stack and
+    reusing the valid cached digests of OscalBaseModel instances. The models below the object are linked to their
+    parents on the way, so that a change to any of them invalidates the cached digests of the models above it.
+    """
+    if not isinstance(obj, (BaseModel, dict, list, tuple)):
+        hasher = hashlib.blake2b(digest_size=16)
+        _update(hasher, _encode_scalar(obj))
+        return hasher.digest()
+
+    digests: Dict[int, bytes] = {}
+    # (node, expanded, closest model holding the node)
+    stack: List[Tuple[Any, bool, Optional[OscalBaseModel]]] = [(obj, False, None)]
+    while stack:
+        node, expanded, owner = stack.pop()
+        if not expanded and owner is not None and isinstance(node, OscalBaseModel):
+            _add_parent(node, owner)
+        if id(node) in digests:
+            continue
+
+        if not expanded:
+            if isinstance(node, OscalBaseModel):
+                owner = node
+                cached = node._fingerprint_cache
+                if cached is not None and cached[0] == _model_generation:
+                    digests[id(node)] = cached[1]
+                    continue
+            stack.append((node, True, owner))
+            for _, child in _children(node):
+                if isinstance(child, (BaseModel, dict, list, tuple)):
+                    stack.append((child, False, owner))
+            continue
+
+        hasher = hashlib.blake2b(digest_size=16)
+        if isinstance(node, BaseModel):
+            _update(hasher, b'M' + node.__class__.__name__.encode())
+        elif isinstance(node, dict):
+            _update(hasher, b'D')
+        else:
+            _update(hasher, b'L')
+
+        for label, child in _children(node):
+            _update(hasher, label)
+            if isinstance(child, (BaseModel, dict, list, tuple)):
+                _update(hasher, digests[id(child)])
+            else:
+                _update(hasher, _encode_scalar(child))
+
+        digest = hasher.digest()
+        digests[id(node)] = digest
+        if isinstance(node, OscalBaseModel):
+            node._fingerprint_cache = (_model_generation, digest)
+
+    return digests[id(obj)]
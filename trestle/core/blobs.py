@@ -0,0 +1,240 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Out-of-line storage of base64 attachments of back matter resources.
+
+Resources in the back matter of every model can carry attachments as base64 text of several megabytes, which is
+validated with the model, copied with it and rewritten on every split. When a model is split with
+`--externalize-blobs`, the attachments are decoded into binary blob files in the `.blobs` directory of the model, and
+their values are replaced by references to the sha256 hash of the content. Blobs with the same content are stored once,
+and a blob that is already stored is not written again, so later splits only rewrite the references. The content is
+read from the blob only when it is accessed, and the writers of this module encode it back into base64 in chunks while
+writing the output.
+"""
+
+import base64
+import copy
+import hashlib
+import json
+import os
+import pathlib
+import re
+import tempfile
+from typing import Any, BinaryIO, Iterator, List, Optional, TextIO
+
+from trestle.core import const
+from trestle.core.base_model import OscalBaseModel
+from trestle.core.err import TrestleError
+from trestle.core.models.file_content_type import FileContentType
+from trestle.core.traversal import traverse
+from trestle.utils import fs
+
+import yaml
+
+BLOB_REF_PREFIX = 'blob:sha256:'
+
+# Number of bytes encoded at a time, a multiple of 3 so that only the last chunk can have padding.
+CHUNK_SIZE = 3 * 64 * 1024
+
+_BLOB_REF_PATTERN = re.compile(f'^{BLOB_REF_PREFIX}[0-9a-f]{{64}}$')
+
+# A blob reference as a JSON string, with the reference captured.
+_JSON_BLOB_REF_PATTERN = re.compile(f'"({BLOB_REF_PREFIX}[0-9a-f]{{64}})"')
+
+
+def is_blob_ref(value: Any) -> bool:
+    """Check if the value is a reference to a blob."""
+    return isinstance(value, str) and _BLOB_REF_PATTERN.match(value) is not None
+
+
+def get_blob_dir(file_path: pathlib.Path) -> pathlib.Path:
+    """Return the blob directory of the model that the file belongs to.
+
+    The blobs are stored in the model directory of the project (e.g. `catalogs/mycatalog/.blobs`), so that the splits of
+    the model at any depth share them. Files outside of a project use the directory of the file.
+    """
+    file_path = pathlib.Path(file_path).absolute()
+    model_dir = fs.get_project_model_path(file_path)
+    if model_dir is None:
+        model_dir = file_path.parent
+    return model_dir / const.BLOB_DIR_NAME
+
+
+class BlobStore:
+    """Content addressed store of the decoded attachments of a model.
+
+    Blobs are stored as `<blob_dir>/<hash[:2]>/<hash>`.
+    """
+
+    def __init__(self, blob_dir: pathlib.Path):
+        """Initialize a store in the blob directory."""
+        self._dir = pathlib.Path(blob_dir)
+        self._written: List[pathlib.Path] = []
+
+    def get_dir(self) -> pathlib.Path:
+        """Return the blob directory."""
+        return self._dir
+
+    def get_path(self, ref: str) -> pathlib.Path:
+        """Return the path of the blob of the reference."""
+        if not is_blob_ref(ref):
+            raise TrestleError(f'Invalid blob reference "{ref}"')
+        digest = ref[len(BLOB_REF_PREFIX):]
+        return self._dir / digest[:2] / digest
+
+    def __contains__(self, ref: str) -> bool:
+        """Check if the blob of the reference is stored."""
+        return is_blob_ref(ref) and self.get_path(ref).is_file()
+
+    def put(self, value: str) -> str:
+        """Store the decoded content of the base64 value and return its reference.
+
+        The blob is written to a temporary file first and then moved in place, and is not written if it is already
+        stored.
+        """
+        try:
+            content = base64.b64decode(value)
+        except ValueError as err:
+            raise TrestleError(f'Invalid base64 attachment: {err}')
+
+        ref = BLOB_REF_PREFIX + hashlib.sha256(content).hexdigest()
+        blob_path = self.get_path(ref)
+        if blob_path.is_file():
+            return ref
+
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=blob_path.parent, prefix='.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                fp.write(content)
+            os.replace(tmp_name, blob_path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+        self._written.append(blob_path)
+        return ref
+
+    def open_blob(self, ref: str) -> BinaryIO:
+        """Open the blob of the reference for reading."""
+        blob_path = self.get_path(ref)
+        try:
+            return open(blob_path, 'rb')
+        except OSError as err:
+            raise TrestleError(f'Cannot read blob {ref} at {blob_path}: {err}')
+
+    def read(self, ref: str) -> bytes:
+        """Return the content of the blob of the reference."""
+        with self.open_blob(ref) as fp:
+            return fp.read()
+
+    def iter_base64(self, ref: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+        """Iterate over the base64 encoding of the blob of the reference in chunks."""
+        if chunk_size <= 0 or chunk_size % 3:
+            raise TrestleError(f'Chunk size must be a positive multiple of 3, got {chunk_size}')
+
+        with self.open_blob(ref) as fp:
+            chunk = fp.read(chunk_size)
+            while chunk:
+                yield base64.b64encode(chunk).decode('ascii')
+                chunk = fp.read(chunk_size)
+
+    def discard(self) -> None:
+        """Remove the blobs written by this store, e.g. when the operation that wrote them failed."""
+        for blob_path in self._written:
+            if blob_path.exists():
+                blob_path.unlink()
+        self._written = []
+
+
+def iter_attachments(model: OscalBaseModel) -> Iterator[OscalBaseModel]:
+    """Iterate over the base64 attachments of the model, in the module of the model."""
+    for node in traverse(model, track_paths=False):
+        if type(node.value).__name__ == 'Base64':
+            yield node.value
+
+
+def externalize(model: OscalBaseModel, store: BlobStore) -> int:
+    """Move the inline attachments of the model to the store, replacing their values by references.
+
+    The model is updated in place. Returns the number of attachments that were moved.
+    """
+    count = 0
+    for attachment in iter_attachments(model):
+        if not is_blob_ref(attachment.value):
+            attachment.value = store.put(attachment.value)
+            count += 1
+    return count
+
+
+def read_attachment(attachment: OscalBaseModel, store: Optional[BlobStore] = None) -> bytes:
+    """Return the decoded content of the attachment, from the store if it has been externalized."""
+    if is_blob_ref(attachment.value):
+        if store is None:
+            raise TrestleError(f'A blob store is required to read the attachment {attachment.value}')
+        return store.read(attachment.value)
+    return base64.b64decode(attachment.value)
+
+
+def internalize(data: Any, store: BlobStore) -> Any:
+    """Replace the blob references in the raw data of a model by the base64 content of the blobs, in place."""
+    for node in traverse(data, track_paths=False):
+        value = node.value
+        if isinstance(value, dict):
+            items = value.items()
+        elif isinstance(value, list):
+            items = enumerate(value)
+        else:
+            continue
+        for key, item in items:
+            if is_blob_ref(item):
+                value[key] = ''.join(store.iter_base64(item))
+    return data
+
+
+def write_json(data: Any, writer: TextIO, store: BlobStore) -> None:
+    """Write the raw data of a model as JSON, encoding the referenced blobs into the output in chunks.
+
+    The data is not modified, and only one chunk of a blob is in memory at a time.
+    """
+    encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+    for chunk in encoder.iterencode(data):
+        if BLOB_REF_PREFIX not in chunk:
+            writer.write(chunk)
+            continue
+        # the split alternates between text and captured references
+        for i, part in enumerate(_JSON_BLOB_REF_PATTERN.split(chunk)):
+            if i % 2 == 0:
+                writer.write(part)
+            else:
+                writer.write('"')
+                for encoded in store.iter_base64(part):
+                    writer.write(encoded)
+                writer.write('"')
+
+
+def write_file(data: Any, file_path: pathlib.Path, store: BlobStore) -> None:
+    """Write the raw data of a model to a JSON or YAML file with the blobs encoded back into the attachments.
+
+    JSON is written in chunks by `write_json`. YAML has no chunked writer, so the blobs are encoded into a copy of the
+    data first.
+    """
+    file_path = pathlib.Path(file_path)
+    content_type = FileContentType.to_content_type(file_path.suffix)
+    with open(file_path, 'w', encoding='utf8') as writer:
+        if content_type == FileContentType.JSON:
+            write_json(data, writer, store)
+        else:
+            yaml.dump(internalize(copy.deepcopy(data), store), writer)
@@ -0,0 +1,195 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Flattened index of the control hierarchy of a catalog."""
+
+import re
+import weakref
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from trestle.core.base_model import get_model_generation, track_model
+from trestle.core.err import TrestleError
+from trestle.core.models.elements import Element
+from trestle.oscal import catalog
+
+_DIGITS_PATTERN = re.compile(r'(\d+)')
+
+
+def natural_key(control_id: str) -> List[Union[str, int]]:
+    """Return a sort key of a control id comparing its numbers by value, so that `ac-2.9` sorts before `ac-2.10`."""
+    parts: List[Union[str, int]] = _DIGITS_PATTERN.split(control_id)
+    # splitting by a pattern with one group alternates text (even indexes) and digits (odd indexes)
+    for i in range(1, len(parts), 2):
+        parts[i] = int(parts[i])
+    return parts
+
+
+class CatalogIndex:
+    """Index of the groups, controls and control enhancements of a catalog flattened into arrays.
+
+    Controls are stored in document order (pre-order), so that the descendants of a control are the contiguous range
+    of positions that follows it. For each position the index holds the control, its id, the position of its parent
+    control (-1 for controls directly in a group or in the catalog), its depth (0 for these controls) and the position
+    of its group in `get_groups()` (-1 for controls directly in the catalog). Groups are also stored in document order
+    with the position of their parent group.
+    """
+
+    def __init__(self, cat: catalog.Catalog):
+        """Build the index of the catalog in a single pass."""
+        # the catalog is not kept alive by its index, so that indexes can be cached alongside their catalog
+        self._catalog = weakref.ref(cat)
+        self._generation = track_model(cat)
+        self._controls: List[catalog.Control] = []
+        self._ids: List[str] = []
+        self._parents: List[int] = []
+        self._depths: List[int] = []
+        self._group_positions: List[int] = []
+        self._ends: List[int] = []
+        self._groups: List[catalog.Group] = []
+        self._group_parents: List[int] = []
+
+        # stack of (parent control, depth, group position, control or group) in reverse document order, where a
+        # negative marker closes the subtree of the control at position -marker - 1
+        stack: List[Any] = [(-1, 0, -1, item) for item in reversed((cat.controls or []) + (cat.groups or []))]
+        while stack:
+            parent, depth, group, item = stack.pop()
+            if isinstance(item, int):
+                self._ends[-item - 1] = len(self._controls)
+            elif isinstance(item, catalog.Control):
+                position = len(self._controls)
+                self._controls.append(item)
+                self._ids.append(item.id)
+                self._parents.append(parent)
+                self._depths.append(depth)
+                self._group_positions.append(group)
+                self._ends.append(position + 1)
+                stack.append((parent, depth, group, -position - 1))
+                stack.extend((position, depth + 1, group, child) for child in reversed(item.controls or []))
+            else:
+                group_position = len(self._groups)
+                self._groups.append(item)
+                self._group_parents.append(group)
+                children = (item.controls or []) + (item.groups or [])
+                stack.extend((-1, 0, group_position, child) for child in reversed(children))
+
+        self._positions = {control_id: position for position, control_id in reversed(list(enumerate(self._ids)))}
+
+    def is_stale(self) -> bool:
+        """Check whether a field of the catalog or of a model below it has been assigned since the index was built.
+
+        In-place changes to lists (e.g. `append`) are only detected if they are recorded with `notify_model_changed`.
+        An index whose catalog has been garbage collected is stale as well.
+        """
+        cat = self._catalog()
+        return cat is None or self._generation != get_model_generation(cat)
+
+    def __len__(self) -> int:
+        """Return the number of controls in the catalog."""
+        return len(self._ids)
+
+    def __contains__(self, control_id: str) -> bool:
+        """Check whether the catalog has a control with the id."""
+        return control_id in self._positions
+
+    def get_position(self, control_id: str) -> Optional[int]:
+        """Return the position of the control with the id in document order, or None if there is no such control."""
+        return self._positions.get(control_id)
+
+    def get_control(self, control_id: str) -> Optional[catalog.Control]:
+        """Return the control with the id, or None if there is no such control."""
+        position = self._positions.get(control_id)
+        return None if position is None else self._controls[position]
+
+    def get_parent(self, control_id: str) -> Optional[catalog.Control]:
+        """Return the control that the control with the id is nested in, if any."""
+        position = self._positions.get(control_id)
+        if position is None or self._parents[position] < 0:
+            return None
+        return self._controls[self._parents[position]]
+
+    def get_depth(self, control_id: str) -> Optional[int]:
+        """Return the nesting depth of the control with the id, 0 for the controls not nested in another control."""
+        position = self._positions.get(control_id)
+        return None if position is None else self._depths[position]
+
+    def get_group(self, control_id: str) -> Optional[catalog.Group]:
+        """Return the innermost group holding the control with the id, if any."""
+        position = self._positions.get(control_id)
+        if position is None or self._group_positions[position] < 0:
+            return None
+        return self._groups[self._group_positions[position]]
+
+    def iter_ancestors(self, control_id: str) -> Iterator[catalog.Control]:
+        """Iterate over the controls that the control with the id is nested in, from its parent up."""
+        position = self._positions.get(control_id)
+        parent = -1 if position is None else self._parents[position]
+        while parent >= 0:
+            yield self._controls[parent]
+            parent = self._parents[parent]
+
+    def iter_group_ancestors(self, control_id: str) -> Iterator[catalog.Group]:
+        """Iterate over the groups holding the control with the id, from its innermost group up."""
+        position = self._positions.get(control_id)
+        group = -1 if position is None else self._group_positions[position]
+        while group >= 0:
+            yield self._groups[group]
+            group = self._group_parents[group]
+
+    def iter_descendants(self, control_id: str) -> Iterator[catalog.Control]:
+        """Iterate over the controls nested in the control with the id, at any depth, in document order."""
+        position = self._positions.get(control_id)
+        if position is not None:
+            for descendant in range(position + 1, self._ends[position]):
+                yield self._controls[descendant]
+
+    def get_ids(self, natural_order: bool = False) -> List[str]:
+        """Return the control ids in document order, or sorted in natural order."""
+        return sorted(self._ids, key=natural_key) if natural_order else list(self._ids)
+
+    def get_controls(self) -> List[catalog.Control]:
+        """Return the controls in document order."""
+        return list(self._controls)
+
+    def get_parents(self) -> List[int]:
+        """Return the position of the parent control of each control, -1 for controls not nested in a control."""
+        return list(self._parents)
+
+    def get_groups(self) -> List[catalog.Group]:
+        """Return the groups in document order."""
+        return list(self._groups)
+
+
+# indexes by id of their catalog, each dropped once its catalog is garbage collected
+_catalog_indexes: Dict[int, CatalogIndex] = {}
+
+
+def get_catalog_index(obj: Union[Element, catalog.Catalog]) -> CatalogIndex:
+    """Return the index of a catalog or of the catalog of an element, building it if needed.
+
+    The index is cached alongside the catalog and rebuilt after the catalog is changed with `Element.set_at` or any
+    model field is assigned.
+    """
+    cat = obj.get() if isinstance(obj, Element) else obj
+    if not isinstance(cat, catalog.Catalog):
+        raise TrestleError(f'A catalog index requires a catalog, not {cat.__class__.__name__}')
+
+    index = _catalog_indexes.get(id(cat))
+    if index is None:
+        weakref.finalize(cat, _catalog_indexes.pop, id(cat), None)
+    elif not index.is_stale():
+        return index
+    index = CatalogIndex(cat)
+    _catalog_indexes[id(cat)] = index
+    return index
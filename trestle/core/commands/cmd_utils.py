@@ -15,6 +15,7 @@
 # limitations under the License.
 """Trestle command related utilities."""
 import pathlib
+from glob import glob
 from shutil import copyfile
 from typing import List
 
@@ -56,9 +57,44 @@ def move_to_trash(file_path: pathlib.Path, delete_file: bool = True):
         file_path.unlink()
 
 
-def get_model(file_path: str) -> OscalBaseModel:
-    """Get the model specified by the file."""
-    raise NotImplementedError()
+def get_model(file_path: pathlib.Path) -> OscalBaseModel:
+    """Get the model specified by the file.
+
+    If the file is in a trestle model directory, the (possibly stripped) model type is inferred from the directory
+    structure. Otherwise it is inferred from the root key of the file content, e.g. `catalog`.
+    """
+    file_path = pathlib.Path(file_path)
+    absolute_path = file_path.absolute()
+
+    if fs.is_valid_project_model_path(absolute_path):
+        model_type, _ = fs.get_stripped_contextual_model(absolute_path)
+        return model_type.oscal_read(file_path)
+
+    data = fs.load_file(file_path)
+    root_alias = fs.get_root_alias(data)
+    model_type, _ = fs.get_root_model_by_alias(root_alias)
+    return model_type.parse_obj(data[root_alias])
+
+
+def find_model_files(file_arg: str) -> List[pathlib.Path]:
+    """Find the model files at a file, a directory, a trestle project root or a glob pattern."""
+    if any(c in file_arg for c in '*?['):
+        return [pathlib.Path(f) for f in sorted(glob(file_arg, recursive=True)) if fs.is_model_file(pathlib.Path(f))]
+
+    path = pathlib.Path(file_arg)
+    if path.is_file():
+        return [path]
+
+    if path.is_dir():
+        if fs.is_valid_project_root(path):
+            return fs.get_project_model_files(path)
+
+        return [
+            f for f in sorted(path.rglob('*'))
+            if fs.is_model_file(f) and not any(fs.should_ignore(part) for part in f.relative_to(path).parts)
+        ]
+
+    raise TrestleError(f'File or directory "{file_arg}" does not exist')
 
 
 def parse_element_args(element_args: List[str], contextual_mode: bool = True) -> List[ElementPath]:
@@ -100,7 +136,7 @@ def parse_element_arg(element_arg: str, contextual_mode: bool = True) -> List[El
     element_arg = element_arg.strip()
 
     # search for wildcards and create paths with its parent path
-    path_parts = element_arg.split(ElementPath.PATH_SEPARATOR)
+    path_parts = ElementPath.split_path(element_arg)
     if len(path_parts) <= 0:
         raise TrestleError(f'Invalid element path "{element_arg}" without any path separator')
 
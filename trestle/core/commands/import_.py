@@ -15,10 +15,138 @@
 # limitations under the License.
 """Trestle Import Command."""
 
+import os
+import pathlib
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
 from ilcli import Command
 
+from trestle.core import const
+from trestle.core.commands import cmd_utils
+from trestle.core.err import TrestleError
+from trestle.utils import fs
+
+
+def import_file(file_path: str, project_root: str, name: Optional[str] = None) -> Dict[str, Any]:
+    """Import a single OSCAL file into the trestle project and return the result as a dict.
+
+    The model type is detected from the root key of the file, and the file is validated against it before being copied
+    to `<model type dir>/<name>/<root alias><ext>`, e.g. `catalogs/mycatalog/catalog.json`. The name defaults to the
+    name of the file without its extension. The model directory must not exist yet. The file is copied to a temporary
+    file next to its destination and then moved in place, so an interrupted import never leaves a partial model. This
+    is a module level function so that it can be run in a worker process.
+    """
+    start = time.perf_counter()
+    source = pathlib.Path(file_path)
+    name = name or source.stem
+    result: Dict[str, Any] = {'file': file_path, 'model': None, 'destination': None, 'imported': False, 'error': None}
+    try:
+        if not name or os.sep in name or fs.should_ignore(name):
+            raise TrestleError(f'Invalid model name "{name}"')
+
+        data = fs.load_file(file_path)
+        root_alias = fs.get_root_alias(data)
+        model_type, model_dir = fs.get_root_model_by_alias(root_alias)
+        model_type.parse_obj(data[root_alias])
+        result['model'] = root_alias
+
+        extension = '.yaml' if source.suffix == '.yml' else source.suffix
+        destination_dir = pathlib.Path(project_root) / model_dir / name
+        destination = destination_dir / f'{root_alias}{extension}'
+        destination_dir.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # creating the directory reserves the name, also against other files of the same import
+            destination_dir.mkdir()
+        except FileExistsError:
+            raise TrestleError(f'Model "{name}" already exists at {destination_dir}')
+
+        fd, tmp_name = tempfile.mkstemp(dir=destination_dir, prefix='.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as writer, open(source, 'rb') as reader:
+                shutil.copyfileobj(reader, writer)
+            os.replace(tmp_name, destination)
+        except BaseException:
+            os.unlink(tmp_name)
+            destination_dir.rmdir()
+            raise
+
+        result['destination'] = str(destination)
+        result['imported'] = True
+    except Exception as e:
+        # any failure only fails this file without aborting the other files
+        result['error'] = f'{e.__class__.__name__}: {e}'
+    result['seconds'] = round(time.perf_counter() - start, 6)
+    return result
+
 
 class ImportCmd(Command):
     """Import a model from an existing JSON/YAML file into Trestle."""
 
     name = 'import'
+
+    def _init_arguments(self):
+        self.add_argument(
+            f'-{const.ARG_FILE_SHORT}',
+            f'--{const.ARG_FILE}',
+            action='append',
+            help=const.ARG_DESC_FILE + ', directory or glob pattern of the OSCAL files to import. It can be repeated.',
+        )
+        self.add_argument(
+            '-o', '--output', help='Name of the imported model. Only allowed when a single file is imported.'
+        )
+        self.add_argument(
+            '-j', '--jobs', type=int, default=os.cpu_count() or 1, help='Number of files imported in parallel.'
+        )
+
+    def _run(self, args):
+        """Import OSCAL files into the trestle project of the current directory."""
+        if not args.file:
+            raise TrestleError(f'Argument "-{const.ARG_FILE_SHORT}" is required')
+
+        project_root = fs.get_trestle_project_root(pathlib.Path.cwd())
+        if project_root is None:
+            raise TrestleError(f'{pathlib.Path.cwd()} is not in a trestle project')
+
+        files: List[pathlib.Path] = []
+        for file_arg in args.file:
+            files.extend(f for f in cmd_utils.find_model_files(file_arg) if f not in files)
+        if not files:
+            raise TrestleError(f'No OSCAL files found at "{", ".join(args.file)}"')
+        if args.output is not None and len(files) > 1:
+            raise TrestleError(f'Argument "-o" is only allowed when importing a single file, found {len(files)}')
+
+        start = time.perf_counter()
+        results = self._import_files(files, project_root, args.output, args.jobs)
+        elapsed = time.perf_counter() - start
+
+        failed = [result for result in results if not result['imported']]
+        for result in results:
+            if result['imported']:
+                self.out(f'{result["file"]}: imported to {result["destination"]} ({result["seconds"]:.3f}s)')
+            else:
+                self.out(f'{result["file"]}: failed ({result["seconds"]:.3f}s)')
+                self.out(f'    {result["error"]}')
+
+        self.out(f'Imported {len(results) - len(failed)} of {len(results)} file(s) in {elapsed:.3f}s')
+        if failed:
+            raise TrestleError(f'{len(failed)} file(s) could not be imported: {failed[0]["file"]}')
+
+    @classmethod
+    def _import_files(cls, files: List[pathlib.Path], project_root: pathlib.Path, name: Optional[str],
+                      jobs: int) -> List[Dict[str, Any]]:
+        """Import the files, in a process pool if there are several jobs, and return results in file order."""
+        if jobs <= 1 or len(files) <= 1:
+            return [import_file(str(f), str(project_root), name) for f in files]
+
+        results: Dict[str, Dict[str, Any]] = {}
+        with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as executor:
+            futures = [executor.submit(import_file, str(f), str(project_root), name) for f in files]
+            for future in as_completed(futures):
+                result = future.result()
+                results[result['file']] = result
+
+        return [results[str(f)] for f in files]
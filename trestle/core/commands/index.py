@@ -0,0 +1,88 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Trestle Index Command."""
+
+import json
+import pathlib
+import time
+
+from ilcli import Command
+
+from trestle.core.err import TrestleError
+from trestle.core.index import ProjectIndex
+from trestle.core.time_index import parse_time
+from trestle.utils import fs
+
+
+class IndexCmd(Command):
+    """Build, update and query the index of the models in a trestle project."""
+
+    name = 'index'
+
+    def _init_arguments(self):
+        self.add_argument('--rebuild', action='store_true', help='Drop the index and index all models again.')
+        self.add_argument('--no-update', action='store_true', help='Query the index without updating it first.')
+        self.add_argument('-t', '--type', help='Find the elements of a type, e.g. "Control".')
+        self.add_argument('--uuid', help='Find the elements with a uuid.')
+        self.add_argument('--id', help='Find the elements with an id, e.g. "ac-2".')
+        self.add_argument('-p', '--prop', help='Find the elements with a property, given as "name" or "name=value".')
+        self.add_argument('-r', '--references', help='Find the elements referencing an id or uuid.')
+        self.add_argument('-k', '--kind', help='Kind of the references to find, e.g. "control" or "party".')
+        self.add_argument('--model', help='Only find elements in models of this type, e.g. "system-security-plan".')
+        self.add_argument(
+            '--since',
+            help='Find the timestamps from a time, given in ISO 8601 or as a duration before now, e.g. "7d".'
+        )
+        self.add_argument('--until', help='Find the timestamps before a time, given like --since.')
+        self.add_argument('--field', help='Only find timestamps of this field, e.g. "collected" or "expires".')
+
+    def _run(self, args):
+        """Update the index of the project, then print the elements found as JSON lines if criteria are given."""
+        project_root = fs.get_trestle_project_root(pathlib.Path.cwd())
+        if project_root is None:
+            raise TrestleError(f'{pathlib.Path.cwd()} is not in a trestle project')
+
+        time_query = args.since is not None or args.until is not None or args.field is not None
+        query = time_query or any(
+            getattr(args, arg) is not None for arg in ['type', 'uuid', 'id', 'prop', 'references']
+        )
+        with ProjectIndex(project_root) as index:
+            if not args.no_update:
+                start = time.perf_counter()
+                stats = index.rebuild() if args.rebuild else index.update()
+                if not query:
+                    self.out(
+                        f'Indexed {stats["indexed"]} file(s) in {time.perf_counter() - start:.3f}s: '
+                        f'{stats["unchanged"]} unchanged, {stats["removed"]} removed'
+                    )
+
+            if time_query:
+                since = None if args.since is None else parse_time(args.since)
+                until = None if args.until is None else parse_time(args.until)
+                results = index.find_times(since, until, args.field, args.type, args.model)
+            elif args.references is not None:
+                results = index.find_references(args.references, args.kind, args.model)
+            elif query:
+                prop_name, prop_value = None, None
+                if args.prop is not None:
+                    prop_name, _, prop_value = args.prop.partition('=')
+                    prop_value = prop_value if '=' in args.prop else None
+                results = index.find_elements(args.type, args.uuid, args.id, prop_name, prop_value, args.model)
+            else:
+                results = []
+
+            for result in results:
+                self.out(json.dumps(result._asdict()))
@@ -0,0 +1,62 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Trestle Merge Results Command."""
+
+import json
+import pathlib
+
+from ilcli import Command
+
+from trestle.core.commands import cmd_utils
+from trestle.core.err import TrestleError
+from trestle.core.results_merge import ResultsMerger
+
+
+class MergeResultsCmd(Command):
+    """Merge assessment results files, removing duplicate findings and observations."""
+
+    name = 'merge-results'
+
+    def _init_arguments(self):
+        self.add_argument('files', nargs='+', help='Files, directories or glob patterns of the assessment results.')
+        self.add_argument('-o', '--output', required=True, help='Path of the merged assessment results file.')
+        self.add_argument(
+            '--provenance', help='Path of a JSON file to write the sources of each merged finding to, by finding uuid.'
+        )
+
+    def _run(self, args):
+        """Merge the files in the order given and write the merged results."""
+        files = []
+        for file_arg in args.files:
+            files.extend(cmd_utils.find_model_files(file_arg))
+        output = pathlib.Path(args.output)
+        files = [f for f in files if f.absolute() != output.absolute()]
+        if not files:
+            raise TrestleError('No assessment results files to merge')
+
+        merger = ResultsMerger()
+        for file_path in files:
+            merger.add_file(file_path)
+        merger.get_result().oscal_write(output)
+        if args.provenance is not None:
+            with open(args.provenance, 'w', encoding='utf8') as f:
+                json.dump(merger.get_provenance(), f, indent=2)
+
+        stats = merger.get_stats()
+        self.out(
+            f'Merged {stats["findings"]} finding(s) of {stats["files"]} file(s) into {stats["distinct-findings"]} '
+            f'finding(s) with {stats["distinct-observations"]} observation(s) in {output}'
+        )
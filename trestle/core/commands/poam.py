@@ -0,0 +1,49 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Trestle Poam Command."""
+
+from ilcli import Command
+
+from trestle.core.commands import cmd_utils
+from trestle.core.err import TrestleError
+from trestle.core.poam_generator import DEFAULT_TITLE, generate_poam
+
+
+class PoamCmd(Command):
+    """Generate a plan of action and milestones from the open findings and risks of assessment results."""
+
+    name = 'poam'
+
+    def _init_arguments(self):
+        self.add_argument('files', nargs='+', help='Files, directories or glob patterns of the assessment results.')
+        self.add_argument('-o', '--output', required=True, help='Path of the JSON file of the generated POA&M.')
+        self.add_argument('--title', default=DEFAULT_TITLE, help=f'Title of the POA&M. Defaults to "{DEFAULT_TITLE}".')
+
+    def _run(self, args):
+        """Generate the POA&M from the files in the order given."""
+        files = []
+        for file_arg in args.files:
+            files.extend(cmd_utils.find_model_files(file_arg))
+        if not files:
+            raise TrestleError('No assessment results files to generate a POA&M from')
+
+        stats = generate_poam(files, args.output, args.title)
+        self.out(
+            f'Generated {stats["items"]} POA&M item(s) from {stats["findings"]} finding(s) of {stats["files"]} '
+            f'file(s) in {args.output}'
+        )
+        if stats['unresolved']:
+            self.out(f'{stats["unresolved"]} reference(s) to unknown parties, roles or locations')
@@ -0,0 +1,74 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Trestle Query Command."""
+
+import json
+import pathlib
+from typing import Any
+
+from ilcli import Command
+
+from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
+
+from trestle.core import const
+from trestle.core.commands import cmd_utils
+from trestle.core.err import TrestleError
+from trestle.core.models.elements import Element
+from trestle.core.query import Query
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convert a query result into data that can be dumped as JSON, using field aliases for models."""
+    if isinstance(value, BaseModel):
+        return json.loads(value.json(exclude_none=True, by_alias=True))
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_jsonable(item) for key, item in value.items()}
+    return value
+
+
+class QueryCmd(Command):
+    """Query the elements of an OSCAL model."""
+
+    name = 'query'
+
+    def _init_arguments(self):
+        self.add_argument(
+            f'-{const.ARG_FILE_SHORT}',
+            f'--{const.ARG_FILE}',
+            help=const.ARG_DESC_FILE + ' to query.',
+        )
+        self.add_argument('-q', '--query', help='Query, e.g. "catalog.groups[id=ac].controls[id=ac-2]".')
+        self.add_argument('-l', '--limit', type=int, help='Maximum number of results.')
+
+    def _run(self, args):
+        """Print the results of the query as JSON lines with the path and the value of each selected element."""
+        if args.file is None:
+            raise TrestleError(f'Argument "-{const.ARG_FILE_SHORT}" is required')
+        if args.query is None:
+            raise TrestleError('Argument "-q" is required')
+
+        query = Query(args.query)
+        model = cmd_utils.get_model(pathlib.Path(args.file))
+
+        count = 0
+        for value, path in query.evaluate(Element(model)):
+            if args.limit is not None and count >= args.limit:
+                break
+            self.out(json.dumps({'path': path, 'value': to_jsonable(value)}, default=pydantic_encoder))
+            count += 1
@@ -0,0 +1,50 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Trestle Search Command."""
+
+import json
+import pathlib
+
+from ilcli import Command
+
+from trestle.core.err import TrestleError
+from trestle.core.index import ProjectIndex
+from trestle.utils import fs
+
+
+class SearchCmd(Command):
+    """Search the prose of the models in a trestle project."""
+
+    name = 'search'
+
+    def _init_arguments(self):
+        self.add_argument('text', nargs='+', help='Words to search, e.g. "account management".')
+        self.add_argument('-l', '--limit', type=int, default=10, help='Maximum number of results. Defaults to 10.')
+        self.add_argument('-t', '--type', help='Only find elements of this type, e.g. "Control".')
+        self.add_argument('--model', help='Only find elements in models of this type, e.g. "catalog".')
+        self.add_argument('--no-update', action='store_true', help='Search the index without updating it first.')
+
+    def _run(self, args):
+        """Update the project index, then print the best matching elements as JSON lines."""
+        project_root = fs.get_trestle_project_root(pathlib.Path.cwd())
+        if project_root is None:
+            raise TrestleError(f'{pathlib.Path.cwd()} is not in a trestle project')
+
+        with ProjectIndex(project_root) as index:
+            if not args.no_update:
+                index.update()
+            for result in index.search(' '.join(args.text), args.limit, args.type, args.model):
+                self.out(json.dumps(result._asdict()))
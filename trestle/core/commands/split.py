@@ -15,10 +15,11 @@
 # limitations under the License.
 """Trestle Split Command."""
 import pathlib
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 
 from ilcli import Command
 
+from trestle.core import blobs
 from trestle.core import const
 from trestle.core import utils
 from trestle.core.base_model import OscalBaseModel
@@ -47,6 +48,11 @@ class SplitCmd(Command):
             f'--{const.ARG_ELEMENT}',
             help=const.ARG_DESC_ELEMENT + ' to split.',
         )
+        self.add_argument(
+            '--externalize-blobs',
+            action='store_true',
+            help='Move base64 attachments to blob files of the model, referenced from the split files.'
+        )
 
     def _run(self, args):
         """Split an OSCAL file into elements."""
@@ -69,11 +75,20 @@ class SplitCmd(Command):
 
         element_paths: List[ElementPath] = cmd_utils.parse_element_args(args[const.ARG_ELEMENT].split(','))
 
-        split_plan = self.split_model(model, element_paths, base_dir, content_type)
+        blob_store = blobs.BlobStore(blobs.get_blob_dir(file_absolute_path))
+        try:
+            # move the attachments out of the model so that the split files only hold references to them
+            if args['externalize_blobs']:
+                blobs.externalize(model, blob_store)
+
+            split_plan = self.split_model(model, element_paths, base_dir, content_type)
 
-        # Simulate the plan
-        # if it fails, it would throw errors and get out of this command
-        split_plan.simulate()
+            # Simulate the plan
+            # if it fails, it would throw errors and get out of this command
+            split_plan.simulate()
+        except BaseException:
+            blob_store.discard()
+            raise
 
         # If we are here then simulation passed
         # so move the original file to the trash
@@ -118,7 +133,8 @@ class SplitCmd(Command):
         content_type: FileContentType,
         cur_path_index: int,
         split_plan: Plan,
-        strip_root: bool
+        strip_root: bool,
+        sub_models: Optional[Any] = None
     ) -> Plan:
         """Recursively split the model at the provided chain of element paths.
 
@@ -139,6 +155,8 @@ class SplitCmd(Command):
         ]
         for a command like below:
            trestle split -f target.yaml -e target-definition.targets.*.target-control-implementations.*
+
+        If sub_models is given, it is used as the sub model at the first path of the chain instead of resolving it.
         """
         # assume we ran the command below:
         # trestle split -f target.yaml -e target-definition.targets.*.target-control-implementations.*
@@ -172,7 +190,8 @@ class SplitCmd(Command):
             msg += f'found path "{element_path}" with level = {len(path_parts)}'
             raise TrestleError(msg)
 
-        sub_models = element.get_at(element_path, False)  # we call sub_models as in plural, but it can be just one
+        if sub_models is None:
+            sub_models = element.get_at(element_path, False)  # we call sub_models as in plural, but it can be one
         if sub_models is None:
             return cur_path_index
 
@@ -285,6 +304,11 @@ class SplitCmd(Command):
         # initialize plan
         split_plan = Plan()
 
+        # resolve the first path of every path chain in a single descent of the model
+        chain_indices = [i for i, element_path in enumerate(element_paths) if element_path.get_parent() is None]
+        chain_sub_models = Element(model_obj).get_many([element_paths[i] for i in chain_indices], False)
+        sub_models_by_index = dict(zip(chain_indices, chain_sub_models))
+
         # loop through the element path list and update the split_plan
         stripped_field_alias = []
         cur_path_index = 0
@@ -301,7 +325,14 @@ class SplitCmd(Command):
 
             # split model at the path chain
             cur_path_index = cls.split_model_at_path_chain(
-                model_obj, element_paths, base_dir, content_type, cur_path_index, split_plan, False
+                model_obj,
+                element_paths,
+                base_dir,
+                content_type,
+                cur_path_index,
+                split_plan,
+                False,
+                sub_models_by_index.get(cur_path_index)
             )
 
             cur_path_index += 1
@@ -0,0 +1,76 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Trestle Stats Command."""
+
+import json
+import os
+import pathlib
+
+from ilcli import Command
+
+from trestle.core.commands import cmd_utils
+from trestle.core.err import TrestleError
+from trestle.core.stats import Stats, collect_files
+from trestle.utils import fs
+
+
+class StatsCmd(Command):
+    """Count findings, observations and risks of assessment results and plans of action and milestones."""
+
+    name = 'stats'
+
+    def _init_arguments(self):
+        self.add_argument(
+            'files',
+            nargs='*',
+            help='Files, directories or glob patterns of the models to count. Defaults to the current trestle project.'
+        )
+        self.add_argument(
+            '-j', '--jobs', type=int, default=os.cpu_count() or 1, help='Number of files counted in parallel.'
+        )
+        self.add_argument(
+            '--merge',
+            action='append',
+            default=[],
+            help='Statistics file written with --output to merge into the statistics. It can be repeated.'
+        )
+        self.add_argument('-o', '--output', help='Path of a JSON file to write the statistics to, to merge them later.')
+
+    def _run(self, args):
+        """Count the models and merged statistics, then print the statistics as JSON.
+
+        Files that cannot be counted are reported in the statistics and the command fails once all files are counted.
+        """
+        file_args = args.files
+        if not file_args and not args.merge:
+            project_root = fs.get_trestle_project_root(pathlib.Path.cwd())
+            if project_root is None:
+                raise TrestleError(f'{pathlib.Path.cwd()} is not in a trestle project')
+            file_args = [str(project_root)]
+
+        files = []
+        for file_arg in file_args:
+            files.extend(cmd_utils.find_model_files(file_arg))
+        stats = collect_files(files, args.jobs)
+        for merge_path in args.merge:
+            stats.merge(Stats.read(pathlib.Path(merge_path)))
+
+        if args.output is not None:
+            stats.write(pathlib.Path(args.output))
+        self.out(json.dumps(stats.as_dict(), indent=2))
+        if stats.errors:
+            file_path, error = next(iter(stats.errors.items()))
+            raise TrestleError(f'{len(stats.errors)} file(s) could not be counted: {file_path}: {error}')
@@ -15,14 +15,56 @@
 # limitations under the License.
 """Trestle Validate Command."""
 
+import json
+import os
 import pathlib
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
 
 from ilcli import Command
 
 import trestle.core.validater as validater
-import trestle.oscal.target as ostarget
+from trestle import __version__
 from trestle.core import const
+from trestle.core import utils
+from trestle.core.commands import cmd_utils
 from trestle.core.err import TrestleError, TrestleValidationError
+from trestle.core.hash_verifier import CACHE_NAMESPACE as HASHES_NAMESPACE, HashVerifier
+from trestle.utils import fs
+from trestle.utils.cache import DiskCache, hash_file, make_key
+
+# namespace of the validation results in the trestle cache directory
+CACHE_NAMESPACE = 'validate'
+
+
+def validate_file(file_path: str,
+                  modes: List[str],
+                  items: Optional[List[str]],
+                  cache_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Validate a single OSCAL file and return the result as a dict.
+
+    The model type is detected from the file. Without modes only the model itself is validated, i.e. that it can be
+    parsed into the model type. The digests of the files linked from the model are cached in the cache directory if
+    one is given. This is a module level function so that it can be run in a worker process.
+    """
+    start = time.perf_counter()
+    result: Dict[str, Any] = {
+        'file': file_path, 'model': None, 'valid': False, 'violations': [], 'error': None, 'cached': False
+    }
+    try:
+        model = cmd_utils.get_model(pathlib.Path(file_path))
+        result['model'] = utils.classname_to_alias(model.__class__.__name__, 'json')
+        verifier = HashVerifier(DiskCache(pathlib.Path(cache_dir), HASHES_NAMESPACE) if cache_dir else None)
+        rules = validater.create_rules(modes, items, pathlib.Path(file_path).absolute().parent, verifier)
+        violations = validater.ValidationEngine(rules).validate(model)
+        result['violations'] = [str(violation) for violation in violations]
+        result['valid'] = len(violations) == 0
+    except Exception as e:
+        # any failure to load a file makes it invalid without aborting the other files
+        result['error'] = f'{e.__class__.__name__}: {e}'
+    result['seconds'] = round(time.perf_counter() - start, 6)
+    return result
 
 
 class ValidateCmd(Command):
@@ -34,44 +76,197 @@ class ValidateCmd(Command):
         self.add_argument(
             f'-{const.ARG_FILE_SHORT}',
             f'--{const.ARG_FILE}',
-            help=const.ARG_DESC_FILE + ' to validate.',
+            help=const.ARG_DESC_FILE + ', directory, trestle project root or glob pattern to validate.',
         )
         self.add_argument(
             f'-{const.ARG_ITEM_SHORT}',
             f'--{const.ARG_ITEM}',
-            help=const.ARG_DESC_ITEM + ' to validate.',
+            action='append',
+            help=const.ARG_DESC_ITEM + ' to validate. It can be repeated.',
         )
         self.add_argument(
             f'-{const.ARG_MODE_SHORT}',
             f'--{const.ARG_MODE}',
-            help=const.ARG_DESC_MODE + ' to validate.',
+            action='append',
+            help=const.ARG_DESC_MODE + ' to validate. It can be repeated to run several modes in one pass.',
+        )
+        self.add_argument(
+            '-j', '--jobs', type=int, default=os.cpu_count() or 1, help='Number of files validated in parallel.'
+        )
+        self.add_argument('--fail-fast', action='store_true', help='Stop at the first invalid file.')
+        self.add_argument('--summary', help='Path of a JSON file to write the summary of the validation to.')
+        self.add_argument(
+            '--cache-dir',
+            help=f'Directory of the validation cache. Defaults to {const.TRESTLE_CACHE_DIR} in the trestle project.'
         )
+        self.add_argument('--no-cache', action='store_true', help='Validate all files ignoring cached results.')
 
     def _run(self, args):
-        """Validate an OSCAL file in different modes."""
+        """Validate OSCAL files in different modes."""
         if args.file is None:
             raise TrestleError(f'Argument "-{const.ARG_FILE_SHORT}" is required')
 
-        if args.mode is None:
-            raise TrestleError(f'Argument "-{const.ARG_MODE_SHORT}" is required')
-        mode = args.mode
-        if mode != const.VAL_MODE_DUPLICATES:
-            raise TrestleError(f'Mode value "{mode}" is not recognized.')
-
-        if args.item is None:
+        modes = args.mode if args.mode else []
+        if const.VAL_MODE_DUPLICATES in modes and not args.item:
             raise TrestleError(f'Argument "-{const.ARG_ITEM_SHORT}" is required')
-        item = args.item
-
-        model = ostarget.TargetDefinition.oscal_read(pathlib.Path(args.file))
-
-        loe = validater.find_values_by_name(model, item)
-        if loe:
-            nitems = len(loe)
-            is_valid = nitems == len(set(loe))
-            if is_valid:
-                self.out(f'The model is valid and contains no duplicates of item {args.item}')
-            else:
-                self.out(f'The model is invalid and contains duplicates of item {args.item}')
-                raise TrestleValidationError(f'Model {args.file} is invalid with duplicate values of {args.item}')
+
+        # fail early on unknown modes rather than once per file
+        rules = validater.create_rules(modes, args.item)
+
+        files = cmd_utils.find_model_files(args.file)
+        if not files:
+            raise TrestleError(f'No OSCAL files found at "{args.file}"')
+
+        start = time.perf_counter()
+        cache = None if args.no_cache else self._get_cache(args.cache_dir, args.file)
+        cache_dir = str(cache.get_dir().parent) if cache is not None else None
+        if const.VAL_MODE_HASHES in modes:
+            # the result also depends on the linked files, whose digests are cached instead
+            cache = None
+        rule_set = sorted(str(rule) for rule in rules)
+        cached_results, keys = self._lookup_cache(cache, files, rule_set)
+
+        uncached_files = [f for f in files if str(f) not in cached_results]
+        validated_results = self._validate_files(uncached_files, modes, args.item, args.jobs, args.fail_fast, cache_dir)
+        for result in validated_results:
+            key = keys.get(result['file'])
+            if cache is not None and key is not None and result['valid']:
+                cache.put(key, {'model': result['model'], 'rules': rule_set})
+
+        validated_by_file = {result['file']: result for result in validated_results}
+        validated_by_file.update(cached_results)
+        results = [validated_by_file[str(f)] for f in files if str(f) in validated_by_file]
+        elapsed = time.perf_counter() - start
+
+        invalid = [result for result in results if not result['valid']]
+        for result in results:
+            status = 'valid' if result['valid'] else 'invalid'
+            if result['cached']:
+                status += ', cached'
+            self.out(f'{result["file"]}: {status} ({result["seconds"]:.3f}s)')
+            if result['error'] is not None:
+                self.out(f'    {result["error"]}')
+            for violation in result['violations']:
+                self.out(f'    {violation}')
+
+        if args.summary is not None:
+            summary = {
+                'trestle-version': __version__,
+                'modes': modes,
+                'rules': [str(rule) for rule in rules],
+                'total': len(results),
+                'valid': len(results) - len(invalid),
+                'invalid': len(invalid),
+                'skipped': len(files) - len(results),
+                'seconds': round(elapsed, 6),
+                'cache': self._get_cache_summary(cache),
+                'files': results
+            }
+            with open(args.summary, 'w', encoding='utf8') as fp:
+                json.dump(summary, fp, indent=2)
+
+        if cache is not None:
+            stats = cache.get_stats()
+            self.out(f'Cache {cache.get_dir()}: {stats["hits"]} hit(s), {stats["misses"]} miss(es)')
+        self.out(f'Validated {len(results)} of {len(files)} file(s) in {elapsed:.3f}s: {len(invalid)} invalid')
+        if invalid:
+            raise TrestleValidationError(f'{len(invalid)} file(s) are invalid: {invalid[0]["file"]}')
+
+    @classmethod
+    def _get_cache(cls, cache_dir: Optional[str], file_arg: str) -> Optional[DiskCache]:
+        """Get the validation cache, by default in the trestle project of the files if there is one."""
+        if cache_dir is not None:
+            return DiskCache(pathlib.Path(cache_dir), CACHE_NAMESPACE)
+
+        # use the part of a glob pattern before the first wildcard to find the project
+        search_path = pathlib.Path(file_arg.split('*')[0].split('?')[0].split('[')[0] or '.').absolute()
+        project_root = fs.get_trestle_project_root(search_path)
+        if project_root is None:
+            return None
+
+        return DiskCache(project_root / const.TRESTLE_CACHE_DIR, CACHE_NAMESPACE)
+
+    @classmethod
+    def _get_cache_summary(cls, cache: Optional[DiskCache]) -> Dict[str, Any]:
+        if cache is None:
+            return {'dir': None, 'hits': 0, 'misses': 0}
+        return {'dir': str(cache.get_dir()), **cache.get_stats()}
+
+    @classmethod
+    def _get_model_context(cls, file_path: pathlib.Path) -> str:
+        """Describe the model type inferred for a file from its location in a trestle project.
+
+        The model type of a split file depends on its sibling directories, not only on its content.
+        """
+        absolute_path = file_path.absolute()
+        if not fs.is_valid_project_model_path(absolute_path):
+            return ''
+
+        model_type, model_alias = fs.get_stripped_contextual_model(absolute_path)
+        return f'{model_alias}:{",".join(sorted(model_type.__fields__.keys()))}'
+
+    @classmethod
+    def _lookup_cache(cls, cache: Optional[DiskCache], files: List[pathlib.Path],
+                      rule_set: List[str]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+        """Return the results of files with a cached pass and the cache keys of all files.
+
+        The key of a file combines the hash of its content, the trestle version, the rule set and the model context.
+        """
+        cached_results: Dict[str, Dict[str, Any]] = {}
+        keys: Dict[str, str] = {}
+        if cache is None:
+            return cached_results, keys
+
+        for f in files:
+            start = time.perf_counter()
+            try:
+                key = make_key(hash_file(f), __version__, ','.join(rule_set), cls._get_model_context(f))
+            except Exception:
+                # files that cannot be read or located in the project are just not cached
+                continue
+
+            keys[str(f)] = key
+            entry = cache.get(key)
+            if entry is not None:
+                cached_results[str(f)] = {
+                    'file': str(f),
+                    'model': entry['model'],
+                    'valid': True,
+                    'violations': [],
+                    'error': None,
+                    'cached': True,
+                    'seconds': round(time.perf_counter() - start, 6)
+                }
+
+        return cached_results, keys
+
+    @classmethod
+    def _validate_files(
+        cls,
+        files: List[pathlib.Path],
+        modes: List[str],
+        items: Optional[List[str]],
+        jobs: int,
+        fail_fast: bool,
+        cache_dir: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Validate the files, in a process pool if there are several jobs, and return results in file order."""
+        results: Dict[str, Dict[str, Any]] = {}
+        if jobs <= 1 or len(files) <= 1:
+            for f in files:
+                result = validate_file(str(f), modes, items, cache_dir)
+                results[result['file']] = result
+                if fail_fast and not result['valid']:
+                    break
         else:
-            self.out(f'The model is valid but contains no items of name {args.item}')
+            with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as executor:
+                futures = [executor.submit(validate_file, str(f), modes, items, cache_dir) for f in files]
+                for future in as_completed(futures):
+                    result = future.result()
+                    results[result['file']] = result
+                    if fail_fast and not result['valid']:
+                        for pending in futures:
+                            pending.cancel()
+                        break
+
+        return [results[str(f)] for f in files if str(f) in results]
@@ -22,6 +22,8 @@ TRESTLE_DIST_DIR = 'dist'
 TRESTLE_TRASH_DIR = '.trestle/_trash/'
 TRESTLE_TRASH_FILE_EXT = '.bk'
 TRESTLE_CONFIG_FILE = 'config.ini'
+TRESTLE_CACHE_DIR = '.trestle/cache'
+TRESTLE_INDEX_FILE = '.trestle/index.sqlite'
 
 # Map of plural form of a model type to the oscal module that contains the classes related to it
 MODELTYPE_TO_MODELMODULE = {
@@ -51,6 +53,9 @@ ARG_DESC_ELEMENT = 'Path of the element in the OSCAL model'
 
 TMP_DIR_NAME = '__tmp_dir'
 
+# Directory of the out-of-line attachments of a model
+BLOB_DIR_NAME = '.blobs'
+
 # Index separater for naming directories representing collection properties
 IDX_SEP = '__'
 
@@ -71,3 +76,10 @@ ARG_ITEM_SHORT = 'i'
 ARG_DESC_ITEM = 'Item used'
 
 VAL_MODE_DUPLICATES = 'duplicates'
+VAL_MODE_TIMEZONE = 'timezone'
+VAL_MODE_REFERENCES = 'references'
+VAL_MODE_UNUSED = 'unused'
+VAL_MODE_HASHES = 'hashes'
+
+# Extensions of files that can hold an OSCAL model
+MODEL_FILE_EXTENSIONS = ['.json', '.yaml', '.yml']
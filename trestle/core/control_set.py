@@ -0,0 +1,283 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Set algebra over the controls of catalogs, for the selection of controls by profiles.
+
+The controls of a catalog get dense integer positions in document order, so that a selection of controls is a single
+integer used as a bitset. Unions, intersections and differences of selections are then single integer operations
+whatever the number of controls, and the selection of a pattern selector is computed once per catalog.
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Pattern
+
+from trestle.core.catalog_index import CatalogIndex
+from trestle.core.err import TrestleError
+from trestle.oscal import catalog
+from trestle.oscal import profile
+
+# Value of `with-child-controls` for which the child controls of a selected control are also selected.
+WITH_CHILD_CONTROLS = 'yes'
+
+
+class ControlSpace:
+    """Dense integer positions of the controls of a catalog.
+
+    Position `i` is bit `1 << i` of the bitsets of the selections in this space. The mask of the descendants (the
+    nested controls, e.g. control enhancements) of every control is precomputed, so that selecting a control with its
+    child controls is a single OR.
+    """
+
+    def __init__(self, ids: List[str], parents: Optional[List[int]] = None):
+        """Initialize a space from the control ids in document order and the position of the parent of each control.
+
+        A parent position of -1 marks a control that is not nested in another control.
+        """
+        self._ids = list(ids)
+        self._positions: Dict[str, int] = {}
+        for position, control_id in enumerate(self._ids):
+            if control_id in self._positions:
+                raise TrestleError(f'Duplicate control id "{control_id}"')
+            self._positions[control_id] = position
+
+        parents = parents if parents is not None else [-1] * len(self._ids)
+        if len(parents) != len(self._ids):
+            raise TrestleError('The parents of the controls do not match the controls')
+
+        # descendants follow their ancestors in document order, so a single reverse pass accumulates them
+        self._descendants = [0] * len(self._ids)
+        for position in range(len(self._ids) - 1, -1, -1):
+            parent = parents[position]
+            if parent >= 0:
+                self._descendants[parent] |= self._descendants[position] | (1 << position)
+
+        # bitsets of the pattern selectors already matched
+        self._patterns: Dict[str, int] = {}
+
+    @classmethod
+    def from_catalog(cls, cat: catalog.Catalog) -> 'ControlSpace':
+        """Create the space of all controls of a catalog, including the controls nested in groups and controls."""
+        return cls.from_index(CatalogIndex(cat))
+
+    @classmethod
+    def from_index(cls, index: CatalogIndex) -> 'ControlSpace':
+        """Create the space of all controls of an indexed catalog."""
+        return cls(index.get_ids(), index.get_parents())
+
+    def __len__(self) -> int:
+        """Return the number of controls in the space."""
+        return len(self._ids)
+
+    def get_ids(self) -> List[str]:
+        """Return the control ids in document order."""
+        return list(self._ids)
+
+    def get_position(self, control_id: str) -> Optional[int]:
+        """Return the position of a control id, or None if the catalog has no such control."""
+        return self._positions.get(control_id)
+
+    def empty(self) -> 'ControlSet':
+        """Return the empty selection."""
+        return ControlSet(self, 0)
+
+    def full(self) -> 'ControlSet':
+        """Return the selection of all controls."""
+        return ControlSet(self, (1 << len(self._ids)) - 1)
+
+    def select_ids(self, control_ids: Iterable[str], with_child_controls: bool = False) -> 'ControlSet':
+        """Return the selection of the controls with the given ids, ignoring the ids that are not in the catalog."""
+        bits = 0
+        for control_id in control_ids:
+            position = self._positions.get(control_id)
+            if position is not None:
+                bits |= 1 << position
+        return ControlSet(self, self._with_children(bits) if with_child_controls else bits)
+
+    def select_pattern(self, pattern: str, with_child_controls: bool = False) -> 'ControlSet':
+        """Return the selection of the controls whose whole id matches the regular expression.
+
+        The pattern is compiled once and the bitset of each pattern is cached.
+        """
+        bits = self._patterns.get(pattern)
+        if bits is None:
+            bits = 0
+            fullmatch = self._compile(pattern).fullmatch
+            for position, control_id in enumerate(self._ids):
+                if fullmatch(control_id):
+                    bits |= 1 << position
+            self._patterns[pattern] = bits
+        return ControlSet(self, self._with_children(bits) if with_child_controls else bits)
+
+    def _compile(self, pattern: str) -> Pattern[str]:
+        try:
+            return re.compile(pattern)
+        except re.error as e:
+            raise TrestleError(f'Invalid control id pattern "{pattern}": {e}')
+
+    def _with_children(self, bits: int) -> int:
+        result = bits
+        for position in iter_bits(bits):
+            result |= self._descendants[position]
+        return result
+
+    def select(self, include: Optional[profile.Include], exclude: Optional[profile.Exclude] = None) -> 'ControlSet':
+        """Return the controls selected by the include and exclude directives of a profile import.
+
+        Without include directives all controls are included, as for `include: {all: {}}`.
+        """
+        selection = self.full() if include is None or include.all is not None else self._select_calls(include)
+        if exclude is not None:
+            selection = selection - self._select_calls(exclude)
+        return selection
+
+    def _select_calls(self, selectors) -> 'ControlSet':
+        """Return the union of the controls selected by the id selectors and pattern selectors of a directive."""
+        selection = self.empty()
+        for call in selectors.id_selectors or []:
+            selection = selection | self.select_ids([call.control_id], self._has_children(call))
+        for match in selectors.pattern_selectors or []:
+            if match.pattern is not None:
+                selection = selection | self.select_pattern(match.pattern, self._has_children(match))
+        return selection
+
+    @staticmethod
+    def _has_children(selector) -> bool:
+        value = selector.with_child_controls
+        return value is not None and value.value == WITH_CHILD_CONTROLS
+
+
+class ControlSet:
+    """An immutable selection of controls of a control space, stored as a bitset."""
+
+    __slots__ = ('_space', '_bits')
+
+    def __init__(self, space: ControlSpace, bits: int = 0):
+        """Initialize a selection from the bitset of control positions."""
+        self._space = space
+        self._bits = bits
+
+    def get_space(self) -> ControlSpace:
+        """Return the space of the selection."""
+        return self._space
+
+    def get_bits(self) -> int:
+        """Return the bitset of the selected control positions."""
+        return self._bits
+
+    def get_ids(self) -> List[str]:
+        """Return the selected control ids in document order."""
+        return list(self)
+
+    def _check(self, other: 'ControlSet') -> None:
+        if not isinstance(other, ControlSet):
+            raise TypeError(f'Cannot combine a control set with {other.__class__.__name__}')
+        if other._space is not self._space:
+            raise TrestleError('Cannot combine selections of controls of different catalogs')
+
+    def __or__(self, other: 'ControlSet') -> 'ControlSet':
+        """Return the union of two selections."""
+        self._check(other)
+        return ControlSet(self._space, self._bits | other._bits)
+
+    def __and__(self, other: 'ControlSet') -> 'ControlSet':
+        """Return the intersection of two selections."""
+        self._check(other)
+        return ControlSet(self._space, self._bits & other._bits)
+
+    def __sub__(self, other: 'ControlSet') -> 'ControlSet':
+        """Return the controls of this selection that are not in the other one."""
+        self._check(other)
+        return ControlSet(self._space, self._bits & ~other._bits)
+
+    def __xor__(self, other: 'ControlSet') -> 'ControlSet':
+        """Return the controls in exactly one of the two selections."""
+        self._check(other)
+        return ControlSet(self._space, self._bits ^ other._bits)
+
+    def __invert__(self) -> 'ControlSet':
+        """Return the controls of the space that are not in this selection."""
+        return ControlSet(self._space, self._space.full()._bits & ~self._bits)
+
+    def __eq__(self, other: object) -> bool:
+        """Check whether two selections select the same controls of the same space."""
+        return isinstance(other, ControlSet) and other._space is self._space and other._bits == self._bits
+
+    def __hash__(self) -> int:
+        """Hash the selection by its bitset."""
+        return hash(self._bits)
+
+    def __len__(self) -> int:
+        """Return the number of selected controls."""
+        return bin(self._bits).count('1')
+
+    def __bool__(self) -> bool:
+        """Check whether any control is selected."""
+        return self._bits != 0
+
+    def __contains__(self, control_id: str) -> bool:
+        """Check whether the control with the id is selected."""
+        position = self._space.get_position(control_id)
+        return position is not None and (self._bits >> position) & 1 == 1
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the selected control ids in document order."""
+        ids = self._space._ids
+        for position in iter_bits(self._bits):
+            yield ids[position]
+
+    def issubset(self, other: 'ControlSet') -> bool:
+        """Check whether all controls of this selection are in the other one."""
+        self._check(other)
+        return self._bits & ~other._bits == 0
+
+    @classmethod
+    def union(cls, space: ControlSpace, selections: Iterable['ControlSet']) -> 'ControlSet':
+        """Return the controls selected by any of the selections."""
+        result = space.empty()
+        for selection in selections:
+            result = result | selection
+        return result
+
+    @classmethod
+    def intersection(cls, space: ControlSpace, selections: Iterable['ControlSet']) -> 'ControlSet':
+        """Return the controls selected by all the selections, or all controls if there is no selection."""
+        result = space.full()
+        for selection in selections:
+            result = result & selection
+        return result
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """Iterate over the positions of the set bits of a non-negative integer in increasing order."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def select_profile_controls(prof: profile.Profile, spaces: Dict[str, ControlSpace]) -> Dict[str, ControlSet]:
+    """Return the controls selected by each import of a profile, by the href of the imported catalog.
+
+    The spaces of the imported catalogs are given by href. Selections of several imports of the same catalog are
+    merged.
+    """
+    selections: Dict[str, ControlSet] = {}
+    for import_ in prof.imports:
+        space = spaces.get(import_.href)
+        if space is None:
+            raise TrestleError(f'No catalog is given for the import of "{import_.href}"')
+        selection = space.select(import_.include, import_.exclude)
+        selections[import_.href] = selections[import_.href] | selection if import_.href in selections else selection
+    return selections
@@ -0,0 +1,257 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Control implementation coverage of systems over a catalog.
+
+A coverage matrix holds the implementation status of each control of a catalog in each system, where a system is an
+SSP, a component definition or a target definition. Statuses are stored as one byte per control in a column per
+system, in the document order of the catalog index, so that roll-ups are counts over byte strings. When NumPy is
+installed the roll-ups are computed on a (system x control) array instead.
+"""
+
+import csv
+import json
+import logging
+import pathlib
+from typing import Any, Dict, Iterable, List, Optional
+
+from pydantic import BaseModel
+
+from trestle.core.catalog_index import CatalogIndex
+from trestle.core.err import TrestleError
+from trestle.core.traversal import traverse
+from trestle.oscal import component
+from trestle.oscal import ssp
+from trestle.oscal import target
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+# Name of the property holding the implementation status of a requirement, a statement or a component.
+STATUS_PROP = 'implementation-status'
+
+# Statuses by code, the code of a status being its position. 'none' is the status of controls without requirement.
+STATUSES = ['none', 'planned', 'partial', 'alternative', 'implemented', 'not-applicable']
+NONE, PLANNED, PARTIAL, ALTERNATIVE, IMPLEMENTED, NOT_APPLICABLE = range(len(STATUSES))
+
+# Statuses counted as covering a control.
+COVERED_STATUSES = [ALTERNATIVE, IMPLEMENTED]
+
+REQUIREMENT_TYPES = (ssp.ImplementedRequirement, component.ImplementedRequirement, target.ImplementedRequirement)
+
+
+def combine_statuses(codes: Iterable[int], default: int = IMPLEMENTED) -> int:
+    """Combine the statuses of the parts of an implementation into one status.
+
+    Parts that are not applicable are ignored unless all parts are. Parts with the same status keep it and parts with
+    different statuses make a partial implementation. Without any part the status is the default.
+    """
+    applicable = set(codes)
+    if not applicable:
+        return default
+    if applicable == {NOT_APPLICABLE}:
+        return NOT_APPLICABLE
+    applicable.discard(NOT_APPLICABLE)
+    return applicable.pop() if len(applicable) == 1 else PARTIAL
+
+
+def get_requirement_status(requirement: Any, default: int = IMPLEMENTED) -> int:
+    """Return the status code of an implemented requirement.
+
+    The status is the implementation status property of the requirement, or else the combined statuses of its
+    statements and components, or else the default.
+    """
+    own = _get_status_codes(requirement)
+    if own:
+        return combine_statuses(own)
+    nested = [
+        code for node in traverse(requirement, track_paths=False)
+        if node.value is not requirement and isinstance(node.value, BaseModel)
+        for code in _get_status_codes(node.value)
+    ]
+    return combine_statuses(nested, default)
+
+
+def _get_status_codes(model: BaseModel) -> List[int]:
+    codes = []
+    for prop in getattr(model, 'properties', None) or []:
+        if prop.name == STATUS_PROP:
+            if prop.value in STATUSES:
+                codes.append(STATUSES.index(prop.value))
+            else:
+                logger.warning(f'Unknown implementation status "{prop.value}"')
+    return codes
+
+
+class CoverageMatrix:
+    """Matrix of the implementation status of the controls of a catalog in systems."""
+
+    def __init__(self, index: CatalogIndex, use_numpy: Optional[bool] = None):
+        """Initialize an empty matrix over the controls of the catalog index, using NumPy by default if installed."""
+        if use_numpy and numpy is None:
+            raise TrestleError('NumPy is not installed')
+        self._index = index
+        self._ids = index.get_ids()
+        self._use_numpy = numpy is not None if use_numpy is None else use_numpy
+        self._systems: List[str] = []
+        self._columns: List[bytes] = []
+        self._unknown_ids: Dict[str, List[str]] = {}
+        self._array = None
+
+    def add_system(self, name: str, requirements: Iterable[Any], default: int = IMPLEMENTED) -> None:
+        """Add the column of a system from its implemented requirements.
+
+        The requirements of a control are combined like the parts of a requirement, so that a control implemented by
+        a component and planned by another one is partially implemented. Requirements of controls that are not in the
+        catalog are reported by `get_unknown_ids`.
+        """
+        if name in self._systems:
+            raise TrestleError(f'Duplicate system {name} in coverage matrix')
+        codes: Dict[int, List[int]] = {}
+        unknown = []
+        for requirement in requirements:
+            position = self._index.get_position(requirement.control_id)
+            if position is None:
+                unknown.append(requirement.control_id)
+            else:
+                codes.setdefault(position, []).append(get_requirement_status(requirement, default))
+        column = bytearray(len(self._ids))
+        for position, requirement_codes in codes.items():
+            column[position] = combine_statuses(requirement_codes)
+        if unknown:
+            logger.warning(f'System {name} implements {len(unknown)} controls that are not in the catalog')
+            self._unknown_ids[name] = unknown
+        self._systems.append(name)
+        self._columns.append(bytes(column))
+        self._array = None
+
+    def add_model(self, name: str, model: Any, default: int = IMPLEMENTED) -> None:
+        """Add the column of a system from all implemented requirements of an SSP, component or target definition."""
+        requirements = [
+            node.value
+            for node in traverse(model, track_paths=False)
+            if isinstance(node.value, REQUIREMENT_TYPES) and node.value.control_id
+        ]
+        self.add_system(name, requirements, default)
+
+    def get_systems(self) -> List[str]:
+        """Return the system names in the order they were added."""
+        return list(self._systems)
+
+    def get_control_ids(self) -> List[str]:
+        """Return the control ids of the rows in document order."""
+        return list(self._ids)
+
+    def get_unknown_ids(self) -> Dict[str, List[str]]:
+        """Return the ids of the controls that are not in the catalog by system."""
+        return {name: list(ids) for name, ids in self._unknown_ids.items()}
+
+    def get_status(self, control_id: str, system: str) -> str:
+        """Return the status of a control in a system."""
+        position = self._index.get_position(control_id)
+        if position is None:
+            raise TrestleError(f'Control {control_id} is not in the catalog')
+        return STATUSES[self._get_column(system)[position]]
+
+    def get_row(self, control_id: str) -> Dict[str, str]:
+        """Return the status of a control in each system."""
+        return {system: self.get_status(control_id, system) for system in self._systems}
+
+    def get_system_counts(self) -> Dict[str, Dict[str, int]]:
+        """Return the number of controls with each status by system."""
+        if self._use_numpy:
+            array = self._get_array()
+            counts = [[int(count) for count in row] for row in (array[:, :, None] == self._get_codes()).sum(axis=1)]
+        else:
+            counts = [[column.count(code) for code in range(len(STATUSES))] for column in self._columns]
+        return {system: dict(zip(STATUSES, row)) for system, row in zip(self._systems, counts)}
+
+    def get_control_counts(self) -> Dict[str, Dict[str, int]]:
+        """Return the number of systems with each status by control."""
+        if self._use_numpy:
+            array = self._get_array()
+            counts = [[int(count) for count in row] for row in (array[:, :, None] == self._get_codes()).sum(axis=0)]
+        else:
+            counts = [[0] * len(STATUSES) for _ in self._ids]
+            for column in self._columns:
+                for row, code in zip(counts, column):
+                    row[code] += 1
+        return {control_id: dict(zip(STATUSES, row)) for control_id, row in zip(self._ids, counts)}
+
+    def get_group_counts(self, system: str) -> Dict[str, Dict[str, int]]:
+        """Return the number of controls with each status in a system by top-level group of the catalog."""
+        column = self._get_column(system)
+        counts: Dict[str, List[int]] = {}
+        for position, control_id in enumerate(self._ids):
+            groups = list(self._index.iter_group_ancestors(control_id))
+            group_id = groups[-1].id if groups else ''
+            counts.setdefault(group_id, [0] * len(STATUSES))[column[position]] += 1
+        return {group_id: dict(zip(STATUSES, row)) for group_id, row in counts.items()}
+
+    def get_coverage(self) -> Dict[str, float]:
+        """Return the fraction of the applicable controls that are implemented, or alternatively, by system."""
+        coverage = {}
+        for system, counts in self.get_system_counts().items():
+            applicable = len(self._ids) - counts[STATUSES[NOT_APPLICABLE]]
+            covered = sum(counts[STATUSES[code]] for code in COVERED_STATUSES)
+            coverage[system] = covered / applicable if applicable else 1.0
+        return coverage
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the matrix and its per-system roll-up as JSON data."""
+        return {
+            'systems': self.get_systems(),
+            'controls': [
+                {
+                    'control-id': control_id, 'statuses': [STATUSES[column[position]] for column in self._columns]
+                } for position,
+                control_id in enumerate(self._ids)
+            ],
+            'summary': self.get_system_counts(),
+            'coverage': self.get_coverage()
+        }
+
+    def write_json(self, path: pathlib.Path) -> None:
+        """Write the matrix and its roll-up to a JSON file."""
+        with open(path, 'w', encoding='utf8') as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+    def write_csv(self, path: pathlib.Path) -> None:
+        """Write the matrix to a CSV file with a row per control and a column per system."""
+        with open(path, 'w', encoding='utf8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['control-id'] + self._systems)
+            for position, control_id in enumerate(self._ids):
+                writer.writerow([control_id] + [STATUSES[column[position]] for column in self._columns])
+
+    def _get_column(self, system: str) -> bytes:
+        try:
+            return self._columns[self._systems.index(system)]
+        except ValueError:
+            raise TrestleError(f'System {system} is not in the coverage matrix')
+
+    def _get_array(self):
+        if self._array is None:
+            data = numpy.frombuffer(b''.join(self._columns), dtype=numpy.uint8)
+            self._array = data.reshape(len(self._systems), len(self._ids))
+        return self._array
+
+    @staticmethod
+    def _get_codes():
+        return numpy.arange(len(STATUSES), dtype=numpy.uint8)
@@ -0,0 +1,194 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Verification of the hashes of the resources linked from the back matter.
+
+The `rlinks` of back matter resources carry the hashes of the artifacts they link to. The verifier resolves the links
+to local files, and hashes every distinct file once for all the algorithms it is checked with. Files are read through
+a memory map in chunks, and are hashed in a thread pool since hashlib releases the GIL while hashing large buffers.
+The digests are cached by the path, size and modification time of the files, in memory and optionally in a `DiskCache`
+so that unchanged files are not read again by later runs.
+"""
+
+import hashlib
+import mmap
+import os
+import pathlib
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from trestle.core.err import TrestleError
+from trestle.utils.cache import DiskCache, HASH_CHUNK_SIZE, make_key
+
+# hashlib names of the hash algorithms allowed in OSCAL
+HASH_ALGORITHMS = {
+    'SHA-224': 'sha224',
+    'SHA-256': 'sha256',
+    'SHA-384': 'sha384',
+    'SHA-512': 'sha512',
+    'SHA3-224': 'sha3_224',
+    'SHA3-256': 'sha3_256',
+    'SHA3-384': 'sha3_384',
+    'SHA3-512': 'sha3_512'
+}
+
+# namespace of the digests in the trestle cache directory
+CACHE_NAMESPACE = 'hashes'
+
+
+def get_hash_name(algorithm: str) -> str:
+    """Return the hashlib name of an OSCAL hash algorithm."""
+    name = HASH_ALGORITHMS.get(algorithm.upper())
+    if name is None:
+        raise TrestleError(f'Unsupported hash algorithm "{algorithm}"')
+    return name
+
+
+def resolve_local_href(href: str, base_dir: pathlib.Path) -> Optional[pathlib.Path]:
+    """Return the path of the local file an href links to, or None if it links to a remote or internal resource.
+
+    Relative paths are resolved against the base directory, which is usually the directory of the model file.
+    """
+    parsed = urllib.parse.urlparse(href)
+    if parsed.scheme == 'file':
+        path = pathlib.Path(urllib.parse.unquote(parsed.path))
+    elif len(parsed.scheme) == 1:
+        # a single letter scheme is a windows drive
+        path = pathlib.Path(href)
+    elif parsed.scheme or not parsed.path:
+        # remote resources, and fragments linking to resources of the model
+        return None
+    else:
+        path = pathlib.Path(urllib.parse.unquote(parsed.path))
+    if not path.is_absolute():
+        path = pathlib.Path(base_dir) / path
+    return path
+
+
+def hash_file(file_path: pathlib.Path, hash_names: Iterable[str]) -> Dict[str, str]:
+    """Return the hex digests of a file for the hashlib algorithms, reading it once through a memory map."""
+    hashers = {name: hashlib.new(name) for name in hash_names}
+    with open(file_path, 'rb') as fp:
+        size = os.fstat(fp.fileno()).st_size
+        # empty files cannot be mapped
+        if size > 0:
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    for offset in range(0, size, HASH_CHUNK_SIZE):
+                        chunk = view[offset:offset + HASH_CHUNK_SIZE]
+                        for hasher in hashers.values():
+                            hasher.update(chunk)
+                        chunk.release()
+    return {name: hasher.hexdigest() for name, hasher in hashers.items()}
+
+
+class HashMismatch:
+    """A hash of a linked file that could not be verified."""
+
+    def __init__(self, path: pathlib.Path, algorithm: str, expected: str, actual: Optional[str], error: str = ''):
+        """Initialize a mismatch, with no actual digest if the file could not be hashed."""
+        self.path = path
+        self.algorithm = algorithm
+        self.expected = expected
+        self.actual = actual
+        self.error = error
+
+    def __str__(self):
+        """Return string representation of the mismatch."""
+        if self.actual is None:
+            return f'Cannot verify {self.algorithm} hash of "{self.path}": {self.error}'
+        return f'{self.algorithm} hash of "{self.path}" is {self.actual}, expected {self.expected}'
+
+
+class HashVerifier:
+    """Hash local files in parallel and compare them to expected digests."""
+
+    def __init__(self, cache: Optional[DiskCache] = None, workers: Optional[int] = None):
+        """Initialize a verifier with an optional disk cache of the digests and number of threads."""
+        self._cache = cache
+        self._workers = workers
+        self._digests: Dict[str, str] = {}
+        self._hashed = 0
+        self._lock = threading.Lock()
+
+    def get_hashed_count(self) -> int:
+        """Return the number of files that have been read and hashed, i.e. that were not cached."""
+        return self._hashed
+
+    @classmethod
+    def _make_key(cls, path: pathlib.Path, stat: os.stat_result, hash_name: str) -> str:
+        return make_key(str(path), str(stat.st_size), str(stat.st_mtime_ns), hash_name)
+
+    def _get_cached(self, key: str) -> Optional[str]:
+        digest = self._digests.get(key)
+        if digest is None and self._cache is not None:
+            digest = self._cache.get(key)
+            if digest is not None:
+                self._digests[key] = digest
+        return digest
+
+    def get_digests(self, path: pathlib.Path, hash_names: Iterable[str]) -> Dict[str, str]:
+        """Return the hex digests of a file for the hashlib algorithms, from the cache if the file is unchanged."""
+        path = pathlib.Path(path).resolve()
+        stat = path.stat()
+        keys = {name: self._make_key(path, stat, name) for name in set(hash_names)}
+        digests = {name: self._get_cached(key) for name, key in keys.items()}
+        missing = [name for name, digest in digests.items() if digest is None]
+        if missing:
+            digests.update(hash_file(path, missing))
+            with self._lock:
+                self._hashed += 1
+            for name in missing:
+                self._digests[keys[name]] = digests[name]
+                if self._cache is not None:
+                    self._cache.put(keys[name], digests[name])
+        return digests
+
+    def verify(self, expected: Iterable[Tuple[pathlib.Path, str, str]]) -> List[HashMismatch]:
+        """Verify the expected (path, algorithm, digest) hashes and return the mismatches in the order given.
+
+        Every file is hashed once for all its algorithms, and different files are hashed concurrently.
+        """
+        expected = list(expected)
+        mismatches: Dict[int, HashMismatch] = {}
+        hash_names_by_path: Dict[pathlib.Path, set] = {}
+        for i, (path, algorithm, digest) in enumerate(expected):
+            try:
+                hash_names_by_path.setdefault(pathlib.Path(path), set()).add(get_hash_name(algorithm))
+            except TrestleError as err:
+                mismatches[i] = HashMismatch(path, algorithm, digest, None, str(err))
+
+        def digest_path(path: pathlib.Path) -> Tuple[pathlib.Path, Dict[str, str], str]:
+            try:
+                return path, self.get_digests(path, hash_names_by_path[path]), ''
+            except OSError as err:
+                return path, {}, err.strerror or str(err)
+
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            results = {path: (digests, error) for path, digests, error in executor.map(digest_path, hash_names_by_path)}
+
+        for i, (path, algorithm, digest) in enumerate(expected):
+            if i in mismatches:
+                continue
+            digests, error = results[pathlib.Path(path)]
+            actual = digests.get(get_hash_name(algorithm))
+            if actual is None:
+                mismatches[i] = HashMismatch(path, algorithm, digest, None, error)
+            elif actual.lower() != digest.strip().lower():
+                mismatches[i] = HashMismatch(path, algorithm, digest, actual)
+
+        return [mismatches[i] for i in sorted(mismatches)]
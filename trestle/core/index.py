@@ -0,0 +1,481 @@
+# -*- mode:python; coding:utf-8 -*-
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Index of the elements of all models in a trestle project, stored in a SQLite database.
+
+The index holds one row per identified element (an element with a `uuid` or an `id`) with its model file, element
+path and type, the properties of these elements, the cross references held by any element and the timestamps of
+assessment results and POA&Ms. It is updated incrementally: only the files whose content changed since the last update
+are loaded and indexed again, each in a single traversal, so that questions such as "which models implement control
+ac-2" or "which observations were collected in the last 7 days" are answered without loading every model of the
+project.
+"""
+
+import heapq
+import logging
+import pathlib
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from pydantic import BaseModel
+
+from trestle import __version__
+from trestle.core import const
+from trestle.core import references
+from trestle.core import search
+from trestle.core import time_index
+from trestle.core import utils
+from trestle.core.commands import cmd_utils
+from trestle.core.err import TrestleError
+from trestle.core.traversal import traverse
+from trestle.utils import fs
+from trestle.utils.cache import hash_file, make_key
+
+logger = logging.getLogger(__name__)
+
+# version of the database schema, the database is rebuilt when it changes
+SCHEMA_VERSION = 3
+
+# Fields whose values reference another object, including controls which are usually defined in another model.
+INDEXED_REFERENCE_FIELDS = {**references.REFERENCE_FIELDS, 'control_id': 'control', 'control_ids': 'control'}
+
+# Fields holding the properties of an element, named differently across the OSCAL models.
+PROPERTY_FIELDS = ['properties', 'props']
+
+_SCHEMA = """
+CREATE TABLE files (
+    file TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    model TEXT,
+    error TEXT
+);
+CREATE TABLE elements (
+    element_id INTEGER PRIMARY KEY,
+    file TEXT NOT NULL REFERENCES files(file) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    type TEXT NOT NULL,
+    uuid TEXT,
+    oscal_id TEXT
+);
+CREATE TABLE props (
+    element INTEGER NOT NULL REFERENCES elements(element_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value TEXT
+);
+CREATE TABLE refs (
+    file TEXT NOT NULL REFERENCES files(file) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    type TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    target TEXT NOT NULL
+);
+CREATE TABLE docs (
+    doc_id INTEGER PRIMARY KEY,
+    file TEXT NOT NULL REFERENCES files(file) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    type TEXT NOT NULL,
+    oscal_id TEXT,
+    title TEXT,
+    length INTEGER NOT NULL
+);
+CREATE TABLE postings (
+    term TEXT NOT NULL,
+    doc INTEGER NOT NULL REFERENCES docs(doc_id) ON DELETE CASCADE,
+    frequency INTEGER NOT NULL
+);
+CREATE TABLE times (
+    file TEXT NOT NULL REFERENCES files(file) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    type TEXT NOT NULL,
+    uuid TEXT,
+    field TEXT NOT NULL,
+    time TEXT NOT NULL,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX elements_file ON elements(file);
+CREATE INDEX elements_type ON elements(type);
+CREATE INDEX elements_uuid ON elements(uuid);
+CREATE INDEX elements_oscal_id ON elements(oscal_id);
+CREATE INDEX props_element ON props(element);
+CREATE INDEX props_name_value ON props(name, value);
+CREATE INDEX refs_file ON refs(file);
+CREATE INDEX refs_target ON refs(target, kind);
+CREATE INDEX docs_file ON docs(file);
+CREATE INDEX postings_term ON postings(term);
+CREATE INDEX postings_doc ON postings(doc);
+CREATE INDEX times_file ON times(file);
+CREATE INDEX times_timestamp ON times(timestamp);
+"""
+
+_TABLES = ['times', 'postings', 'docs', 'props', 'refs', 'elements', 'files']
+
+
+class IndexedElement(NamedTuple):
+    """An identified element of a model in the project index."""
+
+    file: str
+    model: Optional[str]
+    path: str
+    element_type: str
+    uuid: Optional[str]
+    oscal_id: Optional[str]
+
+
+class IndexedTime(NamedTuple):
+    """A timestamp of an element of a model in the project index."""
+
+    file: str
+    model: Optional[str]
+    path: str
+    element_type: str
+    uuid: Optional[str]
+    field: str
+    time: str
+
+
+class IndexedReference(NamedTuple):
+    """A reference to another object held by an element of a model in the project index."""
+
+    file: str
+    model: Optional[str]
+    path: str
+    element_type: str
+    kind: str
+    target: str
+
+
+class _ElementRecord(NamedTuple):
+    """The rows collected for an element of a model."""
+
+    path: str
+    element_type: str
+    uuid: Optional[str]
+    oscal_id: Optional[str]
+    props: List[Tuple[Optional[str], Optional[str]]]
+    refs: List[Tuple[str, str]]
+    title: Optional[str]
+    terms: Dict[str, int]
+    length: int
+    times: List[time_index.TimedElement]
+
+
+class ProjectIndex:
+    """SQLite index of the elements of the models in a trestle project.
+
+    The database is stored in `.trestle` of the project by default. File paths in the index are relative to the
+    project root, so that the project can be moved without invalidating it.
+    """
+
+    def __init__(self, project_root: pathlib.Path, db_path: Optional[pathlib.Path] = None):
+        """Open the index of the project, creating the database if needed."""
+        if not fs.is_valid_project_root(project_root):
+            raise TrestleError(f'{project_root} is not a trestle project root')
+
+        self._root = pathlib.Path(project_root).absolute()
+        self._db_path = pathlib.Path(db_path) if db_path is not None else self._root / const.TRESTLE_INDEX_FILE
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self._conn = sqlite3.connect(str(self._db_path))
+            self._conn.execute('PRAGMA foreign_keys = ON')
+            self._init_schema()
+        except sqlite3.Error as e:
+            raise TrestleError(f'Cannot open the project index {self._db_path}: {e}')
+
+    def __enter__(self) -> 'ProjectIndex':
+        """Use the index as a context manager that closes it on exit."""
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Close the index."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def get_db_path(self) -> pathlib.Path:
+        """Return the path of the database file."""
+        return self._db_path
+
+    def _init_schema(self, rebuild: bool = False) -> None:
+        version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+        if version == SCHEMA_VERSION and not rebuild:
+            return
+
+        with self._conn:
+            for table in _TABLES:
+                self._conn.execute(f'DROP TABLE IF EXISTS {table}')
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def rebuild(self) -> Dict[str, int]:
+        """Drop the whole index and index all model files again."""
+        self._init_schema(rebuild=True)
+        return self.update()
+
+    def update(self, files: Optional[List[pathlib.Path]] = None) -> Dict[str, int]:
+        """Index the model files whose content changed and drop the files that no longer exist.
+
+        By default the files of all models of the project are indexed, including the files of split sub-elements whose
+        elements are indexed at their path in the whole model. Return the number of files indexed, unchanged and
+        removed.
+        """
+        if files is None:
+            files = fs.get_project_model_files(self._root, split=True)
+
+        stats = {'indexed': 0, 'unchanged': 0, 'removed': 0}
+        known = dict(self._conn.execute('SELECT file, hash FROM files').fetchall())
+        seen = set()
+        for file_path in files:
+            file_path = pathlib.Path(file_path).absolute()
+            name = file_path.relative_to(self._root).as_posix()
+            seen.add(name)
+            file_hash = make_key(hash_file(file_path), __version__)
+            if known.get(name) == file_hash:
+                stats['unchanged'] += 1
+                continue
+
+            self._index_file(file_path, name, file_hash)
+            stats['indexed'] += 1
+
+        removed = [name for name in known if name not in seen and not (self._root / name).is_file()]
+        with self._conn:
+            self._conn.executemany('DELETE FROM files WHERE file = ?', [(name, ) for name in removed])
+        stats['removed'] = len(removed)
+        return stats
+
+    def _index_file(self, file_path: pathlib.Path, name: str, file_hash: str) -> None:
+        """Replace the rows of a file by the rows collected in a single traversal of its model."""
+        model = None
+        error = None
+        try:
+            model = cmd_utils.get_model(file_path)
+        except Exception as e:
+            # a file that cannot be loaded is recorded with its error and indexed again once it changes
+            error = f'{e.__class__.__name__}: {e}'
+            logger.warning(f'Cannot index {file_path}: {error}')
+
+        with self._conn:
+            self._conn.execute('DELETE FROM files WHERE file = ?', (name, ))
+            model_alias = None
+            if model is not None:
+                root_alias = fs.get_model_file_element_path(file_path)
+                if root_alias is None:
+                    root_alias = utils.classname_to_alias(model.__class__.__name__, 'json')
+                model_alias = root_alias.split('.')[0]
+            self._conn.execute(
+                'INSERT INTO files (file, hash, model, error) VALUES (?, ?, ?, ?)',
+                (name, file_hash, model_alias, error)
+            )
+            if model is None:
+                return
+
+            for record in self._collect(model, root_alias):
+                if record.uuid is not None or record.oscal_id is not None or record.props:
+                    cursor = self._conn.execute(
+                        'INSERT INTO elements (file, path, type, uuid, oscal_id) VALUES (?, ?, ?, ?, ?)',
+                        (name, record.path, record.element_type, record.uuid, record.oscal_id)
+                    )
+                    self._conn.executemany(
+                        'INSERT INTO props (element, name, value) VALUES (?, ?, ?)',
+                        [(cursor.lastrowid, prop_name, prop_value) for prop_name, prop_value in record.props]
+                    )
+                self._conn.executemany(
+                    'INSERT INTO refs (file, path, type, kind, target) VALUES (?, ?, ?, ?, ?)',
+                    [(name, record.path, record.element_type, kind, target) for kind, target in record.refs]
+                )
+                if record.length:
+                    cursor = self._conn.execute(
+                        'INSERT INTO docs (file, path, type, oscal_id, title, length) VALUES (?, ?, ?, ?, ?, ?)',
+                        (name, record.path, record.element_type, record.oscal_id, record.title, record.length)
+                    )
+                    self._conn.executemany(
+                        'INSERT INTO postings (term, doc, frequency) VALUES (?, ?, ?)',
+                        [(term, cursor.lastrowid, frequency) for term, frequency in record.terms.items()]
+                    )
+                self._conn.executemany(
+                    'INSERT INTO times (file, path, type, uuid, field, time, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    [
+                        (
+                            name,
+                            t.path,
+                            t.element_type,
+                            t.uuid,
+                            t.field,
+                            t.time.isoformat(),
+                            time_index.to_timestamp(t.time)
+                        ) for t in record.times
+                    ]
+                )
+
+    @classmethod
+    def _collect(cls, model: BaseModel, root_alias: str) -> Iterator[_ElementRecord]:
+        """Yield the identifiers, properties, references and prose terms of every element of the model."""
+        for node in traverse(model, root_alias):
+            value = node.value
+            if not isinstance(value, BaseModel) or '__root__' in value.__fields__:
+                continue
+
+            fields_set = value.__fields_set__
+            uuid = cls._get_str(value, 'uuid') if 'uuid' in fields_set else None
+            oscal_id = cls._get_str(value, 'id') if 'id' in fields_set else None
+            props = []
+            refs = []
+            for field in fields_set:
+                field_value = getattr(value, field, None)
+                if field_value is None:
+                    continue
+                if field in PROPERTY_FIELDS and isinstance(field_value, list):
+                    props += [(cls._get_str(prop, 'name'), cls._get_str(prop, 'value')) for prop in field_value]
+                elif field in INDEXED_REFERENCE_FIELDS:
+                    items = field_value if isinstance(field_value, list) else [field_value]
+                    kind = INDEXED_REFERENCE_FIELDS[field]
+                    refs.extend((kind, str(utils.unwrap_root(item))) for item in items)
+                elif field in references.KEYED_REFERENCE_FIELDS and isinstance(field_value, dict):
+                    kind = references.KEYED_REFERENCE_FIELDS[field]
+                    refs.extend((kind, key) for key in field_value.keys())
+
+            title, terms, length = search.get_document(value)
+            times = time_index.get_times(value, node.path)
+            yield _ElementRecord(
+                node.path, value.__class__.__name__, uuid, oscal_id, props, refs, title, terms, length, times
+            )
+
+    @staticmethod
+    def _get_str(obj: Any, field: str) -> Optional[str]:
+        value = utils.unwrap_root(getattr(obj, field, None))
+        return None if value is None else str(value)
+
+    def find_elements(
+        self,
+        type_name: Optional[str] = None,
+        uuid: Optional[str] = None,
+        oscal_id: Optional[str] = None,
+        prop_name: Optional[str] = None,
+        prop_value: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> List[IndexedElement]:
+        """Find the identified elements matching all the given criteria, e.g. the control with id `ac-2`."""
+        conditions = []
+        params: List[Any] = []
+        for column, value in [('e.type', type_name), ('e.uuid', uuid), ('e.oscal_id', oscal_id), ('f.model', model)]:
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+        if prop_name is not None or prop_value is not None:
+            prop_conditions = []
+            for column, value in [('p.name', prop_name), ('p.value', prop_value)]:
+                if value is not None:
+                    prop_conditions.append(f'{column} = ?')
+                    params.append(value)
+            conditions.append(
+                f'EXISTS (SELECT 1 FROM props p WHERE p.element = e.element_id AND {" AND ".join(prop_conditions)})'
+            )
+
+        sql = 'SELECT e.file, f.model, e.path, e.type, e.uuid, e.oscal_id FROM elements e JOIN files f USING (file)'
+        if conditions:
+            sql += f' WHERE {" AND ".join(conditions)}'
+        sql += ' ORDER BY e.file, e.element_id'
+        return [IndexedElement(*row) for row in self._conn.execute(sql, params)]
+
+    def find_references(self,
+                        target: str,
+                        kind: Optional[str] = None,
+                        model: Optional[str] = None) -> List[IndexedReference]:
+        """Find the elements referencing the target identifier, e.g. the models implementing control `ac-2`.
+
+        References through `uuid-ref` are of any kind and are found whatever the kind asked for.
+        """
+        sql = (
+            'SELECT r.file, f.model, r.path, r.type, r.kind, r.target FROM refs r JOIN files f USING (file) '
+            'WHERE r.target = ?'
+        )
+        params: List[Any] = [target]
+        if kind is not None:
+            sql += ' AND r.kind IN (?, ?)'
+            params.extend([kind, references.ANY_KIND])
+        if model is not None:
+            sql += ' AND f.model = ?'
+            params.append(model)
+        sql += ' ORDER BY r.file, r.rowid'
+        return [IndexedReference(*row) for row in self._conn.execute(sql, params)]
+
+    def find_times(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        field: Optional[str] = None,
+        type_name: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> List[IndexedTime]:
+        """Find the timestamps from start (included) to end (excluded) by time, e.g. the observations of last week."""
+        conditions = []
+        params: List[Any] = []
+        if start is not None:
+            conditions.append('t.timestamp >= ?')
+            params.append(time_index.to_timestamp(start))
+        if end is not None:
+            conditions.append('t.timestamp < ?')
+            params.append(time_index.to_timestamp(end))
+        for column, value in [('t.field', field), ('t.type', type_name), ('f.model', model)]:
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+
+        sql = 'SELECT t.file, f.model, t.path, t.type, t.uuid, t.field, t.time FROM times t JOIN files f USING (file)'
+        if conditions:
+            sql += f' WHERE {" AND ".join(conditions)}'
+        sql += ' ORDER BY t.timestamp, t.file, t.rowid'
+        return [IndexedTime(*row) for row in self._conn.execute(sql, params)]
+
+    def get_files(self) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        """Return the `(file, model, error)` of every indexed file."""
+        return self._conn.execute('SELECT file, model, error FROM files ORDER BY file').fetchall()
+
+    def search(self,
+               text: str,
+               limit: int = 10,
+               type_name: Optional[str] = None,
+               model: Optional[str] = None) -> List[search.SearchResult]:
+        """Return the elements whose prose best matches the terms of the text, by decreasing BM25 score."""
+        terms = sorted(set(search.tokenize(text)))
+        if not terms:
+            return []
+
+        doc_count, avg_length = self._conn.execute('SELECT COUNT(*), AVG(length) FROM docs').fetchone()
+        sql = 'SELECT p.doc, p.frequency, d.length FROM postings p JOIN docs d ON d.doc_id = p.doc'
+        conditions = ['p.term = ?']
+        params: List[Any] = []
+        if type_name is not None:
+            conditions.append('d.type = ?')
+            params.append(type_name)
+        if model is not None:
+            sql += ' JOIN files f ON f.file = d.file'
+            conditions.append('f.model = ?')
+            params.append(model)
+        sql += f' WHERE {" AND ".join(conditions)}'
+
+        postings = {term: self._conn.execute(sql, [term] + params).fetchall() for term in terms}
+        scores = search.rank(postings, doc_count, avg_length)
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+
+        results = []
+        for doc, score in best:
+            row = self._conn.execute(
+                'SELECT d.file, f.model, d.path, d.type, d.oscal_id, d.title FROM docs d JOIN files f USING (file) '
+                'WHERE d.doc_id = ?', (doc, )
+            ).fetchone()
+            results.append(search.SearchResult(*row, round(score, 6)))
+        return results
@@ -374,17 +374,21 @@ class RemoveAction(Action):
         self._src_element: Element = src_element
         self._sub_element_path: ElementPath = sub_element_path
         self._prev_sub_element = None
+        self._prev_position = None
 
     def execute(self):
         """Execute the action."""
         self._prev_sub_element = self._src_element.get_at(self._sub_element_path)
+        if ElementPath.parse_key_selector(self._sub_element_path.get_last()) is not None:
+            # remember where the list item was so that rollback puts it back in place
+            self._prev_position = self._src_element.get_key_position(self._sub_element_path)
         self._src_element.set_at(self._sub_element_path, None)
         self._mark_executed()
 
     def rollback(self):
         """Rollback the action."""
         if self.has_executed():
-            self._src_element.set_at(self._sub_element_path, self._prev_sub_element)
+            self._src_element.set_at(self._sub_element_path, self._prev_sub_element, self._prev_position)
         self._mark_rollback()
 
     def __str__(self):
@@ -13,18 +13,22 @@
 # limitations under the License.
 """Element wrapper of an OSCAL model element."""
 
+import heapq
 import json
 import pathlib
-from typing import List, Optional
+import re
+import weakref
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Type
 
 from pydantic import Field, create_model
 from pydantic.error_wrappers import ValidationError
 
 import trestle.core.const as const
 from trestle.core import utils
-from trestle.core.base_model import OscalBaseModel
+from trestle.core.base_model import OscalBaseModel, get_model_generation, notify_model_changed, track_model
 from trestle.core.err import TrestleError, TrestleNotFoundError
 from trestle.core.models.file_content_type import FileContentType
+from trestle.core.traversal import walk
 
 import yaml
 
@@ -33,41 +37,80 @@ class ElementPath:
     """Element path wrapper of an element.
 
     This only allows a single wildcard '*' at the end to denote elements of an array of dict
+
+    A part can select an item of a list by the value of one of its fields instead of its index, e.g.
+    `catalog.groups[id=ac].controls[id=ac-2.1]`. Separators within the brackets do not split the path.
+
+    Element paths are immutable and interned: creating a path with the same string and parent chain as a live path
+    returns the same object. The parts, full path parts and element name are computed once, so paths are cheap to
+    compare and hash and can be used as dict keys.
     """
 
     PATH_SEPARATOR: str = const.ALIAS_PATH_SEPARATOR
 
     WILDCARD: str = '*'
 
-    def __init__(self, element_path: str, parent_path=None):
-        """Initialize an element wrapper.
+    KEY_SELECTOR_PATTERN = re.compile(r'^([^\[\]=]+)\[([^\[\]=]+)=([^\[\]]+)\]$')
+
+    _interned: 'weakref.WeakValueDictionary[Tuple[Any, ...], ElementPath]' = weakref.WeakValueDictionary()
+
+    def __new__(cls, element_path: str, parent_path=None):
+        """Create or reuse an element path.
 
         It assumes the element path contains oscal field alias with hyphens only
         """
         if isinstance(parent_path, str):
             parent_path = ElementPath(parent_path)
-        self._parent_path = parent_path
 
-        self._path: List[str] = self._parse(element_path)
+        key = (element_path, parent_path._key if parent_path is not None else None)
+        interned = cls._interned.get(key)
+        if interned is not None:
+            return interned
 
-        # Initialize private variables for lazy processing and caching
-        self._element_name = None
-        self._preceding_path = None
+        self = super().__new__(cls)
+        path = cls._parse(element_path)
+        if parent_path is not None:
+            full_path_parts = parent_path._full_path_parts + path[1:]  # don't use the first part
+        else:
+            full_path_parts = path
+
+        element_name = path[-1]
+        if element_name == cls.WILDCARD:
+            element_name = path[-2]
+
+        object.__setattr__(self, '_key', key)
+        object.__setattr__(self, '_parent_path', parent_path)
+        object.__setattr__(self, '_path', path)
+        object.__setattr__(self, '_full_path_parts', full_path_parts)
+        object.__setattr__(self, '_element_name', element_name)
+        object.__setattr__(self, '_string', cls.PATH_SEPARATOR.join(path))
+        object.__setattr__(self, '_hash', hash(tuple(path)))
+        # computed lazily since it is another element path
+        object.__setattr__(self, '_preceding_path', None)
+        cls._interned[key] = self
+        return self
+
+    def __setattr__(self, name, value):
+        """Prevent changes since element paths are shared."""
+        raise AttributeError(f'{self.__class__.__name__} is immutable')
 
-    def _parse(self, element_path) -> List[str]:
+    @classmethod
+    def _parse(cls, element_path) -> List[str]:
         """Parse the element path and validate."""
-        parts: List[str] = element_path.split(self.PATH_SEPARATOR)
+        parts = cls.split_path(element_path)
 
         for i, part in enumerate(parts):
+            if ('[' in part or ']' in part) and cls.parse_key_selector(part) is None:
+                raise TrestleError(f'Invalid path "{element_path}" because of invalid key selector in "{part}"')
             if part == '':
                 raise TrestleError(
-                    f'Invalid path "{element_path}" because having empty path parts between "{self.PATH_SEPARATOR}" \
+                    f'Invalid path "{element_path}" because having empty path parts between "{cls.PATH_SEPARATOR}" \
                         or in the beginning'
                 )
-            elif part == self.WILDCARD and i != len(parts) - 1:
-                raise TrestleError(f'Invalid path. Wildcard "{self.WILDCARD}" can only be at the end')
+            elif part == cls.WILDCARD and i != len(parts) - 1:
+                raise TrestleError(f'Invalid path. Wildcard "{cls.WILDCARD}" can only be at the end')
 
-        if parts[-1] == self.WILDCARD:
+        if parts[-1] == cls.WILDCARD:
             if len(parts) == 1:
                 raise TrestleError(f'Invalid path {element_path} with wildcard.')
 
@@ -79,13 +122,47 @@ class ElementPath:
 
         return parts
 
+    @classmethod
+    def split_path(cls, element_path: str) -> List[str]:
+        """Split an element path string into parts, keeping key selectors such as `controls[id=ac-2.1]` whole."""
+        if '[' not in element_path:
+            return element_path.split(cls.PATH_SEPARATOR)
+
+        parts: List[str] = []
+        start = 0
+        in_selector = False
+        for i, char in enumerate(element_path):
+            if char == '[':
+                in_selector = True
+            elif char == ']':
+                in_selector = False
+            elif char == cls.PATH_SEPARATOR and not in_selector:
+                parts.append(element_path[start:i])
+                start = i + 1
+        parts.append(element_path[start:])
+        return parts
+
+    @classmethod
+    def parse_key_selector(cls, part: str) -> Optional[Tuple[str, str, str]]:
+        """Parse a path part like `parties[uuid=...]` into the list alias, key field alias and key value.
+
+        It returns None if the part is not a key selector.
+        """
+        match = cls.KEY_SELECTOR_PATTERN.match(part)
+        if match is None:
+            return None
+        return match.group(1), match.group(2), match.group(3)
+
     def get(self) -> List[str]:
-        """Return the path parts as a list."""
+        """Return the path parts as a list.
+
+        The list is shared by all users of the path and must not be modified.
+        """
         return self._path
 
     def to_string(self) -> str:
         """Return the path parts as a dot-separated string."""
-        return self.PATH_SEPARATOR.join(self.get())
+        return self._string
 
     def get_parent(self):
         """Return the parent path.
@@ -104,48 +181,32 @@ class ElementPath:
 
     def get_full(self) -> str:
         """Return the full path including parent path parts as a dot separated str."""
-        all_parts = self.get_full_path_parts()
-        return self.PATH_SEPARATOR.join(all_parts)
+        return self.PATH_SEPARATOR.join(self._full_path_parts)
 
     def get_element_name(self):
         """Return the element alias name from the path.
 
         Essentailly this the last part of the element path
         """
-        # if it is available then return otherwise compute
-        if self._element_name is None:
-            element_name = self.get_last()
-            if element_name == self.WILDCARD:
-                element_name = self._path[-2]
-
-            self._element_name = element_name
-
         return self._element_name
 
     def get_full_path_parts(self) -> List[str]:
-        """Get full path parts to the element including parent path parts as a list."""
-        path_parts = []
-        if self.get_parent() is not None:
-            parent_path_parts = self.get_parent().get_full_path_parts()
-            path_parts.extend(parent_path_parts)
-            path_parts.extend(self.get()[1:])  # don't use the first part
-        else:
-            path_parts.extend(self.get())
+        """Get full path parts to the element including parent path parts as a list.
 
-        return path_parts
+        The list is shared by all users of the path and must not be modified.
+        """
+        return self._full_path_parts
 
     def get_preceding_path(self):
         """Return the element path to the preceding element in the path."""
         # if it is available then return otherwise compute
         if self._preceding_path is None:
-            path_parts = self.get_full_path_parts()
+            path_parts = self._full_path_parts
 
-            if len(path_parts) > 1:
-                prec_path_parts = path_parts[:-1]
-
-                # prec_path_parts must have at least two parts
-                if len(prec_path_parts) > 1:
-                    self._preceding_path = ElementPath(self.PATH_SEPARATOR.join(prec_path_parts))
+            # preceding path parts must have at least two parts
+            if len(path_parts) > 2:
+                preceding_path = ElementPath(self.PATH_SEPARATOR.join(path_parts[:-1]))
+                object.__setattr__(self, '_preceding_path', preceding_path)
 
         return self._preceding_path
 
@@ -189,10 +250,88 @@ class ElementPath:
 
     def __eq__(self, other):
         """Override equality method."""
+        if self is other:
+            return True
         if not isinstance(other, ElementPath):
             return False
 
-        return self.get() == other.get()
+        return self._path == other._path
+
+    def __hash__(self):
+        """Return the hash of the path parts, consistent with equality."""
+        return self._hash
+
+    def __reduce__(self):
+        """Pickle the path by its constructor arguments so that it is interned again when unpickled."""
+        return (ElementPath, (self._string, self._parent_path))
+
+
+class TypeIndex:
+    """Index of the objects of a model by their exact class, built in a single traversal.
+
+    Each class maps to the list of `(instance, ElementPath)` tuples of its objects in traversal order. The path of the
+    root object is None since an element path needs at least two parts. Lists are built once per class and returned
+    from the cache on repeated queries, so callers must not modify them.
+    """
+
+    def __init__(self, model: Any, root_alias: str):
+        """Build the index of the model whose element paths start with the root alias."""
+        self._model = model
+        self._generation = track_model(model)
+        # (traversal order, object, path string) of the objects of each class
+        self._nodes: Dict[Type[Any], List[Tuple[int, Any, str]]] = {}
+        for i, (node, path) in enumerate(walk(model, root_alias)):
+            self._nodes.setdefault(type(node), []).append((i, node, path))
+        self._root_alias = root_alias
+        self._elements: Dict[Type[Any], List[Tuple[Any, Optional[ElementPath]]]] = {}
+        self._instances: Dict[Type[Any], List[Any]] = {}
+
+    def get(self, type_of_interest: Type[Any]) -> List[Tuple[Any, Optional[ElementPath]]]:
+        """Return the `(instance, ElementPath)` tuples of the objects of the given type."""
+        if type_of_interest not in self._elements:
+            self._elements[type_of_interest] = [
+                (node, None if path == self._root_alias else ElementPath(path)) for _,
+                node,
+                path in self._nodes.get(type_of_interest, [])
+            ]
+        return self._elements[type_of_interest]
+
+    def get_instances(self, type_of_interest: Type[Any]) -> List[Any]:
+        """Return the objects of the given type."""
+        if type_of_interest not in self._instances:
+            self._instances[type_of_interest] = [node for _, node, _ in self._nodes.get(type_of_interest, [])]
+        return self._instances[type_of_interest]
+
+    def iter_nodes(self, types: List[Type[Any]]) -> Iterator[Tuple[Any, str]]:
+        """Iterate over the `(object, path string)` tuples of the objects of any of the types in traversal order."""
+        groups = [self._nodes.get(type_of_interest, []) for type_of_interest in set(types)]
+        for _, node, path in heapq.merge(*groups, key=lambda entry: entry[0]):
+            yield node, path
+
+    def get_root_alias(self) -> str:
+        """Return the alias that the paths of the index start with."""
+        return self._root_alias
+
+    def get_types(self) -> List[Type[Any]]:
+        """Return the classes of the objects in the model."""
+        return list(self._nodes.keys())
+
+    def is_stale(self) -> bool:
+        """Check whether a field of the model or of a model below it has been assigned since the index was built.
+
+        In-place changes to lists or dicts (e.g. `append`) are only detected if they are recorded with
+        `notify_model_changed`.
+        """
+        return self._generation != get_model_generation(self._model)
+
+
+class _PathTrieNode:
+    """Node of a prefix trie of element path parts, recording the indices of the paths that end at it."""
+
+    def __init__(self):
+        """Initialize an empty node."""
+        self.children: Dict[str, '_PathTrieNode'] = {}
+        self.indices: List[int] = []
 
 
 class Element:
@@ -224,11 +363,31 @@ class Element:
                 wrapper_alias = utils.classname_to_alias(elem.__class__.__name__, 'json')
 
         self._wrapper_alias: str = wrapper_alias
+        self._type_index: Optional[TypeIndex] = None
+        # per-list key indices as (list, key field alias) -> (list, key value -> list index, ids of the list items)
+        self._key_indices: Dict[Tuple[int, str], Tuple[list, Dict[str, int], List[int], Set[str]]] = {}
+        self._key_indices_generation = None
 
     def get(self) -> OscalBaseModel:
         """Return the model object."""
         return self._elem
 
+    def get_type_index(self) -> TypeIndex:
+        """Return the type index of the element, building it if needed.
+
+        The index is rebuilt after the element is changed with `set_at` or any model field is assigned.
+        """
+        if self._type_index is None or self._type_index.is_stale():
+            root_alias = self._wrapper_alias
+            if root_alias == self.IGNORE_WRAPPER_ALIAS:
+                root_alias = utils.classname_to_alias(self._elem.__class__.__name__, 'json')
+            self._type_index = TypeIndex(self._elem, root_alias)
+        return self._type_index
+
+    def invalidate_type_index(self) -> None:
+        """Discard the type index so that it is rebuilt on the next query."""
+        self._type_index = None
+
     def _split_element_path(self, element_path: ElementPath):
         """Split the element path into root_model and remaing attr names."""
         path_parts = element_path.get()
@@ -273,19 +432,179 @@ class Element:
 
             if attr == ElementPath.WILDCARD:
                 break
-            elif attr.isnumeric():
-                if isinstance(elm, list):
-                    elm = elm[int(attr)]
-                else:
-                    # index to a non list type should return None
-                    return None
-            elif isinstance(elm, dict):
-                elm = elm.get(attr, None)
-            else:
-                elm = elm.get_field_value_by_alias(attr)
+            if attr.isnumeric() and not isinstance(elm, list):
+                # index to a non list type should return None
+                return None
+            elm = self._get_sub_element(elm, attr)
 
         return elm
 
+    def get_many(self, element_paths: List[ElementPath], check_parent: bool = True) -> List[Optional[OscalBaseModel]]:
+        """Get the elements at several element paths in a single descent.
+
+        The paths are compiled into a prefix trie so that parts shared by several paths are resolved only once. It
+        returns the sub-model objects in the order of the paths, as `get_at` would for each of them, except that None
+        is returned instead of raising an error for a path whose parent cannot be resolved.
+        """
+        root = _PathTrieNode()
+        for i, element_path in enumerate(element_paths):
+            node = root
+            for attr in self._get_resolution_parts(element_path, check_parent):
+                if attr == ElementPath.WILDCARD:
+                    break
+                node = node.children.setdefault(attr, _PathTrieNode())
+            node.indices.append(i)
+
+        elm = self._elem
+        if hasattr(elm, '__root__') and (isinstance(elm.__root__, dict) or isinstance(elm.__root__, list)):
+            elm = elm.__root__
+
+        results: List[Optional[OscalBaseModel]] = [None] * len(element_paths)
+        stack = [(root, elm)]
+        while stack:
+            node, elm = stack.pop()
+            for i in node.indices:
+                results[i] = elm
+            for attr, child in node.children.items():
+                if elm is not None and not (attr.isnumeric() and not isinstance(elm, list)):
+                    stack.append((child, self._get_sub_element(elm, attr)))
+
+        return results
+
+    def _get_resolution_parts(self, element_path: ElementPath, check_parent: bool) -> List[str]:
+        """Get the path parts to follow from the element for the path, including its parent parts if needed."""
+        path_parts = element_path.get()[1:]
+        parent_path = element_path.get_parent()
+        if check_parent and parent_path is not None and parent_path.get_last() != ElementPath.WILDCARD:
+            path_parts = self._get_resolution_parts(parent_path, True) + path_parts
+        return path_parts
+
+    def _get_sub_element(self, elm, attr: str):
+        """Get the sub-element of a model, list or dict by alias, index, key or key selector."""
+        if attr.isnumeric():
+            return elm[int(attr)]
+        selector = ElementPath.parse_key_selector(attr)
+        if selector is not None:
+            items = self._get_sub_element(elm, selector[0])
+            if not isinstance(items, list):
+                return None
+            index = self.find_key_index(items, selector[1], selector[2])
+            return None if index is None else items[index]
+        if isinstance(elm, dict):
+            return elm.get(attr, None)
+        return elm.get_field_value_by_alias(attr)
+
+    @classmethod
+    def _get_key_value(cls, item, key_alias: str) -> Optional[str]:
+        """Get the value of the key field of a list item as a string."""
+        if isinstance(item, dict):
+            value = item.get(key_alias, None)
+        elif isinstance(item, OscalBaseModel):
+            value = item.get_field_value_by_alias(key_alias)
+        else:
+            return None
+        value = utils.unwrap_root(value)
+        return None if value is None else str(value)
+
+    def find_key_index(self, items: list, key_alias: str, key_value: str, unique: bool = False) -> Optional[int]:
+        """Find the index of the first item of the list with the key value, using a lazily built index of the list.
+
+        With `unique`, None is also returned if several items have the key value.
+
+        The indices are discarded when a field of the model has been assigned since they were built. An index is also
+        rebuilt if the item it points to does not have the key value, or before reporting that no item has the key value
+        if the items of the list are no longer the ones it was built from, so that in-place changes to the list are
+        picked up.
+        """
+        if self._key_indices and self._key_indices_generation != get_model_generation(self._elem):
+            self._key_indices = {}
+        if not self._key_indices:
+            self._key_indices_generation = track_model(self._elem)
+
+        entry = self._key_indices.get((id(items), key_alias))
+        if entry is not None and entry[0] is items:
+            index = entry[1].get(key_value)
+            if index is not None and index < len(items) and self._get_key_value(items[index], key_alias) == key_value:
+                return None if unique and key_value in entry[3] else index
+            if index is None and list(map(id, items)) == entry[2]:
+                return None
+
+        key_index: Dict[str, int] = {}
+        duplicates: Set[str] = set()
+        for i, item in enumerate(items):
+            value = self._get_key_value(item, key_alias)
+            if value is None:
+                continue
+            if value in key_index:
+                duplicates.add(value)
+            else:
+                key_index[value] = i
+        self._key_indices[(id(items), key_alias)] = (items, key_index, list(map(id, items)), duplicates)
+        return None if unique and key_value in duplicates else key_index.get(key_value)
+
+    def get_key_position(self, element_path: ElementPath) -> Optional[int]:
+        """Get the index in its list of the item selected by the key selector at the end of the path."""
+        selector = ElementPath.parse_key_selector(element_path.get_last())
+        if selector is None:
+            raise TrestleError(f'Element path {element_path} does not end with a key selector')
+        preceding_elm = self.get_preceding_element(element_path)
+        items = None if preceding_elm is None else self._get_sub_element(preceding_elm, selector[0])
+        if not isinstance(items, list):
+            return None
+        return self.find_key_index(items, selector[1], selector[2])
+
+    def _set_at_key(
+        self, element_path: ElementPath, selector: Tuple[str, str, str], model_obj, position: Optional[int]
+    ) -> None:
+        """Replace, append or remove (if model_obj is None) the list item selected by the key in the path."""
+        list_alias, key_alias, key_value = selector
+        preceding_elm = self.get_preceding_element(element_path)
+        if preceding_elm is None:
+            raise TrestleError(f'Invalid sub element path {element_path} with no valid preceding element')
+
+        items = self._get_sub_element(preceding_elm, list_alias)
+        if not isinstance(items, list):
+            raise TrestleError(f'Element at "{list_alias}" of path {element_path} is not a list')
+
+        # items are written in place, which bypasses the validation done on assignment
+        if model_obj is not None and isinstance(preceding_elm, OscalBaseModel):
+            field = preceding_elm.alias_to_field_map().get(list_alias)
+            if field is not None and isinstance(field.type_, type) and not isinstance(model_obj, field.type_):
+                raise TrestleError(
+                    f'Validation error: items of {list_alias} are expected to be "{field.type_}", '
+                    f'but found "{model_obj.__class__}"'
+                )
+
+        index = self.find_key_index(items, key_alias, key_value)
+        _, key_index, item_ids, duplicates = self._key_indices[(id(items), key_alias)]
+        new_key_value = None if model_obj is None else self._get_key_value(model_obj, key_alias)
+        if model_obj is None:
+            if index is not None:
+                del items[index]
+        elif index is None and position is not None and position < len(items):
+            items.insert(position, model_obj)
+        elif index is None:
+            items.append(model_obj)
+            item_ids.append(id(model_obj))
+            if new_key_value in key_index:
+                duplicates.add(new_key_value)
+            elif new_key_value is not None:
+                key_index[new_key_value] = len(items) - 1
+        else:
+            items[index] = model_obj
+            item_ids[index] = id(model_obj)
+
+        if model_obj is None or position is not None or (index is not None and new_key_value != key_value):
+            # the positions of items have changed, or a later item may now be the first one with the key value
+            self._key_indices.pop((id(items), key_alias), None)
+
+        # the list changed in place, so caches of the model need to be told; the key indices are up to date
+        self.invalidate_type_index()
+        if model_obj is not None:
+            track_model(preceding_elm)
+        notify_model_changed(preceding_elm)
+        self._key_indices_generation = get_model_generation(self._elem)
+
     def get_preceding_element(self, element_path: ElementPath) -> Optional[OscalBaseModel]:
         """Get the preceding element in the path."""
         preceding_path = element_path.get_preceding_path()
@@ -305,12 +624,16 @@ class Element:
 
         return model_obj
 
-    def set_at(self, element_path, sub_element):
+    def set_at(self, element_path, sub_element, position: Optional[int] = None):
         """Set a sub_element at the path in the current element.
 
         Sub element can be Element, OscalBaseModel, list or None type
         It returns the element itself so that chaining operation can be done such as
             `element.set_at(path, sub-element).get()`.
+
+        If the path ends with a key selector such as `parties[uuid=...]`, the selected list item is replaced, or
+        removed if the sub element is None. A sub element for a key that is not in the list is appended to it, or
+        inserted at the given position.
         """
         # convert the element_path to ElementPath if needed
         if isinstance(element_path, str):
@@ -324,6 +647,12 @@ class Element:
 
         # TODO validate that self._elem is of same type as root_model
 
+        # a key selector as the last part replaces, appends or removes an item of a list
+        selector = ElementPath.parse_key_selector(element_path.get_last())
+        if selector is not None:
+            self._set_at_key(element_path, selector, model_obj, position)
+            return self
+
         # If wildcard is present, check the input type and determine the preceding element
         if element_path.get_last() == ElementPath.WILDCARD:
             # validate the type is either list or OscalBaseModel
@@ -350,6 +679,7 @@ class Element:
             )
 
         # set the sub-element
+        self.invalidate_type_index()
         try:
             setattr(preceding_elm, sub_element_name, model_obj)
         except ValidationError:
@@ -0,0 +1,307 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Generation of plans of action and milestones (POA&Ms) from assessment results.
+
+The generator is a pipeline over the findings of assessment results files: the findings that are not satisfied or
+that have open risks become POA&M items, which have the same structure as findings (including their observations,
+risks and remediations), with only their open risks. Each file is loaded on its own, and its items are validated and
+spooled to a temporary file once all of them are generated, so the items are not held in memory; only the uuids of the
+items and of the objects in them (observations, risks, ...) are kept, as 128-bit integers, to check that they are unique
+across the POA&M. The parties, roles and locations referenced by the items are resolved through an index of the
+definitions in the metadata of the results, and only those are copied into the metadata of the POA&M when it is
+written. Since the items are validated one by one and their uuids are unique, the POA&M is validated when it is written
+with its first item standing for all of them.
+"""
+
+import json
+import logging
+import pathlib
+import tempfile
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from pydantic.datetime_parse import parse_datetime
+
+from trestle.core import references
+from trestle.core.err import TrestleError
+from trestle.core.results_merge import RESULTS_KEY, ROOT_KEY
+from trestle.core.time_index import to_timestamp
+from trestle.core.traversal import traverse
+from trestle.oscal import poam
+from trestle.utils import fs
+from trestle.utils.cache import make_key
+
+logger = logging.getLogger(__name__)
+
+POAM_ROOT_KEY = 'plan-of-action-and-milestones'
+
+DEFAULT_TITLE = 'Plan of action and milestones'
+
+# Objective status result of the findings that need no action.
+SATISFIED = 'satisfied'
+
+# Risk statuses of the risks that need no action.
+CLOSED_RISK_STATUSES = ['closed']
+
+# Metadata lists holding the definitions that POA&M items can reference, with their kind and identifier key.
+DEFINITION_LISTS = {'parties': ('party', 'uuid'), 'roles': ('role', 'id'), 'locations': ('location', 'uuid')}
+
+# Kinds of the definitions of the metadata, and references of any kind which may point to them.
+REFERENCED_KINDS = ['party', 'role', 'location', references.ANY_KIND]
+
+# Raw data keys referencing a definition of the metadata, with the kind of definition.
+REFERENCE_KEYS = {
+    field.replace('_', '-'): kind
+    for field, kind in references.REFERENCE_FIELDS.items()
+    if kind in REFERENCED_KINDS
+}
+
+
+def iter_findings(data: Dict[str, Any], source: str) -> Iterator[Dict[str, Any]]:
+    """Iterate over the findings of the raw data of assessment results."""
+    if not isinstance(data, dict) or not isinstance(data.get(ROOT_KEY), dict):
+        raise TrestleError(f'{source} does not hold assessment results')
+    results = data[ROOT_KEY].get(RESULTS_KEY)
+    if isinstance(results, dict):
+        yield from results.get('findings') or []
+
+
+def is_open_risk(risk: Dict[str, Any]) -> bool:
+    """Check whether a risk still needs action."""
+    return risk.get('risk-status') not in CLOSED_RISK_STATUSES
+
+
+def to_poam_item(finding: Dict[str, Any], results_uuid: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Map the raw data of a finding to a POA&M item, or None if the finding is satisfied without open risk.
+
+    The uuid of the item is derived from the uuid of the finding and from the uuid of the assessment results holding
+    it, so generating a POA&M again gives the same uuids, and findings with the same uuid in different assessment
+    results give different items.
+    """
+    risks = [risk for risk in finding.get('risks') or [] if is_open_risk(risk)]
+    result = ((finding.get('objective-status') or {}).get('result') or {}).get('STRVALUE')
+    if result == SATISFIED and not risks:
+        return None
+
+    key = make_key('poam-item', str(results_uuid), str(finding.get('uuid')))
+    item = dict(finding, uuid=str(uuid.UUID(key[:32], version=4)))
+    if risks:
+        item['risks'] = risks
+    else:
+        item.pop('risks', None)
+    return item
+
+
+def get_references(data: Any) -> Iterator[Tuple[str, str]]:
+    """Yield the `(kind, identifier)` of the references to metadata definitions held by raw data."""
+    for node in traverse(data, track_paths=False):
+        kind = REFERENCE_KEYS.get(node.key) if isinstance(node.key, str) else None
+        if kind is not None:
+            for target in node.value if isinstance(node.value, list) else [node.value]:
+                yield kind, str(target)
+
+
+class PoamGenerator:
+    """Generate a POA&M from assessment results files, spooling its items to a temporary file."""
+
+    def __init__(self, title: str = DEFAULT_TITLE):
+        """Initialize a generator of a POA&M with the title."""
+        self._title = title
+        self._spool = tempfile.TemporaryFile('w+', encoding='utf8')
+        self._definitions: Dict[str, Dict[str, Dict[str, Any]]] = {kind: {} for kind, _ in DEFINITION_LISTS.values()}
+        self._referenced: Set[Tuple[str, str]] = set()
+        # uuids of the spooled items and of the objects in them
+        self._uuids: Set[Any] = set()
+        self._oscal_version: Optional[str] = None
+        self._start: Optional[str] = None
+        self._stats = {'files': 0, 'findings': 0, 'items': 0}
+
+    def __enter__(self) -> 'PoamGenerator':
+        """Use the generator as a context manager that deletes its spool on exit."""
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Delete the spool of items."""
+        self.close()
+
+    def close(self) -> None:
+        """Delete the spool of items."""
+        self._spool.close()
+
+    def add_file(self, file_path: pathlib.Path) -> int:
+        """Generate the POA&M items of an assessment results file and return their number."""
+        return self.add_data(fs.load_file(str(file_path)), str(file_path))
+
+    def add_data(self, data: Dict[str, Any], source: str) -> int:
+        """Generate the POA&M items of the raw data of assessment results and return their number.
+
+        The items are only spooled once all items of the data are valid, so a failure leaves the generator unchanged.
+        """
+        items = []
+        findings = 0
+        uuids: Set[Any] = set()
+        for finding in iter_findings(data, source):
+            findings += 1
+            item = to_poam_item(finding, data[ROOT_KEY].get('uuid'))
+            if item is not None:
+                self._check_item(item, source, uuids)
+                items.append(item)
+
+        for item in items:
+            self._referenced.update(get_references(item))
+            self._spool.write(json.dumps(item))
+            self._spool.write('\n')
+        self._uuids.update(uuids)
+        self._stats['items'] += len(items)
+        self._stats['findings'] += findings
+        self._stats['files'] += 1
+        self._index_definitions(data[ROOT_KEY].get('metadata') or {})
+        results = data[ROOT_KEY].get(RESULTS_KEY) or {}
+        if 'start' in results and (self._start is None or _is_before(results['start'], self._start)):
+            self._start = results['start']
+        return len(items)
+
+    def _check_item(self, item: Dict[str, Any], source: str, uuids: Set[Any]) -> None:
+        """Validate an item and add its uuids to the uuids of the items of its source, which must all be unique."""
+        try:
+            poam.PoamItem.parse_obj(item)
+        except ValidationError as e:
+            raise TrestleError(f'Invalid POA&M item for finding {item.get("title")} of {source}: {e}')
+        for value in _iter_uuids(item):
+            key = _uuid_key(value)
+            if key in uuids or key in self._uuids:
+                raise TrestleError(f'Finding {item.get("title")} of {source} repeats the uuid {value} of another item')
+            uuids.add(key)
+
+    def _index_definitions(self, metadata: Dict[str, Any]) -> None:
+        if self._oscal_version is None:
+            self._oscal_version = metadata.get('oscal-version')
+        for list_key, (kind, id_key) in DEFINITION_LISTS.items():
+            for definition in metadata.get(list_key) or []:
+                self._definitions[kind].setdefault(str(definition.get(id_key)), definition)
+
+    def _resolve(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Return the referenced definitions by metadata list, including the locations of referenced parties."""
+        referenced = set(self._referenced)
+        for kind, identifier in list(referenced):
+            party = self._definitions['party'].get(identifier) if kind in ['party', references.ANY_KIND] else None
+            if party is not None:
+                referenced.update(get_references(party))
+
+        resolved: Dict[str, List[Dict[str, Any]]] = {}
+        unresolved = 0
+        for kind, identifier in sorted(referenced):
+            kinds = [kind] if kind != references.ANY_KIND else ['party', 'location']
+            found = False
+            for list_key, (list_kind, _) in DEFINITION_LISTS.items():
+                definition = self._definitions[list_kind].get(identifier) if list_kind in kinds else None
+                if definition is not None:
+                    resolved.setdefault(list_key, []).append(definition)
+                    found = True
+            # references of any kind may point to other objects, such as assessment subjects
+            if not found and kind != references.ANY_KIND:
+                unresolved += 1
+                logger.warning(f'Reference to unknown {kind} {identifier}')
+        self._stats['unresolved'] = unresolved
+        return resolved
+
+    def write(self, file_path: pathlib.Path) -> None:
+        """Write the POA&M to a JSON file, with one item per line, once it is validated.
+
+        Its uuid is derived from the uuids of its items, so generating a POA&M again gives the same uuid.
+        """
+        if pathlib.Path(file_path).suffix != '.json':
+            raise TrestleError(f'POA&Ms are written to JSON files, not {file_path}')
+        if self._stats['files'] == 0:
+            raise TrestleError('No assessment results to generate a POA&M from')
+
+        now = datetime.now(timezone.utc).isoformat()
+        metadata = {
+            'title': self._title,
+            'last-modified': now,
+            'version': '1.0',
+            'oscal-version': self._oscal_version or 'unknown',
+            **self._resolve()
+        }
+
+        self._spool.seek(0)
+        key = make_key(*(json.loads(line)['uuid'] for line in self._spool))
+        items = {
+            'title': self._title,
+            'description': 'Items generated from assessment results.',
+            'start': self._start or now,
+            'poam-item-group': []
+        }
+        model = {'uuid': str(uuid.UUID(key[:32], version=4)), 'metadata': metadata, 'poam-items': items}
+        for value in _iter_uuids(model):
+            if _uuid_key(value) in self._uuids:
+                raise TrestleError(f'The uuid {value} of the POA&M is also the uuid of an object of its items')
+        self._spool.seek(0)
+        first_item = self._spool.readline()
+        self._validate(model, [json.loads(first_item)] if first_item else [])
+        # the spooled items are streamed into the empty item group, which is the last value of the document
+        prefix, suffix = json.dumps({POAM_ROOT_KEY: model}).rsplit('[]', 1)
+
+        self._spool.seek(0)
+        with open(file_path, 'w', encoding='utf8') as f:
+            f.write(prefix + '[\n')
+            for i, line in enumerate(self._spool):
+                if i:
+                    f.write(',\n')
+                f.write(line.rstrip('\n'))
+            f.write('\n]' + suffix + '\n')
+
+    @staticmethod
+    def _validate(model: Dict[str, Any], items: List[Dict[str, Any]]) -> None:
+        """Validate the POA&M with the given items instead of all its items, which were checked one by one."""
+        poam_items = dict(model['poam-items'], **{'poam-item-group': items})
+        try:
+            poam.PlanOfActionAndMilestones.parse_obj(dict(model, **{'poam-items': poam_items}))
+        except ValidationError as e:
+            raise TrestleError(f'Invalid POA&M: {e}')
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return the number of files and findings read and of items generated, and unresolved references."""
+        return dict(self._stats)
+
+
+def generate_poam(files: Iterable[pathlib.Path], output: pathlib.Path, title: str = DEFAULT_TITLE) -> Dict[str, int]:
+    """Generate a POA&M from assessment results files and return the generation statistics."""
+    with PoamGenerator(title) as generator:
+        for file_path in files:
+            generator.add_file(file_path)
+        generator.write(output)
+        return generator.get_stats()
+
+
+def _iter_uuids(data: Any) -> Iterator[str]:
+    """Yield the uuids of the objects in raw data, but not the references to other objects."""
+    for node in traverse(data, track_paths=False):
+        if node.key == 'uuid' and isinstance(node.value, str):
+            yield node.value
+
+
+def _uuid_key(value: str) -> Any:
+    try:
+        return uuid.UUID(value).int
+    except ValueError:
+        return value
+
+
+def _is_before(time: str, other: str) -> bool:
+    return to_timestamp(parse_datetime(time)) < to_timestamp(parse_datetime(other))
@@ -0,0 +1,412 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Resolution of profiles into the catalogs of the controls they select and modify.
+
+A profile imports catalogs or other profiles by `href`, selects controls from each of them, merges the selections and
+modifies the result by setting parameters and altering controls. Imports are resolved from local files only. Every
+catalog and resolved profile is memoized by a key combining the content hashes of its file and of all the files it
+imports, so that a catalog imported by several nested profiles is loaded and indexed once. Resolved catalogs can also
+be stored in a disk cache, by default in `.trestle/cache` of the trestle project, together with the model type and
+imports of each file by content hash, so that the key of a profile is computed and its resolved catalog found in the
+cache without loading any model.
+"""
+
+import json
+import logging
+import os
+import pathlib
+import uuid
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+from trestle import __version__
+from trestle.core import const
+from trestle.core.catalog_index import CatalogIndex
+from trestle.core.commands import cmd_utils
+from trestle.core.control_set import ControlSet, ControlSpace
+from trestle.core.err import TrestleError
+from trestle.oscal import catalog
+from trestle.oscal import profile
+from trestle.utils import fs
+from trestle.utils.cache import DiskCache, hash_file, make_key
+
+logger = logging.getLogger(__name__)
+
+# namespace of the resolved catalogs in the trestle cache directory
+CACHE_NAMESPACE = 'profile'
+
+# Lists of a control or a part from which removals remove items, by the item name of a removal.
+REMOVABLE_ITEMS = {
+    'param': 'parameters', 'prop': 'properties', 'part': 'parts', 'link': 'links', 'annotation': 'annotations'
+}
+
+# Lists of the additions of an alteration, added to the lists of the same alias in the target.
+ADDED_ITEMS = ['parameters', 'properties', 'annotations', 'links', 'parts']
+
+# Lists that a part can hold.
+PART_ITEMS = ['properties', 'parts', 'links']
+
+
+def _to_dict(model: BaseModel, exclude: Optional[Set[str]] = None) -> Dict[str, Any]:
+    """Convert a model into JSON data, which the models of another OSCAL module can parse."""
+    return json.loads(model.json(by_alias=True, exclude_none=True, exclude=exclude))
+
+
+class _Source(NamedTuple):
+    """A catalog or resolved profile that can be imported, with its control hierarchy indexed."""
+
+    catalog: catalog.Catalog
+    index: CatalogIndex
+    space: ControlSpace
+
+
+class ProfileResolver:
+    """Resolve profiles into catalogs, memoizing imported catalogs and resolved profiles by content."""
+
+    def __init__(self, cache: Optional[DiskCache] = None):
+        """Initialize a resolver, optionally storing resolved catalogs in a disk cache."""
+        self._cache = cache
+        self._sources: Dict[str, _Source] = {}
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._stats = {'loaded': 0, 'resolved': 0, 'memo_hits': 0}
+
+    @classmethod
+    def for_project(cls, path: pathlib.Path) -> 'ProfileResolver':
+        """Create a resolver with the cache of the trestle project of the path, if it is in one."""
+        project_root = fs.get_trestle_project_root(pathlib.Path(path).absolute())
+        if project_root is None:
+            return cls()
+        return cls(DiskCache(project_root / const.TRESTLE_CACHE_DIR, CACHE_NAMESPACE))
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return the number of catalogs loaded, profiles resolved and imports found in the memo."""
+        return dict(self._stats)
+
+    def resolve(self, profile_path: pathlib.Path) -> catalog.Catalog:
+        """Resolve the profile in the file into a catalog.
+
+        The catalog is shared with the memo of the resolver, it must be copied before being modified.
+        """
+        return self._get_source(pathlib.Path(profile_path).absolute(), []).catalog
+
+    def _get_key(self, path: pathlib.Path, stack: List[pathlib.Path]) -> Tuple[str, str]:
+        """Return the model type of a file and its key combining its content hash with the keys of the files it imports.
+
+        The files are not loaded if their model type and imports are found by content hash.
+        """
+        if path in stack:
+            raise TrestleError(f'Circular import of {path}')
+        file_hash = hash_file(path)
+        root_alias, import_paths = self._get_file_info(path, file_hash)
+        if root_alias == 'catalog':
+            return root_alias, make_key('catalog', file_hash)
+
+        import_keys = [self._get_key(import_path, stack + [path])[1] for import_path in import_paths]
+        return root_alias, make_key('profile', __version__, file_hash, *import_keys)
+
+    def _get_file_info(self, path: pathlib.Path, file_hash: str) -> Tuple[str, List[pathlib.Path]]:
+        """Return the model type of a file and the files it imports, from the memo or the disk cache if possible.
+
+        The imports are stored relative to the file, so that they only depend on its content.
+        """
+        info_key = make_key('file', __version__, file_hash)
+        info = self._files.get(info_key)
+        if info is None and self._cache is not None:
+            info = self._cache.get(info_key)
+        if info is None:
+            data = fs.load_file(path)
+            root_alias = fs.get_root_alias(data)
+            if root_alias == 'catalog':
+                hrefs = []
+            elif root_alias == 'profile':
+                prof = profile.Profile.parse_obj(data[root_alias])
+                hrefs = [
+                    pathlib.Path(os.path.relpath(self._get_import_path(prof, path, import_), path.parent)).as_posix()
+                    for import_ in prof.imports
+                ]
+            else:
+                raise TrestleError(f'{path} is neither a catalog nor a profile')
+            info = {'model': root_alias, 'imports': hrefs}
+            if self._cache is not None:
+                self._cache.put(info_key, info)
+        self._files[info_key] = info
+
+        import_paths = []
+        for href in info['imports']:
+            import_path = (path.parent / href).absolute()
+            if not import_path.is_file():
+                raise TrestleError(f'Imported file "{href}" of {path} does not exist')
+            import_paths.append(import_path)
+        return info['model'], import_paths
+
+    def _get_source(self, path: pathlib.Path, stack: List[pathlib.Path]) -> _Source:
+        """Return the catalog of a catalog file or the resolved catalog of a profile file, from the memo if possible.
+
+        The resolved catalog of a profile is looked up in the disk cache before the profile is loaded.
+        """
+        root_alias, key = self._get_key(path, stack)
+        source = self._sources.get(key)
+        if source is not None:
+            self._stats['memo_hits'] += 1
+            return source
+
+        if root_alias == 'catalog':
+            self._stats['loaded'] += 1
+            cat = cmd_utils.get_model(path)
+        else:
+            cat = self._get_cached(key)
+            if cat is None:
+                cat = self._resolve_profile(cmd_utils.get_model(path), path, key, stack + [path])
+                self._put_cached(key, cat)
+
+        index = CatalogIndex(cat)
+        source = _Source(cat, index, ControlSpace.from_index(index))
+        self._sources[key] = source
+        return source
+
+    def _get_cached(self, key: str) -> Optional[catalog.Catalog]:
+        if self._cache is None:
+            return None
+        entry = self._cache.get(key)
+        return None if entry is None else catalog.Catalog.parse_obj(entry)
+
+    def _put_cached(self, key: str, cat: catalog.Catalog) -> None:
+        if self._cache is not None:
+            self._cache.put(key, _to_dict(cat))
+
+    @staticmethod
+    def _get_import_path(prof: profile.Profile, profile_path: pathlib.Path, import_: profile.Import) -> pathlib.Path:
+        """Return the local file imported by an import, relative to the profile or through a back-matter resource."""
+        href = import_.href
+        if href.startswith('#'):
+            resources = prof.back_matter.resources if prof.back_matter is not None else None
+            resource = next((r for r in resources or [] if r.uuid == href[1:]), None)
+            if resource is None or not resource.rlinks:
+                raise TrestleError(f'No resource with a link for the import of "{href}" in {profile_path}')
+            href = resource.rlinks[0].href
+        if '://' in href:
+            raise TrestleError(f'Only imports of local files are supported, not "{href}"')
+
+        import_path = (profile_path.parent / href).absolute()
+        if not import_path.is_file():
+            raise TrestleError(f'Imported file "{href}" of {profile_path} does not exist')
+        return import_path
+
+    def _resolve_profile(
+        self, prof: profile.Profile, path: pathlib.Path, key: str, stack: List[pathlib.Path]
+    ) -> catalog.Catalog:
+        """Select, merge and modify the controls of the imports of a profile into a catalog."""
+        self._stats['resolved'] += 1
+        merge = prof.merge
+        if merge is not None and merge.custom is not None:
+            raise TrestleError(f'Custom merge of {path} is not supported')
+        as_is = merge is not None and merge.as_is is not None and merge.as_is.__root__
+
+        resolved: Dict[str, Any] = {
+            # the uuid is derived from the key so that resolving the same content gives the same catalog
+            'uuid': str(uuid.UUID(key[:32], version=4)),
+            'metadata': _to_dict(prof.metadata)
+        }
+        parameters: List[Dict[str, Any]] = []
+        controls: List[Dict[str, Any]] = []
+        groups: List[Dict[str, Any]] = []
+        resources: List[Dict[str, Any]] = []
+        # the first occurrence of a control, parameter or resource imported several times is used
+        seen: Set[str] = set()
+        for import_ in prof.imports:
+            source = self._get_source(self._get_import_path(prof, path, import_), stack)
+            selection = source.space.select(import_.include, import_.exclude)
+            if not selection:
+                logger.warning(f'The import of "{import_.href}" in {path} selects no control')
+
+            cat = source.catalog
+            parameters.extend(self._get_new_items(cat.parameters, seen, 'param:'))
+            if as_is:
+                controls.extend(self._prune_controls(cat.controls, selection, seen))
+                groups.extend(self._prune_groups(cat.groups, selection, seen))
+            else:
+                for control_id in selection:
+                    if control_id not in seen:
+                        seen.add(control_id)
+                        control = source.index.get_control(control_id)
+                        controls.append(_to_dict(control, {'controls'}))
+            if cat.back_matter is not None:
+                resources.extend(self._get_new_items(cat.back_matter.resources, seen, 'resource:', 'uuid'))
+
+        if prof.back_matter is not None:
+            resources.extend(self._get_new_items(prof.back_matter.resources, seen, 'resource:', 'uuid'))
+        for field, value in [('parameters', parameters), ('controls', controls), ('groups', groups)]:
+            if value:
+                resolved[field] = value
+        if resources:
+            resolved['back-matter'] = {'resources': resources}
+
+        if prof.modify is not None:
+            self._modify(resolved, prof.modify, path)
+        return catalog.Catalog.parse_obj(resolved)
+
+    @staticmethod
+    def _get_new_items(items: Optional[List[Any]],
+                       seen: Set[str],
+                       prefix: str,
+                       id_field: str = 'id') -> List[Dict[str, Any]]:
+        """Return the dicts of the items whose identifier was not seen yet, and mark them as seen."""
+        new_items = []
+        for item in items or []:
+            item_key = prefix + str(getattr(item, id_field))
+            if item_key not in seen:
+                seen.add(item_key)
+                new_items.append(_to_dict(item))
+        return new_items
+
+    @classmethod
+    def _prune_controls(cls, controls: Optional[List[catalog.Control]], selection: ControlSet,
+                        seen: Set[str]) -> List[Dict[str, Any]]:
+        """Return the dicts of the selected controls, keeping their nesting.
+
+        The selected child controls of a control that is not selected take its place.
+        """
+        result = []
+        for control in controls or []:
+            selected = control.id in selection and control.id not in seen
+            if selected:
+                seen.add(control.id)
+            children = cls._prune_controls(control.controls, selection, seen)
+            if selected:
+                control_dict = _to_dict(control, {'controls'})
+                if children:
+                    control_dict['controls'] = children
+                result.append(control_dict)
+            else:
+                result.extend(children)
+        return result
+
+    @classmethod
+    def _prune_groups(cls, groups: Optional[List[catalog.Group]], selection: ControlSet,
+                      seen: Set[str]) -> List[Dict[str, Any]]:
+        """Return the dicts of the groups holding selected controls, with only these controls."""
+        result = []
+        for group in groups or []:
+            controls = cls._prune_controls(group.controls, selection, seen)
+            sub_groups = cls._prune_groups(group.groups, selection, seen)
+            if controls or sub_groups:
+                group_dict = _to_dict(group, {'controls', 'groups'})
+                if controls:
+                    group_dict['controls'] = controls
+                if sub_groups:
+                    group_dict['groups'] = sub_groups
+                result.append(group_dict)
+        return result
+
+    @classmethod
+    def _modify(cls, resolved: Dict[str, Any], modify: profile.Modify, path: pathlib.Path) -> None:
+        """Set the parameters and apply the alterations of a profile to the dicts of the resolved catalog.
+
+        Controls and parameters are indexed by id once, so that each setting and alteration is a single lookup.
+        """
+        controls: Dict[str, Dict[str, Any]] = {}
+        params: Dict[str, Dict[str, Any]] = {}
+        stack = [resolved]
+        while stack:
+            node = stack.pop()
+            for param in node.get('parameters', []):
+                params.setdefault(param['id'], param)
+            for control in node.get('controls', []):
+                controls.setdefault(control['id'], control)
+            stack.extend(node.get('controls', []))
+            stack.extend(node.get('groups', []))
+
+        for param_id, setting in (modify.parameter_settings or {}).items():
+            if param_id not in params:
+                raise TrestleError(f'Parameter "{param_id}" set by {path} is not in the resolved catalog')
+            params[param_id].update(_to_dict(setting))
+
+        for alter in modify.alterations or []:
+            control = controls.get(alter.control_id)
+            if control is None:
+                raise TrestleError(f'Control "{alter.control_id}" altered by {path} is not in the resolved catalog')
+            for removal in alter.removals or []:
+                cls._remove(control, removal)
+            for addition in alter.additions or []:
+                cls._add(control, addition, path)
+
+    @classmethod
+    def _remove(cls, node: Dict[str, Any], removal: profile.Remove) -> None:
+        """Remove the items matching all the criteria of the removal from the node and its parts, recursively."""
+        item_lists = [REMOVABLE_ITEMS[removal.item_name]
+                      ] if removal.item_name in REMOVABLE_ITEMS else list(REMOVABLE_ITEMS.values())
+        for list_alias in item_lists:
+            if list_alias in node:
+                node[list_alias] = [item for item in node[list_alias] if not cls._matches(item, removal)]
+                if not node[list_alias]:
+                    del node[list_alias]
+        for part in node.get('parts', []):
+            cls._remove(part, removal)
+
+    @staticmethod
+    def _matches(item: Dict[str, Any], removal: profile.Remove) -> bool:
+        if removal.name_ref is None and removal.class_ref is None and removal.id_ref is None:
+            return removal.item_name is not None
+        return (
+            (removal.name_ref is None or item.get('name') == removal.name_ref)
+            and (removal.class_ref is None or removal.class_ref in item.get('class', '').split())
+            and (removal.id_ref is None or item.get('id') == removal.id_ref)
+        )
+
+    @classmethod
+    def _add(cls, control: Dict[str, Any], addition: profile.Add, path: pathlib.Path) -> None:
+        """Add the content of the addition to the control or to its part with the `id-ref` of the addition."""
+        content = _to_dict(addition, {'position', 'id_ref'})
+        position = addition.position.value if addition.position is not None else 'ending'
+        if addition.id_ref is None or addition.id_ref == control['id']:
+            target, siblings = control, None
+            allowed = ADDED_ITEMS
+        else:
+            found = cls._find_part(control, addition.id_ref)
+            if found is None:
+                raise TrestleError(f'Part "{addition.id_ref}" of "{control["id"]}" altered by {path} is not found')
+            target, siblings = found
+            allowed = PART_ITEMS
+
+        if position in ['before', 'after']:
+            if siblings is None or set(content.keys()) - {'parts'}:
+                raise TrestleError(f'Only parts can be added {position} "{addition.id_ref}" in {path}')
+            index = next(i for i, part in enumerate(siblings) if part is target)
+            index = index if position == 'before' else index + 1
+            siblings[index:index] = content['parts']
+            return
+
+        if 'title' in content:
+            target['title'] = content.pop('title')
+        for list_alias, items in content.items():
+            if list_alias not in allowed:
+                raise TrestleError(f'Cannot add {list_alias} to "{addition.id_ref}" in {path}')
+            existing = target.get(list_alias, [])
+            target[list_alias] = items + existing if position == 'starting' else existing + items
+
+    @classmethod
+    def _find_part(cls, node: Dict[str, Any], part_id: str) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Find the part with the id among the parts of the node, returning it with the list that holds it."""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            parts = current.get('parts', [])
+            for part in parts:
+                if part.get('id') == part_id:
+                    return part, parts
+                stack.append(part)
+        return None
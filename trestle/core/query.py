@@ -0,0 +1,376 @@
+# -*- mode:python; coding:utf-8 -*-
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Query language over OSCAL models.
+
+A query is an element path whose steps can be:
+
+- an alias of a field or a dict key, e.g. `metadata`. Lists are flattened, so `catalog.groups` selects every group.
+- a list index after an alias, e.g. `catalog.groups.0`, so that the element paths of results can be queried again.
+- `*` for every child of the current object.
+- `**` for the current object and all its descendants at any depth.
+
+Each step can be followed by predicates in brackets that must all hold for the selected objects:
+
+- `[path]` holds if the relative query `path` selects anything, e.g. `controls[parts]`.
+- `[path=value]`, `[path!=value]` and `[path~regex]` hold if any value selected by the relative query `path` equals,
+  differs from or matches the value. Values can be quoted with `'` or `"`.
+
+Relative queries can have predicates themselves, e.g. all withdrawn controls of group ac:
+
+    catalog.groups[id=ac].controls[props[name=status][value=withdrawn]]
+"""
+
+import re
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from trestle.core import const
+from trestle.core import utils
+from trestle.core.err import TrestleError
+from trestle.core.models.elements import Element
+from trestle.core.traversal import join_path, traverse
+
+WILDCARD = '*'
+DESCENDANTS = '**'
+
+OP_EQUAL = '='
+OP_NOT_EQUAL = '!='
+OP_MATCH = '~'
+
+# identifier fields whose values are unique in a list, so that the key index of an element can be used
+KEY_FIELDS = ['uuid', 'id']
+
+_SPECIAL_CHARS = '.[]=!~\'"'
+
+# field names by alias of each model class met in queries
+_field_names: Dict[type, Dict[str, str]] = {}
+
+
+class Predicate(NamedTuple):
+    """A condition on the objects selected by a step."""
+
+    steps: List['Step']
+    op: Optional[str]
+    value: Optional[str]
+
+
+class Step(NamedTuple):
+    """A step of a query with its predicates."""
+
+    selector: str
+    predicates: List[Predicate]
+
+
+class _Parser:
+    """Recursive descent parser of queries."""
+
+    def __init__(self, text: str):
+        """Initialize the parser of the text."""
+        self._text = text
+        self._pos = 0
+
+    def parse(self) -> List[Step]:
+        """Parse the whole text as a query."""
+        steps = self._parse_steps()
+        if self._pos != len(self._text):
+            self._fail(f'unexpected "{self._text[self._pos]}"')
+        return steps
+
+    def _parse_steps(self) -> List[Step]:
+        steps = [self._parse_step()]
+        while self._peek() == const.ALIAS_PATH_SEPARATOR:
+            self._pos += 1
+            steps.append(self._parse_step())
+        return steps
+
+    def _parse_step(self) -> Step:
+        start = self._pos
+        while self._pos < len(self._text) and self._text[self._pos] not in _SPECIAL_CHARS:
+            self._pos += 1
+        selector = self._text[start:self._pos].strip()
+        if selector == '':
+            self._fail('empty step')
+        if WILDCARD in selector and selector not in [WILDCARD, DESCENDANTS]:
+            self._fail(f'invalid wildcard in "{selector}"')
+
+        predicates = []
+        while self._peek() == '[':
+            self._pos += 1
+            predicates.append(self._parse_predicate())
+        return Step(selector, predicates)
+
+    def _parse_predicate(self) -> Predicate:
+        steps = self._parse_steps()
+        op = None
+        value = None
+        if self._text.startswith(OP_NOT_EQUAL, self._pos):
+            op = OP_NOT_EQUAL
+        elif self._peek() in [OP_EQUAL, OP_MATCH]:
+            op = self._peek()
+        if op is not None:
+            self._pos += len(op)
+            value = self._parse_value()
+            if op == OP_MATCH:
+                try:
+                    re.compile(value)
+                except re.error as e:
+                    self._fail(f'invalid regular expression "{value}": {e}')
+        if self._peek() != ']':
+            self._fail('expected "]"')
+        self._pos += 1
+        return Predicate(steps, op, value)
+
+    def _parse_value(self) -> str:
+        quote = self._peek()
+        if quote in ['"', "'"]:
+            end = self._text.find(quote, self._pos + 1)
+            if end < 0:
+                self._fail('unterminated quoted value')
+            value = self._text[self._pos + 1:end]
+            self._pos = end + 1
+            return value
+        end = self._text.find(']', self._pos)
+        if end < 0:
+            self._fail('expected "]"')
+        value = self._text[self._pos:end].strip()
+        self._pos = end
+        return value
+
+    def _peek(self) -> Optional[str]:
+        return self._text[self._pos] if self._pos < len(self._text) else None
+
+    def _fail(self, message: str) -> None:
+        raise TrestleError(f'Invalid query "{self._text}" at position {self._pos}: {message}')
+
+
+def to_query_string(value: Any) -> Optional[str]:
+    """Convert a scalar value of a model to the string that predicates compare with, or None for non-scalars."""
+    value = utils.unwrap_root(value)
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (BaseModel, dict, list, tuple)) or value is None:
+        return None
+    return str(value)
+
+
+class Query:
+    """A compiled query that can be evaluated against models.
+
+    Results are streamed in document order as `(object, element path string)` tuples. When the query is evaluated
+    against an `Element`, its type index is used for `**` steps from the root and its key index for `uuid` and `id`
+    equality predicates, so repeated queries on the same element avoid full traversals.
+    """
+
+    def __init__(self, query: str):
+        """Compile the query, raising a TrestleError if it is invalid."""
+        self._query = query
+        self._steps = _Parser(query).parse()
+
+    def __str__(self) -> str:
+        """Return the query string."""
+        return self._query
+
+    def evaluate(self,
+                 target: Union[BaseModel, Element],
+                 root_alias: Optional[str] = None) -> Iterator[Tuple[Any, str]]:
+        """Evaluate the query against a model or an element, yielding the selected objects with their paths.
+
+        The first step of the query must match the root alias, which defaults to the alias of the model class or the
+        wrapper alias of the element, or be a wildcard.
+        """
+        element = target if isinstance(target, Element) else None
+        model = target.get() if element is not None else target
+        if root_alias is None:
+            root_alias = utils.classname_to_alias(model.__class__.__name__, 'json')
+
+        first = self._steps[0]
+        if first.selector == DESCENDANTS:
+            roots = self._select(element, first, 1, self._steps, model, root_alias)
+        elif first.selector in [WILDCARD, root_alias]:
+            roots = iter([(model, root_alias)])
+        else:
+            return
+        for root, path in roots:
+            if self._holds(element, first.predicates, root):
+                yield from self._evaluate(element, self._steps, 1, root, path)
+
+    def _evaluate(self, element: Optional[Element], steps: List[Step], start: int, node: Any,
+                  path: str) -> Iterator[Tuple[Any, str]]:
+        """Apply the steps from the start index to the node, yielding the selected objects in document order.
+
+        The element evaluated against, if any, is passed down the calls rather than kept in the query, so that a query
+        can be evaluated against several targets at the same time.
+        """
+        stack = [(start, node, path)]
+        while stack:
+            i, node, path = stack.pop()
+            if i == len(steps):
+                yield node, path
+                continue
+            step = steps[i]
+            if i + 1 < len(steps) and steps[i + 1].selector.isnumeric() and step.selector not in [WILDCARD, DESCENDANTS
+                                                                                                  ]:
+                # a list index selects a single item of the list of the step
+                item = self._select_item(node, path, step.selector, int(steps[i + 1].selector))
+                if item is not None and self._holds(element, step.predicates + steps[i + 1].predicates, item[0]):
+                    stack.append((i + 2, item[0], item[1]))
+                continue
+            children = [
+                (i + 1, child, child_path)
+                for child,
+                child_path in self._select(element, step, i + 1, steps, node, path)
+                if self._holds(element, step.predicates, child)
+            ]
+            stack.extend(reversed(children))
+
+    def _select_item(self, node: Any, path: str, name: str, index: int) -> Optional[Tuple[Any, str]]:
+        """Select the item at the index of the list under the name in the node."""
+        items = self._get_child(node, name)
+        if not isinstance(items, list) or index >= len(items) or items[index] is None:
+            return None
+        return items[index], join_path(join_path(path, name), str(index))
+
+    def _select(self, element: Optional[Element], step: Step, next_index: int, steps: List[Step], node: Any,
+                path: str) -> Iterator[Tuple[Any, str]]:
+        """Select the objects of a step from the node, flattening lists."""
+        if step.selector == DESCENDANTS:
+            next_step = steps[next_index] if next_index < len(steps) else None
+            yield from self._select_descendants(element, node, path, next_step)
+            return
+        if isinstance(node, (list, tuple)):
+            for i, item in enumerate(node):
+                if item is not None:
+                    yield from self._select(element, step, next_index, steps, item, join_path(path, str(i)))
+            return
+
+        if step.selector == WILDCARD:
+            children = [(child.value, child.path) for child in self._get_children(node, path)]
+        elif step.selector.isnumeric():
+            children = []
+        else:
+            child = self._get_child(node, step.selector)
+            if isinstance(child, list):
+                index = self._find_by_key(element, child, step.predicates)
+                if index is not None:
+                    yield child[index], join_path(join_path(path, step.selector), str(index))
+                    return
+            children = [] if child is None else [(child, join_path(path, step.selector))]
+
+        for child, child_path in children:
+            if isinstance(child, (list, tuple)):
+                for i, item in enumerate(child):
+                    if item is not None:
+                        yield item, join_path(child_path, str(i))
+            else:
+                yield child, child_path
+
+    def _select_descendants(self, element: Optional[Element], node: Any, path: str,
+                            next_step: Optional[Step]) -> Iterator[Tuple[Any, str]]:
+        """Select the node and its descendants except lists, whose items are selected instead."""
+        type_index = None
+        if (element is not None and node is element.get() and next_step is not None
+                and next_step.selector not in [WILDCARD, DESCENDANTS]):
+            type_index = element.get_type_index()
+        if type_index is not None and type_index.get_root_alias() == path:
+            # only the objects that can have a child under the name of the next step are of interest
+            types = [dict]
+            for node_type in type_index.get_types():
+                if issubclass(node_type, BaseModel) and any(field.alias == next_step.selector
+                                                            for field in node_type.__fields__.values()):
+                    types.append(node_type)
+            for descendant, descendant_path in type_index.iter_nodes(types):
+                if not isinstance(descendant, dict) or next_step.selector in descendant:
+                    yield descendant, descendant_path
+            return
+
+        for descendant in traverse(node, path):
+            if not isinstance(descendant.value, (list, tuple)):
+                yield descendant.value, descendant.path
+
+    def _find_by_key(self, element: Optional[Element], items: list, predicates: List[Predicate]) -> Optional[int]:
+        """Find the index of the only item of a list selected by a uuid or id equality predicate with the key index.
+
+        None is returned when several items have the key, so that all of them are selected by scanning the list.
+        """
+        if element is None:
+            return None
+        for predicate in predicates:
+            if (predicate.op == OP_EQUAL and len(predicate.steps) == 1 and not predicate.steps[0].predicates
+                    and predicate.steps[0].selector in KEY_FIELDS):
+                return element.find_key_index(items, predicate.steps[0].selector, predicate.value, True)
+        return None
+
+    def _holds(self, element: Optional[Element], predicates: List[Predicate], node: Any) -> bool:
+        """Check whether all predicates hold for the node."""
+        for predicate in predicates:
+            values = self._evaluate(element, predicate.steps, 0, node, '')
+            if predicate.op is None:
+                holds = any(True for _ in values)
+            elif predicate.op == OP_EQUAL:
+                holds = any(to_query_string(value) == predicate.value for value, _ in values)
+            elif predicate.op == OP_NOT_EQUAL:
+                holds = any(
+                    to_query_string(value) is not None and to_query_string(value) != predicate.value for value,
+                    _ in values
+                )
+            else:
+                pattern = re.compile(predicate.value)
+                holds = any(
+                    to_query_string(value) is not None and pattern.search(to_query_string(value)) is not None for value,
+                    _ in values
+                )
+            if not holds:
+                return False
+        return True
+
+    @staticmethod
+    def _get_child(node: Any, name: str) -> Any:
+        """Get the child of a model by alias or of a dict by key."""
+        if isinstance(node, BaseModel):
+            field_name = _get_field_names(node.__class__).get(name)
+            return None if field_name is None else getattr(node, field_name, None)
+        if isinstance(node, dict):
+            return node.get(name, None)
+        return None
+
+    @staticmethod
+    def _get_children(node: Any, path: str) -> List[Any]:
+        """Get the direct children of a model or dict."""
+        if isinstance(node, BaseModel) and '__root__' in node.__fields__:
+            node = node.__root__
+        if not isinstance(node, (BaseModel, dict)):
+            return []
+        return list(traverse(node, path, prune=lambda child: child.depth > 0))[1:]
+
+
+def _get_field_names(model_type: type) -> Dict[str, str]:
+    """Get the map of field aliases to field names of a model class, caching it per class."""
+    field_names = _field_names.get(model_type)
+    if field_names is None:
+        field_names = {field.alias: name for name, field in model_type.__fields__.items()}
+        _field_names[model_type] = field_names
+    return field_names
+
+
+def query(target: Union[BaseModel, Element], query_string: str) -> Iterator[Tuple[Any, str]]:
+    """Evaluate a query string against a model or an element."""
+    return Query(query_string).evaluate(target)
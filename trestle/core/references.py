@@ -0,0 +1,152 @@
+# -*- mode:python; coding:utf-8 -*-
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Index of the definitions and cross references held by an OSCAL model."""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from trestle.core import utils
+from trestle.core.traversal import walk
+
+# Kind matching any uuid defined in the model, used by references such as `uuid-ref`.
+ANY_KIND = '*'
+
+# Fields whose values reference a definition of the given kind.
+REFERENCE_FIELDS = {
+    'party_uuid': 'party',
+    'party_uuids': 'party',
+    'role_id': 'role',
+    'role_ids': 'role',
+    'location_uuid': 'location',
+    'location_uuids': 'location',
+    'component_uuid': 'component',
+    'implementation_statement_uuid': 'statement',
+    'activity_uuid': 'activity',
+    'activity_uuids': 'activity',
+    'uuid_ref': ANY_KIND
+}
+
+# Dict fields whose keys reference a definition of the given kind.
+KEYED_REFERENCE_FIELDS = {
+    'responsible_roles': 'role',
+    'responsible_parties': 'role',
+    'by_components': 'component',
+    'implemented_components': 'component'
+}
+
+# Dict fields whose keys define an object of the given kind.
+KEYED_DEFINITION_FIELDS = {'components': 'component', 'users': 'user', 'inventory_items': 'inventory-item'}
+
+# Classes whose identifier field defines an object of the given kind.
+DEFINITION_CLASSES = {
+    'Party': ('uuid', 'party'),
+    'Role': ('id', 'role'),
+    'Location': ('uuid', 'location'),
+    'Statement': ('uuid', 'statement'),
+    'IncludeActivity': ('uuid', 'activity')
+}
+
+# Kinds for which a definition that is never referenced is worth reporting.
+UNUSED_KINDS = ['party', 'role', 'location', 'component']
+
+
+class ReferenceIndex:
+    """Collect the definitions and references of a model into hash maps during a single traversal.
+
+    Definitions and references are both stored as `kind -> identifier -> element paths`, so that dangling references
+    and unused definitions are found with one lookup per entry rather than by comparing every pair.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self.definitions: Dict[str, Dict[str, List[str]]] = {}
+        self.references: Dict[str, Dict[str, List[str]]] = {}
+
+    @classmethod
+    def build(cls, object_of_interest: Any, root_path: str = '') -> 'ReferenceIndex':
+        """Build the index of a model in a single traversal."""
+        index = cls()
+        for node, path in walk(object_of_interest, root_path):
+            index.visit(node, path)
+        return index
+
+    def visit(self, node: Any, path: str) -> None:
+        """Record the definitions and references held directly by the node."""
+        if not isinstance(node, BaseModel):
+            return
+        class_name = node.__class__.__name__
+        if class_name in DEFINITION_CLASSES:
+            field, kind = DEFINITION_CLASSES[class_name]
+            value = getattr(node, field, None)
+            if value is not None:
+                self._add(self.definitions, kind, utils.unwrap_root(value), path)
+
+        for field in node.__fields_set__:
+            value = getattr(node, field, None)
+            if value is None:
+                continue
+            if field == 'uuid':
+                self._add(self.definitions, ANY_KIND, utils.unwrap_root(value), path)
+            elif field in REFERENCE_FIELDS:
+                values = value if isinstance(value, list) else [value]
+                for item in values:
+                    self._add(self.references, REFERENCE_FIELDS[field], utils.unwrap_root(item), path)
+            elif field in KEYED_REFERENCE_FIELDS and isinstance(value, dict):
+                for key in value.keys():
+                    self._add(self.references, KEYED_REFERENCE_FIELDS[field], key, path)
+            elif field in KEYED_DEFINITION_FIELDS and isinstance(value, dict):
+                for key in value.keys():
+                    self._add(self.definitions, KEYED_DEFINITION_FIELDS[field], key, path)
+                    self._add(self.definitions, ANY_KIND, key, path)
+
+    def get_definitions(self, kind: str, identifier: str) -> List[str]:
+        """Return the paths at which the identifier of the given kind is defined."""
+        return self.definitions.get(kind, {}).get(identifier, [])
+
+    def get_references(self, kind: str, identifier: str) -> List[str]:
+        """Return the paths at which the identifier of the given kind is referenced."""
+        return self.references.get(kind, {}).get(identifier, [])
+
+    def is_defined(self, kind: str, identifier: str) -> bool:
+        """Check whether the identifier is defined as the given kind."""
+        return identifier in self.definitions.get(kind, {})
+
+    def get_dangling_references(self) -> List[Tuple[str, str, List[str]]]:
+        """Return the `(kind, identifier, paths)` of references that do not resolve to any definition."""
+        dangling = []
+        for kind, references in self.references.items():
+            for identifier, paths in references.items():
+                if not self.is_defined(kind, identifier):
+                    dangling.append((kind, identifier, paths))
+        return dangling
+
+    def get_unused_definitions(self, kinds: Optional[List[str]] = None) -> List[Tuple[str, str, List[str]]]:
+        """Return the `(kind, identifier, paths)` of definitions that are never referenced.
+
+        Identifiers referenced through `uuid-ref` count as used for every kind.
+        """
+        any_refs = self.references.get(ANY_KIND, {})
+        unused = []
+        for kind in kinds or UNUSED_KINDS:
+            references = self.references.get(kind, {})
+            for identifier, paths in self.definitions.get(kind, {}).items():
+                if identifier not in references and identifier not in any_refs:
+                    unused.append((kind, identifier, paths))
+        return unused
+
+    @staticmethod
+    def _add(table: Dict[str, Dict[str, List[str]]], kind: str, identifier: Any, path: str) -> None:
+        table.setdefault(kind, {}).setdefault(str(identifier), []).append(path)
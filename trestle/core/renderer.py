@@ -0,0 +1,248 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Rendering of the prose of catalogs with the values of the parameters it references.
+
+Prose references parameters with `{{ param-id }}` (or `{{ insert: param, param-id }}`). Each distinct prose is
+compiled once into a template of literal text and parameter ids, and the text of each parameter is computed once per
+catalog from an index of all parameters by id, so that rendering a catalog is a single pass joining strings.
+"""
+
+import re
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set
+
+from trestle.core import utils
+from trestle.core.err import TrestleError
+from trestle.oscal import catalog
+
+# Reference to a parameter in prose, capturing the parameter id.
+PARAM_PATTERN = re.compile(r'{{\s*(?:insert:\s*param,\s*)?([\w.\-]+)\s*}}')
+
+
+class Template:
+    """Prose compiled into alternating literal text and parameter ids."""
+
+    __slots__ = ('_chunks', )
+
+    def __init__(self, text: str):
+        """Compile the text, splitting it at each parameter reference."""
+        # splitting by a pattern with one group alternates literal text (even indexes) and parameter ids (odd indexes)
+        self._chunks = PARAM_PATTERN.split(text)
+
+    def get_param_ids(self) -> List[str]:
+        """Return the ids of the parameters referenced by the template, in order."""
+        return self._chunks[1::2]
+
+    def render(self, texts: Dict[str, str]) -> str:
+        """Render the template with the text of each parameter, keeping the references to unknown parameters."""
+        if len(self._chunks) == 1:
+            return self._chunks[0]
+        chunks = self._chunks[:]
+        for i in range(1, len(chunks), 2):
+            param_id = chunks[i]
+            chunks[i] = texts[param_id] if param_id in texts else f'{{{{ {param_id} }}}}'
+        return ''.join(chunks)
+
+
+class TemplateCache:
+    """Compiled templates by prose text, so that each distinct prose is compiled once."""
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._templates: Dict[str, Template] = {}
+
+    def get(self, text: str) -> Template:
+        """Return the template of the text, compiling it on first use."""
+        template = self._templates.get(text)
+        if template is None:
+            template = Template(text)
+            self._templates[text] = template
+        return template
+
+    def __len__(self) -> int:
+        """Return the number of compiled templates."""
+        return len(self._templates)
+
+
+class ParamIndex:
+    """Index of the parameters of a catalog by id, giving the text that replaces each parameter reference.
+
+    The text of a parameter is its value, or else its selection, or else an assignment of its label. The choices of a
+    selection can invoke other parameters by reference; they are rendered within the choice, following chains of
+    invocations, and a cycle of invocations is an error. A parameter with a value hides the parameters invoked by its
+    choices. Parameter settings, e.g. the `SetParameter` of a profile, override the fields of the parameters they set.
+
+    The chains of invocations come from the text of the choices only. The `depends-on` field of a parameter is ignored:
+    it names the parameter that invokes it, which the choices of that parameter already tell.
+    """
+
+    def __init__(
+        self,
+        params: Dict[str, catalog.Param],
+        settings: Optional[Dict[str, Any]] = None,
+        templates: Optional[TemplateCache] = None
+    ):
+        """Initialize the index from the parameters by id and the settings by parameter id."""
+        self._params = params
+        self._settings = settings or {}
+        self._templates = templates if templates is not None else TemplateCache()
+        self._texts: Dict[str, str] = {}
+
+    @classmethod
+    def from_catalog(
+        cls,
+        cat: catalog.Catalog,
+        settings: Optional[Dict[str, Any]] = None,
+        templates: Optional[TemplateCache] = None
+    ) -> 'ParamIndex':
+        """Index the parameters of the catalog, its groups and its controls."""
+        params: Dict[str, catalog.Param] = {}
+        stack: List[Any] = [cat]
+        while stack:
+            node = stack.pop()
+            for param in node.parameters or []:
+                params.setdefault(param.id, param)
+            stack.extend(node.controls or [])
+            stack.extend(getattr(node, 'groups', None) or [])
+        return cls(params, settings, templates)
+
+    def __contains__(self, param_id: str) -> bool:
+        """Check whether the parameter is in the index."""
+        return param_id in self._params
+
+    def _get_field(self, param_id: str, field: str) -> Any:
+        setting = self._settings.get(param_id)
+        value = getattr(setting, field, None) if setting is not None else None
+        if value is None:
+            value = getattr(self._params[param_id], field, None)
+        return utils.unwrap_root(value)
+
+    def get_text(self, param_id: str) -> Optional[str]:
+        """Return the text of the parameter, or None if it is not in the index."""
+        text = self._texts.get(param_id)
+        if text is None and param_id in self._params:
+            text = self._get_text(param_id, set())
+        return text
+
+    def get_texts(self, param_ids: List[str]) -> Dict[str, str]:
+        """Return the texts of the parameters in the index among the given ones."""
+        texts = {}
+        for param_id in param_ids:
+            text = self.get_text(param_id)
+            if text is not None:
+                texts[param_id] = text
+        return texts
+
+    def _get_text(self, param_id: str, visiting: Set[str]) -> str:
+        if param_id in self._texts:
+            return self._texts[param_id]
+        if param_id in visiting:
+            raise TrestleError(f'Parameter "{param_id}" depends on itself')
+
+        visiting.add(param_id)
+        text = self._get_value(param_id, visiting)
+        if text is None:
+            label = self._get_field(param_id, 'label')
+            text = f'[Assignment: {label if label is not None else param_id}]'
+        visiting.discard(param_id)
+        self._texts[param_id] = text
+        return text
+
+    def _get_value(self, param_id: str, visiting: Set[str]) -> Optional[str]:
+        """Return the value or the rendered selection of the parameter, if it has one."""
+        value = self._get_field(param_id, 'value')
+        if value is not None:
+            return str(value)
+        select = self._get_field(param_id, 'select')
+        if select is not None:
+            return self._render_select(select, visiting)
+        return None
+
+    def _render_select(self, select: Any, visiting: Set[str]) -> str:
+        choices = []
+        for choice in getattr(select, 'alternatives', None) or []:
+            template = self._templates.get(str(utils.unwrap_root(choice)))
+            texts = {
+                choice_param: self._get_text(choice_param, visiting)
+                for choice_param in template.get_param_ids()
+                if choice_param in self._params
+            }
+            choices.append(template.render(texts).strip())
+        how_many = getattr(select, 'how_many', None)
+        prefix = f'Selection ({how_many})' if how_many else 'Selection'
+        return f'[{prefix}: {"; ".join(choices)}]'
+
+
+class RenderedProse(NamedTuple):
+    """The rendered prose of a part of a control."""
+
+    control_id: str
+    part_id: Optional[str]
+    part_name: str
+    depth: int
+    text: str
+
+
+class CatalogRenderer:
+    """Render the prose of the parts of all controls of a catalog with its parameters."""
+
+    def __init__(self, cat: catalog.Catalog, settings: Optional[Dict[str, Any]] = None):
+        """Initialize a renderer of the catalog, with optional parameter settings by parameter id."""
+        self._catalog = cat
+        self._templates = TemplateCache()
+        self._params = ParamIndex.from_catalog(cat, settings, self._templates)
+
+    def get_param_index(self) -> ParamIndex:
+        """Return the index of the parameters of the catalog."""
+        return self._params
+
+    def render_text(self, text: str) -> str:
+        """Render a prose text with the parameters of the catalog."""
+        template = self._templates.get(text)
+        return template.render(self._params.get_texts(template.get_param_ids()))
+
+    def iter_prose(self) -> Iterator[RenderedProse]:
+        """Yield the rendered prose of the parts of all controls in document order, in a single pass.
+
+        Depth is 0 for the parts of a control and increases for nested parts.
+        """
+        # stack of (control id, depth, control, group or part) in reverse document order
+        stack: List[Any] = [(None, 0, self._catalog)]
+        while stack:
+            control_id, depth, node = stack.pop()
+            if isinstance(node, catalog.Part):
+                if node.prose is not None:
+                    text = self.render_text(node.prose.__root__)
+                    yield RenderedProse(control_id, node.id, node.name, depth, text)
+                stack.extend((control_id, depth + 1, part) for part in reversed(node.parts or []))
+                continue
+
+            if isinstance(node, catalog.Control):
+                control_id = node.id
+            children = [(control_id, 0, part) for part in node.parts or []] if control_id is not None else []
+            children += [(None, 0, control) for control in node.controls or []]
+            children += [(None, 0, group) for group in getattr(node, 'groups', None) or []]
+            stack.extend(reversed(children))
+
+    def render_control(self, control: catalog.Control) -> str:
+        """Render the prose of the parts of a control as text indented by part depth."""
+        lines = []
+        stack = [(0, part) for part in reversed(control.parts or [])]
+        while stack:
+            depth, part = stack.pop()
+            if part.prose is not None:
+                lines.append('  ' * depth + self.render_text(part.prose.__root__))
+            stack.extend((depth + 1, child) for child in reversed(part.parts or []))
+        return '\n'.join(lines)
@@ -0,0 +1,173 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Merge of assessment results with deduplication of findings and observations.
+
+Successive runs of a scanner produce assessment results with mostly the same findings under new uuids and times. The
+findings and observations are compared by fingerprint: the hash of their canonical JSON without their uuids and times,
+and without the observations for findings. Result files are merged one at a time in the raw data of the files, so the
+merge is linear in the number of findings and memory holds only the distinct findings. Duplicate findings are merged
+into the most recently collected one, with the union of their distinct observations, and the files and uuids of all
+duplicates are kept as the provenance of the merged finding.
+"""
+
+import json
+import pathlib
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
+from pydantic.datetime_parse import parse_datetime
+
+from trestle.core.err import TrestleError
+from trestle.core.time_index import to_timestamp
+from trestle.oscal import assessment_results
+from trestle.utils import fs
+from trestle.utils.cache import make_key
+
+ROOT_KEY = 'assessment-results'
+
+# Key of the results in the assessment results, which has no alias in the model.
+RESULTS_KEY = assessment_results.AssessmentResults.__fields__['results_group'].alias
+
+# Keys that change between runs with the same content and are ignored by fingerprints.
+VOLATILE_KEYS = {'uuid', 'collected', 'expires'}
+
+
+def canonicalize(data: Any, exclude: Iterable[str] = ()) -> str:
+    """Return the canonical JSON of raw data without volatile keys, and without the excluded keys at the top level."""
+    if isinstance(data, dict):
+        data = {key: value for key, value in data.items() if key not in exclude}
+    return json.dumps(_strip(data), sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def fingerprint(data: Any, exclude: Iterable[str] = ()) -> str:
+    """Return the hash of the canonical JSON of raw data."""
+    return make_key(canonicalize(data, exclude))
+
+
+def _strip(data: Any) -> Any:
+    if isinstance(data, dict):
+        return {key: _strip(value) for key, value in data.items() if key not in VOLATILE_KEYS}
+    if isinstance(data, list):
+        return [_strip(item) for item in data]
+    return data
+
+
+class _MergedFinding:
+    """A distinct finding with its latest occurrence, distinct observations and sources."""
+
+    def __init__(self, data: Dict[str, Any], collected: float):
+        self.data = data
+        self.collected = collected
+        self.observations: Dict[str, Dict[str, Any]] = {}
+        self.sources: List[Dict[str, str]] = []
+
+
+class ResultsMerger:
+    """Merge assessment results files into consolidated assessment results."""
+
+    def __init__(self):
+        """Initialize an empty merge."""
+        self._findings: Dict[str, _MergedFinding] = {}
+        self._base: Optional[Dict[str, Any]] = None
+        self._base_end: Optional[float] = None
+        self._start: Optional[str] = None
+        self._end: Optional[str] = None
+        self._stats = {'files': 0, 'findings': 0, 'observations': 0}
+
+    def add_file(self, file_path: pathlib.Path) -> None:
+        """Merge the assessment results of a JSON or YAML file."""
+        self.add_data(fs.load_file(str(file_path)), str(file_path))
+
+    def add_data(self, data: Dict[str, Any], source: str) -> None:
+        """Merge the raw data of assessment results, recording the source as the provenance of its findings."""
+        if not isinstance(data, dict) or not isinstance(data.get(ROOT_KEY), dict):
+            raise TrestleError(f'{source} does not hold assessment results')
+        model = data[ROOT_KEY]
+        results = model.get(RESULTS_KEY)
+        if not isinstance(results, dict) or 'start' not in results:
+            raise TrestleError(f'{source} has no results')
+
+        self._stats['files'] += 1
+        end = to_timestamp(parse_datetime(results.get('end', results['start'])))
+        if self._base_end is None or end >= self._base_end:
+            # the most recent results provide everything but the findings of the merged results
+            self._base = {key: value for key, value in model.items() if key != RESULTS_KEY}
+            self._base[RESULTS_KEY] = {key: value for key, value in results.items() if key != 'findings'}
+            self._base_end = end
+        if self._start is None or parse_datetime(results['start']) < parse_datetime(self._start):
+            self._start = results['start']
+        if 'end' in results and (self._end is None or parse_datetime(results['end']) > parse_datetime(self._end)):
+            self._end = results['end']
+
+        for finding in results.get('findings') or []:
+            self._add_finding(finding, source)
+
+    def _add_finding(self, finding: Dict[str, Any], source: str) -> None:
+        if 'collected' not in finding or 'uuid' not in finding:
+            raise TrestleError(f'A finding in {source} has no uuid or collection time')
+        self._stats['findings'] += 1
+        key = fingerprint(finding, ['observations'])
+        collected = to_timestamp(parse_datetime(finding['collected']))
+        merged = self._findings.get(key)
+        latest = merged is None or collected >= merged.collected
+        if merged is None:
+            merged = self._findings[key] = _MergedFinding(finding, collected)
+        elif latest:
+            merged.data = finding
+            merged.collected = collected
+        merged.sources.append({'file': source, 'uuid': finding['uuid'], 'collected': finding['collected']})
+
+        for observation in finding.get('observations') or []:
+            self._stats['observations'] += 1
+            observation_key = fingerprint(observation)
+            if latest or observation_key not in merged.observations:
+                merged.observations[observation_key] = observation
+
+    def get_result(self) -> assessment_results.AssessmentResults:
+        """Return the merged assessment results.
+
+        The uuids of the merged results are derived from the fingerprints of the distinct findings, so merging the
+        same findings gives the same uuids.
+        """
+        if self._base is None:
+            raise TrestleError('No assessment results to merge')
+        key = make_key(*sorted(self._findings.keys()))
+        model = dict(self._base, uuid=str(uuid.UUID(key[:32], version=4)))
+        results = dict(self._base[RESULTS_KEY], uuid=str(uuid.UUID(key[32:64], version=4)), start=self._start)
+        if self._end is not None:
+            results['end'] = self._end
+        results['findings'] = [self._get_finding(merged) for merged in self._findings.values()]
+        model[RESULTS_KEY] = results
+        return assessment_results.AssessmentResults.parse_obj(model)
+
+    @staticmethod
+    def _get_finding(merged: _MergedFinding) -> Dict[str, Any]:
+        finding = dict(merged.data)
+        if merged.observations:
+            finding['observations'] = list(merged.observations.values())
+        return finding
+
+    def get_provenance(self) -> Dict[str, List[Dict[str, str]]]:
+        """Return the file, uuid and collection time of every duplicate of each merged finding, by merged uuid."""
+        return {merged.data['uuid']: list(merged.sources) for merged in self._findings.values()}
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return the number of files, findings and observations read, and of distinct findings and observations."""
+        return {
+            **self._stats,
+            'distinct-findings': len(self._findings),
+            'distinct-observations': sum(len(merged.observations) for merged in self._findings.values())
+        }
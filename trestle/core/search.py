@@ -0,0 +1,128 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tokenization and ranking of the prose of OSCAL models for full-text search.
+
+Every element with prose, i.e. with a title, prose, a description or remarks, is a searchable document. The terms of
+the documents are stored in an inverted index by the project index and documents are ranked with Okapi BM25.
+"""
+
+import math
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from pydantic import BaseModel
+
+from trestle.core import utils
+
+# Fields holding the prose of an element, with the weight of their terms.
+TEXT_FIELDS = {'title': 2, 'prose': 1, 'description': 1, 'remarks': 1}
+
+# Words too common in English prose to be worth indexing.
+STOP_WORDS = frozenset(
+    [
+        'a',
+        'an',
+        'and',
+        'are',
+        'as',
+        'at',
+        'be',
+        'by',
+        'for',
+        'from',
+        'has',
+        'in',
+        'is',
+        'it',
+        'its',
+        'of',
+        'on',
+        'or',
+        'that',
+        'the',
+        'this',
+        'to',
+        'was',
+        'were',
+        'which',
+        'with'
+    ]
+)
+
+# BM25 parameters: saturation of the term frequency and normalization by document length.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+class SearchResult(NamedTuple):
+    """An element matching a search, with its relevance score."""
+
+    file: str
+    model: Optional[str]
+    path: str
+    element_type: str
+    oscal_id: Optional[str]
+    title: Optional[str]
+    score: float
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lower case alphanumeric terms, dropping stop words.
+
+    Punctuation separates terms, so that `AC-2(1)` is found by `ac 2 1` and the other way around.
+    """
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def get_document(obj: BaseModel) -> Tuple[Optional[str], Dict[str, int], int]:
+    """Return the title, the weighted term frequencies and the length of the prose held directly by the element.
+
+    The length is 0 for elements without prose.
+    """
+    title = None
+    frequencies: Dict[str, int] = {}
+    length = 0
+    for field, weight in TEXT_FIELDS.items():
+        if field not in obj.__fields_set__:
+            continue
+        text = utils.unwrap_root(getattr(obj, field, None))
+        if not isinstance(text, str):
+            continue
+        if field == 'title':
+            title = text
+        for term in tokenize(text):
+            frequencies[term] = frequencies.get(term, 0) + weight
+            length += weight
+    return title, frequencies, length
+
+
+def score_term(frequency: int, doc_frequency: int, doc_count: int, length: int, avg_length: float) -> float:
+    """Return the BM25 score of a query term in a document."""
+    idf = math.log(1 + (doc_count - doc_frequency + 0.5) / (doc_frequency + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length) if avg_length else BM25_K1
+    return idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+
+
+def rank(postings: Dict[str, List[Tuple[Any, int, int]]], doc_count: int, avg_length: float) -> Dict[Any, float]:
+    """Score documents from the postings `term -> [(document, frequency, document length)]` of the query terms."""
+    scores: Dict[Any, float] = {}
+    for term_postings in postings.values():
+        doc_frequency = len(term_postings)
+        for doc, frequency, length in term_postings:
+            scores[doc] = scores.get(doc, 0.0) + score_term(frequency, doc_frequency, doc_count, length, avg_length)
+    return scores
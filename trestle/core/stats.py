@@ -0,0 +1,167 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Aggregate statistics over assessment results and plans of action and milestones.
+
+Statistics are counters of findings and POA&M items by objective status result, observations by method and type, and
+risks by status and metric. They are collected from the raw data of the files, without building the models, one file at
+a time, so that memory is bounded by the largest file and the number of distinct counted values. The statistics of
+several files are merged by adding their counters, so partial statistics of shards of a large collection can be
+computed separately, saved and merged later in any order. A file that cannot be read or counted is recorded with its
+error instead of its counts, so that one bad file does not stop the collection.
+"""
+
+import json
+import logging
+import pathlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional
+
+from trestle import __version__
+from trestle.core.err import TrestleError
+from trestle.core.traversal import traverse
+from trestle.utils import fs
+
+logger = logging.getLogger(__name__)
+
+# Counted categories and the list fields of the raw data holding the objects they count.
+FINDINGS = 'findings'
+POAM_ITEMS = 'poam-items'
+OBSERVATION_METHODS = 'observation-methods'
+OBSERVATION_TYPES = 'observation-types'
+RISK_STATUSES = 'risk-statuses'
+RISK_METRICS = 'risk-metrics'
+MODELS = 'models'
+CATEGORIES = [MODELS, FINDINGS, POAM_ITEMS, OBSERVATION_METHODS, OBSERVATION_TYPES, RISK_STATUSES, RISK_METRICS]
+
+# Value counted for objects without the counted field.
+UNKNOWN = 'unknown'
+
+# Key of the value of OSCAL fields with attributes, e.g. the result of an objective status.
+VALUE_KEY = 'STRVALUE'
+
+
+class Stats:
+    """Counters of the values of each category, and the errors of the files that could not be counted by file."""
+
+    def __init__(
+        self,
+        files: int = 0,
+        counts: Optional[Dict[str, Dict[str, int]]] = None,
+        errors: Optional[Dict[str, str]] = None
+    ):
+        """Initialize statistics, empty by default."""
+        self.files = files
+        self.errors: Dict[str, str] = dict(errors or {})
+        self.counts: Dict[str, Counter] = {category: Counter() for category in CATEGORIES}
+        for category, counter in (counts or {}).items():
+            if category not in self.counts:
+                raise TrestleError(f'Unknown statistics category {category}')
+            self.counts[category].update(counter)
+
+    def add_data(self, data: Dict[str, Any]) -> None:
+        """Count the objects of the raw data of an OSCAL file."""
+        self.files += 1
+        self.counts[MODELS][fs.get_root_alias(data)] += 1
+        for node in traverse(data, track_paths=False):
+            if not isinstance(node.value, list):
+                continue
+            if node.key == 'findings':
+                self.counts[FINDINGS].update(_get_result(item) for item in node.value)
+            elif node.key == 'poam-item-group':
+                self.counts[POAM_ITEMS].update(_get_result(item) for item in node.value)
+            elif node.key == 'observations':
+                for observation in node.value:
+                    self.counts[OBSERVATION_METHODS].update(observation.get('observation-methods') or [UNKNOWN])
+                    self.counts[OBSERVATION_TYPES].update(observation.get('observation-types') or [UNKNOWN])
+            elif node.key == 'risks':
+                for risk in node.value:
+                    self.counts[RISK_STATUSES][risk.get('risk-status', UNKNOWN)] += 1
+                    self.counts[RISK_METRICS].update(
+                        f'{metric.get("name")}={metric.get(VALUE_KEY)}' for metric in risk.get('risk-metrics') or []
+                    )
+
+    def merge(self, other: 'Stats') -> 'Stats':
+        """Add the counts of other statistics to these ones and return them."""
+        self.files += other.files
+        for category, counter in other.counts.items():
+            self.counts[category].update(counter)
+        self.errors.update(other.errors)
+        return self
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the statistics as JSON data, with the values of each category by decreasing count."""
+        counts = {category: dict(counter.most_common()) for category, counter in self.counts.items()}
+        errors = dict(sorted(self.errors.items()))
+        return {'trestle-version': __version__, 'files': self.files, 'counts': counts, 'errors': errors}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Stats':
+        """Create statistics from JSON data written by `as_dict`."""
+        if not isinstance(data, dict) or 'files' not in data or 'counts' not in data:
+            raise TrestleError('Invalid statistics: "files" and "counts" are required')
+        return cls(data['files'], data['counts'], data.get('errors'))
+
+    @classmethod
+    def read(cls, path: pathlib.Path) -> 'Stats':
+        """Read statistics from a JSON file."""
+        with open(path, encoding='utf8') as f:
+            return cls.from_dict(json.load(f))
+
+    def write(self, path: pathlib.Path) -> None:
+        """Write the statistics to a JSON file."""
+        with open(path, 'w', encoding='utf8') as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+    def __eq__(self, other: object) -> bool:
+        """Check whether other statistics have the same counts."""
+        if not isinstance(other, Stats):
+            return False
+        return self.files == other.files and self.counts == other.counts and self.errors == other.errors
+
+
+def _get_result(item: Dict[str, Any]) -> str:
+    result = (item.get('objective-status') or {}).get('result') or {}
+    return result.get(VALUE_KEY, UNKNOWN)
+
+
+def collect_file(file_path: str) -> Stats:
+    """Collect the statistics of a single OSCAL file, or record its error if it cannot be read or counted.
+
+    This is a module level function so that it can be run in a worker process.
+    """
+    stats = Stats()
+    try:
+        stats.add_data(fs.load_file(file_path))
+    except Exception as e:
+        error = f'{e.__class__.__name__}: {e}'
+        logger.warning(f'Cannot count {file_path}: {error}')
+        return Stats(errors={file_path: error})
+    return stats
+
+
+def collect_files(files: Iterable[pathlib.Path], jobs: int = 1) -> Stats:
+    """Collect and merge the statistics of files, in a process pool if there are several jobs."""
+    paths: List[str] = [str(f) for f in files]
+    stats = Stats()
+    if jobs <= 1 or len(paths) <= 1:
+        for path in paths:
+            stats.merge(collect_file(path))
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as executor:
+            for future in as_completed([executor.submit(collect_file, path) for path in paths]):
+                stats.merge(future.result())
+    return stats
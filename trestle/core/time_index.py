@@ -0,0 +1,191 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Index of the timestamps of assessment results and plans of action and milestones.
+
+The timestamps are the collection and expiry times of findings and POA&M items, the times of tracking entries and the
+start and end of assessment results. Observations have no time of their own, so they are indexed at the collection
+time of the finding or POA&M item holding them. The index is sorted by time, so that range queries such as "the
+observations collected in the last 7 days" are two binary searches.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from pydantic import BaseModel
+from pydantic.datetime_parse import parse_datetime
+
+from trestle.core import utils
+from trestle.core.err import TrestleError
+from trestle.core.traversal import join_path, traverse
+
+# Fields holding a timestamp, by field name, with their aliases.
+TIME_FIELDS = {
+    'collected': 'collected',
+    'expires': 'expires',
+    'date_time_stamp': 'date-time-stamp',
+    'start': 'start',
+    'end': 'end',
+}
+
+# Field of the time at which the observations of an element are indexed.
+OBSERVATION_TIME_FIELD = 'collected'
+
+_DURATION_PATTERN = re.compile(r'^(\d+)([dhm])$')
+_DURATION_UNITS = {'d': 'days', 'h': 'hours', 'm': 'minutes'}
+
+
+class TimedElement(NamedTuple):
+    """A timestamp of an element of a model."""
+
+    time: datetime
+    field: str
+    path: str
+    element_type: str
+    uuid: Optional[str]
+
+
+def to_timestamp(time: datetime) -> float:
+    """Return the POSIX timestamp of a time, taking times without timezone as UTC."""
+    if time.tzinfo is None:
+        time = time.replace(tzinfo=timezone.utc)
+    return time.timestamp()
+
+
+def parse_time(value: str, now: Optional[datetime] = None) -> datetime:
+    """Parse an ISO 8601 time or a duration before now such as `7d`, `12h` or `30m`."""
+    match = _DURATION_PATTERN.match(value)
+    if match is not None:
+        now = now or datetime.now(timezone.utc)
+        return now - timedelta(**{_DURATION_UNITS[match.group(2)]: int(match.group(1))})
+    try:
+        return parse_datetime(value)
+    except (TypeError, ValueError):
+        raise TrestleError(f'Invalid time "{value}": expected an ISO 8601 time or a duration such as "7d"')
+
+
+def get_times(value: BaseModel, path: str) -> List[TimedElement]:
+    """Return the timestamps of an element at a path, and of its observations if it has a collection time."""
+    fields = [field for field in TIME_FIELDS if field in value.__fields_set__]
+    if not fields:
+        return []
+
+    times = []
+    for field in fields:
+        time = utils.unwrap_root(getattr(value, field))
+        if isinstance(time, datetime):
+            times.append(TimedElement(time, TIME_FIELDS[field], path, value.__class__.__name__, _get_uuid(value)))
+    collected = utils.unwrap_root(getattr(value, OBSERVATION_TIME_FIELD, None))
+    if isinstance(collected, datetime):
+        for i, observation in enumerate(getattr(value, 'observations', None) or []):
+            observation_path = join_path(join_path(path, 'observations'), str(i))
+            times.append(
+                TimedElement(
+                    collected,
+                    OBSERVATION_TIME_FIELD,
+                    observation_path,
+                    observation.__class__.__name__,
+                    _get_uuid(observation)
+                )
+            )
+    return times
+
+
+def collect_times(model: Any, root_path: str = '') -> Iterator[TimedElement]:
+    """Yield the timestamps of every element of the model."""
+    for node in traverse(model, root_path):
+        if isinstance(node.value, BaseModel):
+            yield from get_times(node.value, node.path)
+
+
+def _get_uuid(value: BaseModel) -> Optional[str]:
+    uuid = utils.unwrap_root(getattr(value, 'uuid', None))
+    return None if uuid is None else str(uuid)
+
+
+class TimeIndex:
+    """Timestamps of the elements of a model, sorted by time.
+
+    The index is updated incrementally with `add`: timestamps already indexed, identified by element path and field,
+    are skipped unless their value changed, so adding a model again after results were appended to it only inserts the
+    new timestamps and replaces the changed ones.
+    """
+
+    def __init__(self, model: Any = None, root_path: str = ''):
+        """Initialize the index, with the timestamps of a model if given."""
+        self._timestamps: List[float] = []
+        self._elements: List[TimedElement] = []
+        self._keys: Dict[Tuple[str, str], TimedElement] = {}
+        if model is not None:
+            self.add(model, root_path)
+
+    def __len__(self) -> int:
+        """Return the number of indexed timestamps."""
+        return len(self._elements)
+
+    def add(self, model: Any, root_path: str = '') -> int:
+        """Index the timestamps of the model that are not indexed yet or changed and return their number."""
+        new = []
+        for element in collect_times(model, root_path):
+            key = (element.path, element.field)
+            indexed = self._keys.get(key)
+            if indexed == element:
+                continue
+            if indexed is not None:
+                self._remove(indexed)
+            self._keys[key] = element
+            new.append((to_timestamp(element.time), element))
+        if len(new) > len(self._elements):
+            # sorting everything is cheaper than many insertions into a short list
+            merged = sorted(list(zip(self._timestamps, self._elements)) + new, key=lambda item: item[0])
+            self._timestamps = [timestamp for timestamp, _ in merged]
+            self._elements = [element for _, element in merged]
+        else:
+            for timestamp, element in new:
+                position = bisect_right(self._timestamps, timestamp)
+                self._timestamps.insert(position, timestamp)
+                self._elements.insert(position, element)
+        return len(new)
+
+    def _remove(self, element: TimedElement) -> None:
+        """Remove an indexed timestamp, found by binary search among the timestamps of the same time."""
+        position = bisect_left(self._timestamps, to_timestamp(element.time))
+        while self._elements[position] is not element:
+            position += 1
+        del self._timestamps[position]
+        del self._elements[position]
+
+    def find(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        field: Optional[str] = None,
+        type_name: Optional[str] = None
+    ) -> List[TimedElement]:
+        """Return the timestamps from start (included) to end (excluded) by time, optionally of a field and type."""
+        low = 0 if start is None else bisect_left(self._timestamps, to_timestamp(start))
+        high = len(self._timestamps) if end is None else bisect_left(self._timestamps, to_timestamp(end))
+        return [
+            element for element in self._elements[low:high]
+            if (field is None or element.field == field) and (type_name is None or element.element_type == type_name)
+        ]
+
+    def get_range(self) -> Optional[Tuple[datetime, datetime]]:
+        """Return the earliest and latest indexed times, or None if the index is empty."""
+        if not self._elements:
+            return None
+        return self._elements[0].time, self._elements[-1].time
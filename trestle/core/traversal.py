@@ -0,0 +1,129 @@
+# -*- mode:python; coding:utf-8 -*-
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Traversal of OSCAL models and of the raw data they are parsed from.
+
+`traverse` is the single tree walker of trestle: it uses an explicit stack instead of recursion, so arbitrarily deep
+models (e.g. nested catalog parts) can be processed, and it yields nodes lazily together with their element path.
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from trestle.core import const
+
+_LEAF, _MODEL, _DICT, _SEQUENCE = range(4)
+
+# kind of the values of each type met during traversals, since isinstance checks dominate the traversal time
+_kinds: Dict[type, int] = {}
+
+
+class TraversalNode(NamedTuple):
+    """A node of the traversed tree.
+
+    `key` is the field name or alias, dict key or list index of the node within its parent, and None for the root.
+    `depth` counts the models and dicts above the node: list items share the depth of their list and the value of a
+    `__root__` field shares the depth of its model.
+    """
+
+    value: Any
+    key: Optional[Union[str, int]]
+    path: str
+    depth: int
+
+
+def traverse(
+    object_of_interest: Any,
+    root_path: str = '',
+    prune: Optional[Callable[[TraversalNode], bool]] = None,
+    use_aliases: bool = True,
+    track_paths: bool = True
+) -> Iterator[TraversalNode]:
+    """Iterate over every node of the object in pre-order.
+
+    Pydantic models, dicts, lists and tuples are descended into. Only fields that have been set on pydantic models are
+    traversed, None values are skipped, and `__root__` fields do not add a part to the path. If `prune` returns True for
+    a node, its children are not traversed. Element paths use field aliases unless `use_aliases` is False, in which
+    case field names are used for both the paths and the keys. Building the paths costs time and memory proportional to
+    the depth of each node, so callers that do not need them can set `track_paths` to False to get empty paths.
+    """
+    stack: List[TraversalNode] = [TraversalNode(object_of_interest, None, root_path, 0)]
+    while stack:
+        node = stack.pop()
+        yield node
+
+        if prune is not None and prune(node):
+            continue
+
+        value, path, depth = node.value, node.path, node.depth
+        kind = _get_kind(type(value))
+        if kind == _LEAF:
+            continue
+        if kind == _MODEL:
+            fields = value.__fields__
+            fields_set = value.__fields_set__
+            children = []
+            for name, child in value.__dict__.items():
+                if child is None or name not in fields_set:
+                    continue
+                if name == '__root__':
+                    children.append(TraversalNode(child, name, path, depth))
+                else:
+                    key = fields[name].alias if use_aliases else name
+                    children.append(TraversalNode(child, key, join_path(path, key) if track_paths else '', depth + 1))
+        elif kind == _DICT:
+            children = [
+                TraversalNode(child, key, join_path(path, str(key)) if track_paths else '', depth + 1) for key,
+                child in value.items() if child is not None
+            ]
+        else:
+            children = [
+                TraversalNode(child, i, join_path(path, str(i)) if track_paths else '', depth) for i,
+                child in enumerate(value) if child is not None
+            ]
+
+        # push in reverse so that children are visited in their natural order
+        stack.extend(reversed(children))
+
+
+def walk(object_of_interest: Any,
+         root_path: str = '',
+         prune: Optional[Callable[[TraversalNode], bool]] = None) -> Iterator[Tuple[Any, str]]:
+    """Iterate over every node of the object in pre-order, yielding the node and its element path."""
+    for node in traverse(object_of_interest, root_path, prune):
+        yield node.value, node.path
+
+
+def _get_kind(value_type: type) -> int:
+    """Return whether values of the type are models, dicts, sequences or leaves, caching the answer per type."""
+    kind = _kinds.get(value_type)
+    if kind is None:
+        if issubclass(value_type, BaseModel):
+            kind = _MODEL
+        elif issubclass(value_type, dict):
+            kind = _DICT
+        elif issubclass(value_type, (list, tuple)):
+            kind = _SEQUENCE
+        else:
+            kind = _LEAF
+        _kinds[value_type] = kind
+    return kind
+
+
+def join_path(path: str, part: str) -> str:
+    """Append a part to a dot separated element path."""
+    if path == '':
+        return part
+    return f'{path}{const.ALIAS_PATH_SEPARATOR}{part}'
@@ -15,7 +15,7 @@
 """Utilities for dealing with models."""
 import importlib
 import warnings
-from typing import Any, List, Tuple, Type, no_type_check
+from typing import Any, Iterator, List, Tuple, Type, no_type_check
 
 from datamodel_code_generator.parser.base import camel_to_snake, snake_to_upper_camel
 
@@ -23,6 +23,7 @@ from pydantic import BaseModel
 
 import trestle.core.const as const
 import trestle.core.err as err
+from trestle.core.traversal import traverse
 
 
 def get_elements_of_model_type(object_of_interest, type_of_interest):
@@ -30,22 +31,28 @@ def get_elements_of_model_type(object_of_interest, type_of_interest):
     Return a flat list of a given type of pydantic object based on a presumed encompasing root object.
 
     One warning. This object preserves the underlying object tree. So when you use this function do NOT recurse on the
-    results or you will end up with duplication errors.
+    results or you will end up with duplication errors. For repeated queries on the same model use the type index of
+    `trestle.core.models.elements.Element` instead.
     """
-    loi = []
-    if type(object_of_interest) == type_of_interest:
-        loi.append(object_of_interest)
-        # keep going
-    if type(object_of_interest) is list:
-        for item in object_of_interest:
-            loi.extend(get_elements_of_model_type(item, type_of_interest))
-
-    if isinstance(object_of_interest, BaseModel):
-        for field in object_of_interest.__fields_set__:
-            if field == '__root__':
-                continue
-            loi.extend(get_elements_of_model_type(getattr(object_of_interest, field), type_of_interest))
-    return loi
+    return list(iter_elements_of_model_type(object_of_interest, type_of_interest))
+
+
+def iter_elements_of_model_type(object_of_interest: Any, type_of_interest: Type[Any]) -> Iterator[Any]:
+    """Yield the objects of the given type within the object, without building a list.
+
+    Use this for one-off queries; `trestle.core.models.elements.TypeIndex` is better suited to repeated queries on the
+    same model.
+    """
+    for node in traverse(object_of_interest, track_paths=False):
+        if type(node.value) == type_of_interest:
+            yield node.value
+
+
+def unwrap_root(value: Any) -> Any:
+    """Return the value wrapped in a `__root__` model such as `PartyUuid`, or the value itself."""
+    while isinstance(value, BaseModel) and '__root__' in value.__fields__:
+        value = value.__root__
+    return value
 
 
 def classname_to_alias(classname: str, mode: str) -> str:
@@ -14,40 +14,34 @@
 # limitations under the License.
 """Utilities for dealing with models."""
 
+import datetime
+import pathlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
 import pydantic
 
+from trestle.core import const
+from trestle.core import utils
+from trestle.core.base_model import OscalBaseModel, model_digest
+from trestle.core.err import TrestleError
+from trestle.core.hash_verifier import HashVerifier, resolve_local_href
+from trestle.core.references import ReferenceIndex
+from trestle.core.traversal import traverse, walk
+
 
 def find_values_by_name_generic(object_of_interest, var_name):
-    """Traverse object and return list of the values in dicts, tuples associated with variable name."""
+    """Traverse object and return list of the values in dicts or model fields associated with variable name.
+
+    The values found are not traversed further.
+    """
     loe = []
-    # looking for a dict or 2-element tuple containing specified variable name
-    if type(object_of_interest) == dict:
-        for key, value in object_of_interest.items():
-            if (key == var_name) and value:
-                # found one so append its value to list
-                loe.append(value)
-            else:
-                new_list = find_values_by_name_generic(value, var_name)
-                if new_list:
-                    loe.extend(new_list)
-    elif type(object_of_interest) == tuple and len(object_of_interest) == 2 and object_of_interest[0] == var_name:
-        if object_of_interest[1]:
-            loe.append(object_of_interest[1])
-    elif type(object_of_interest) != str:
-        try:
-            # iterate over any iterable and recurse on its items
-            o_iter = iter(object_of_interest)
-        except Exception:
-            # it is not a dict and not iterable
-            pass
-        else:
-            next_item = next(o_iter, None)
-            while next_item is not None:
-                new_list = find_values_by_name_generic(next_item, var_name)
-                if new_list:
-                    loe.extend(new_list)
-                next_item = next(o_iter, None)
-            return loe
+    for node in traverse(object_of_interest,
+                         prune=lambda node: node.key == var_name,
+                         use_aliases=False,
+                         track_paths=False):
+        if node.key == var_name and node.value:
+            loe.append(node.value)
     return loe
 
 
@@ -58,64 +52,50 @@ def has_no_duplicate_values_generic(object_of_interest, var_name):
 
 
 def find_values_by_type(object_of_interest, type_of_interest):
-    """Traverse object and return list of values of specified type."""
-    loe = []
-    # looking for a dict or 2-element tuple containing specified variable name
-    if type(object_of_interest) == type_of_interest:
-        loe.append(object_of_interest)
-        return loe
-    if type(object_of_interest) == dict:
-        for value in object_of_interest.values():
-            new_list = find_values_by_type(value, type_of_interest)
-            if new_list:
-                loe.extend(new_list)
-    elif type(object_of_interest) != str:
-        try:
-            # iterate over any iterable and recurse on its items
-            o_iter = iter(object_of_interest)
-        except Exception:
-            # it is not a dict and not iterable
-            pass
-        else:
-            next_item = next(o_iter, None)
-            while next_item is not None:
-                new_list = find_values_by_type(next_item, type_of_interest)
-                if new_list:
-                    loe.extend(new_list)
-                next_item = next(o_iter, None)
-            return loe
-    return loe
+    """Traverse object and return list of values of specified type.
+
+    The values found are not traversed further.
+    """
+    return [
+        node.value
+        for node in
+        traverse(object_of_interest, prune=lambda node: type(node.value) is type_of_interest, track_paths=False)
+        if type(node.value) is type_of_interest
+    ]
 
 
 def has_no_duplicate_values_by_type(object_of_interest, type_of_interest):
     """Determine if duplicate values of type exist in object."""
-    loe = find_values_by_type(object_of_interest, type_of_interest)
-    n = len(loe)
-    if n > 1:
-        for i in range(n - 1):
-            for j in range(i + 1, n):
-                if loe[i] == loe[j]:
-                    return False
-    return True
+    return not find_duplicate_values_by_type(object_of_interest, type_of_interest)
+
+
+def find_duplicate_values_by_type(object_of_interest, type_of_interest) -> List[List[str]]:
+    """Return the element paths of values of specified type that have identical content.
+
+    Values are grouped by their structural fingerprint, so this is linear in the size of the object. As in
+    `find_values_by_type`, the values found are not traversed further, so values nested in a value of the same type are
+    not compared. Each returned group contains the paths of two or more equal values.
+    """
+    root = ''
+    if isinstance(object_of_interest, OscalBaseModel):
+        root = utils.classname_to_alias(object_of_interest.__class__.__name__, 'json')
+
+    paths_by_digest: Dict[bytes, List[str]] = {}
+    for node in traverse(object_of_interest, root, prune=lambda node: type(node.value) is type_of_interest):
+        if type(node.value) is type_of_interest:
+            paths_by_digest.setdefault(model_digest(node.value), []).append(node.path)
+
+    return [paths for paths in paths_by_digest.values() if len(paths) > 1]
 
 
 def find_values_by_name(object_of_interest, name_of_interest):
     """Traverse object and return list of values of specified name."""
     loe = []
-    if isinstance(object_of_interest, pydantic.BaseModel):
-        value = getattr(object_of_interest, name_of_interest, None)
-        if value is not None:
-            loe.append(value)
-        fields = getattr(object_of_interest, '__fields_set__', None)
-        if fields is not None:
-            for field in fields:
-                loe.extend(find_values_by_name(getattr(object_of_interest, field, None), name_of_interest))
-    elif type(object_of_interest) is list:
-        for item in object_of_interest:
-            loe.extend(find_values_by_name(item, name_of_interest))
-    elif type(object_of_interest) is dict:
-        for item in object_of_interest.values():
-            loe.extend(find_values_by_name(item, name_of_interest))
+    for node in traverse(object_of_interest, track_paths=False):
+        if isinstance(node.value, pydantic.BaseModel):
+            value = getattr(node.value, name_of_interest, None)
+            if value is not None:
+                loe.append(value)
     return loe
 
 
@@ -123,3 +103,259 @@ def has_no_duplicate_values_by_name(object_of_interest, name_of_interest):
     """Determine if duplicate values of type exist in object."""
     loe = find_values_by_name(object_of_interest, name_of_interest)
     return len(loe) == len(set(loe))
+
+
+class Violation:
+    """A single problem found by a validation rule, with the element paths involved."""
+
+    def __init__(self, rule: str, message: str, paths: Optional[List[str]] = None):
+        """Initialize a violation."""
+        self.rule = rule
+        self.message = message
+        self.paths: List[str] = paths if paths is not None else []
+
+    def __str__(self):
+        """Return string representation of the violation."""
+        if self.paths:
+            return f'[{self.rule}] {self.message} at {", ".join(self.paths)}'
+        return f'[{self.rule}] {self.message}'
+
+    def __eq__(self, other):
+        """Check that two violations are equal."""
+        if not isinstance(other, Violation):
+            return False
+        return self.__dict__ == other.__dict__
+
+
+class ValidationRule(ABC):
+    """Rule that is applied to every node visited by the ValidationEngine.
+
+    Rules are stateful for the duration of one traversal: the engine calls reset() before the walk, visit() for every
+    node and finish() once the walk is complete.
+    """
+
+    def __init__(self, name: str):
+        """Initialize a rule."""
+        self._name = name
+        self._violations: List[Violation] = []
+
+    def get_name(self) -> str:
+        """Return the name of the rule."""
+        return self._name
+
+    def reset(self) -> None:
+        """Clear the state collected during a previous traversal."""
+        self._violations = []
+
+    def add_violation(self, message: str, paths: Optional[List[str]] = None) -> None:
+        """Record a violation found by this rule."""
+        self._violations.append(Violation(self._name, message, paths))
+
+    def get_violations(self) -> List[Violation]:
+        """Return the violations found during the last traversal."""
+        return self._violations
+
+    @abstractmethod
+    def visit(self, node: Any, path: str) -> None:
+        """Inspect a node of the model located at the element path."""
+
+    def finish(self) -> None:
+        """Complete the checks that need the whole model to have been visited.
+
+        This is deliberately a no-op hook rather than an abstract method, since most rules report their violations
+        while visiting the nodes and do not need to override it.
+        """
+        return
+
+    def __str__(self):
+        """Return string representation of the rule."""
+        return self._name
+
+
+class DuplicateValuesRule(ValidationRule):
+    """Report values of a named field that occur more than once in the model."""
+
+    def __init__(self, name_of_interest: str):
+        """Initialize the rule for a field name such as `uuid` or `id`."""
+        super().__init__(f'{const.VAL_MODE_DUPLICATES}:{name_of_interest}')
+        # accept both oscal aliases and python field names
+        self._field_name = name_of_interest.replace('-', '_')
+        self._seen: Dict[Any, List[str]] = {}
+
+    def reset(self) -> None:
+        """Clear the state collected during a previous traversal."""
+        super().reset()
+        self._seen = {}
+
+    def visit(self, node: Any, path: str) -> None:
+        """Record the value of the field if the node is a model having it."""
+        if not isinstance(node, pydantic.BaseModel):
+            return
+        value = getattr(node, self._field_name, None)
+        if value is None:
+            return
+        value = utils.unwrap_root(value)
+        try:
+            self._seen.setdefault(value, []).append(path)
+        except TypeError:
+            # unhashable values cannot be identifiers
+            pass
+
+    def finish(self) -> None:
+        """Report every value seen more than once."""
+        for value, paths in self._seen.items():
+            if len(paths) > 1:
+                self.add_violation(f'Duplicate value "{value}" of item {self._field_name}', paths)
+
+
+class TimezoneAwareRule(ValidationRule):
+    """Report datetime values that do not carry a timezone."""
+
+    def __init__(self):
+        """Initialize the rule."""
+        super().__init__(const.VAL_MODE_TIMEZONE)
+
+    def visit(self, node: Any, path: str) -> None:
+        """Check that a datetime node is timezone aware."""
+        if isinstance(node, datetime.datetime) and (node.tzinfo is None or node.utcoffset() is None):
+            self.add_violation(f'Datetime "{node}" has no timezone', [path])
+
+
+class ReferenceIntegrityRule(ValidationRule):
+    """Report cross references that do not resolve to a definition, or definitions that are never referenced.
+
+    The definitions and references are collected into a `ReferenceIndex` during the traversal.
+    """
+
+    def __init__(self, name: str = const.VAL_MODE_REFERENCES, dangling: bool = True, unused: bool = False):
+        """Initialize the rule, choosing whether dangling references and/or unused definitions are reported."""
+        super().__init__(name)
+        self._dangling = dangling
+        self._unused = unused
+        self._index = ReferenceIndex()
+
+    def reset(self) -> None:
+        """Clear the state collected during a previous traversal."""
+        super().reset()
+        self._index = ReferenceIndex()
+
+    def visit(self, node: Any, path: str) -> None:
+        """Collect definitions and references of the node."""
+        self._index.visit(node, path)
+
+    def finish(self) -> None:
+        """Report the dangling references and/or unused definitions."""
+        if self._dangling:
+            for kind, identifier, paths in self._index.get_dangling_references():
+                self.add_violation(f'Reference to {kind} "{identifier}" is not defined in the model', paths)
+        if self._unused:
+            for kind, identifier, paths in self._index.get_unused_definitions():
+                self.add_violation(f'Definition of {kind} "{identifier}" is never referenced', paths)
+
+
+class HashIntegrityRule(ValidationRule):
+    """Report rlinks to local files whose content does not match the hashes of the rlink.
+
+    Links to remote resources are not verified. The files are hashed by a `HashVerifier` once the model is visited.
+    """
+
+    def __init__(self, base_dir: Optional[pathlib.Path] = None, verifier: Optional[HashVerifier] = None):
+        """Initialize the rule with the directory relative links are resolved against, the current one by default."""
+        super().__init__(const.VAL_MODE_HASHES)
+        self._base_dir = pathlib.Path(base_dir) if base_dir is not None else pathlib.Path.cwd()
+        self._verifier = verifier if verifier is not None else HashVerifier()
+        self._expected: List[Tuple[pathlib.Path, str, str, str]] = []
+
+    def reset(self) -> None:
+        """Clear the state collected during a previous traversal."""
+        super().reset()
+        self._expected = []
+
+    def visit(self, node: Any, path: str) -> None:
+        """Collect the hashes of an rlink to a local file."""
+        if type(node).__name__ != 'Rlink' or not node.hashes:
+            return
+        file_path = resolve_local_href(node.href, self._base_dir)
+        if file_path is None:
+            return
+        for hash_ in node.hashes:
+            self._expected.append((file_path, hash_.algorithm, hash_.value, path))
+
+    def finish(self) -> None:
+        """Hash the linked files and report the mismatches."""
+        paths_by_hash: Dict[Tuple[pathlib.Path, str, str], List[str]] = {}
+        for file_path, algorithm, value, path in self._expected:
+            paths_by_hash.setdefault((file_path, algorithm, value), []).append(path)
+        for mismatch in self._verifier.verify(paths_by_hash):
+            self.add_violation(str(mismatch), paths_by_hash[(mismatch.path, mismatch.algorithm, mismatch.expected)])
+
+
+class ValidationEngine:
+    """Apply any number of validation rules to a model in a single traversal."""
+
+    def __init__(self, rules: Optional[List[ValidationRule]] = None):
+        """Initialize the engine with an optional list of rules."""
+        self._rules: List[ValidationRule] = []
+        if rules is not None:
+            for rule in rules:
+                self.add_rule(rule)
+
+    def add_rule(self, rule: ValidationRule) -> 'ValidationEngine':
+        """Register a rule; it returns the engine itself so that calls can be chained."""
+        if not isinstance(rule, ValidationRule):
+            raise TrestleError(f'Rule must be of type ValidationRule, found {rule.__class__}')
+        self._rules.append(rule)
+        return self
+
+    def get_rules(self) -> List[ValidationRule]:
+        """Return the registered rules."""
+        return self._rules
+
+    def validate(self, object_of_interest: Any) -> List[Violation]:
+        """Walk the object once, visiting every node with every rule, and return all violations."""
+        for rule in self._rules:
+            rule.reset()
+
+        root = ''
+        if isinstance(object_of_interest, OscalBaseModel):
+            root = utils.classname_to_alias(object_of_interest.__class__.__name__, 'json')
+
+        for node, path in walk(object_of_interest, root):
+            for rule in self._rules:
+                rule.visit(node, path)
+
+        violations: List[Violation] = []
+        for rule in self._rules:
+            rule.finish()
+            violations.extend(rule.get_violations())
+        return violations
+
+
+def create_rules(
+    modes: List[str],
+    items: Optional[List[str]] = None,
+    base_dir: Optional[pathlib.Path] = None,
+    verifier: Optional[HashVerifier] = None
+) -> List[ValidationRule]:
+    """Create the validation rules for the given validation modes.
+
+    The `duplicates` mode creates one rule per item name. The `hashes` mode resolves relative links against the base
+    directory, and hashes the linked files with the verifier if one is given.
+    """
+    rules: List[ValidationRule] = []
+    for mode in modes:
+        if mode == const.VAL_MODE_DUPLICATES:
+            if not items:
+                raise TrestleError(f'Mode "{mode}" requires at least one item')
+            rules.extend(DuplicateValuesRule(item) for item in items)
+        elif mode == const.VAL_MODE_TIMEZONE:
+            rules.append(TimezoneAwareRule())
+        elif mode == const.VAL_MODE_REFERENCES:
+            rules.append(ReferenceIntegrityRule())
+        elif mode == const.VAL_MODE_UNUSED:
+            rules.append(ReferenceIntegrityRule(const.VAL_MODE_UNUSED, dangling=False, unused=True))
+        elif mode == const.VAL_MODE_HASHES:
+            rules.append(HashIntegrityRule(base_dir, verifier))
+        else:
+            raise TrestleError(f'Mode value "{mode}" is not recognized.')
+    return rules
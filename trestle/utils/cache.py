@@ -0,0 +1,109 @@
+# -*- mode:python; coding:utf-8 -*-
+
+# Copyright (c) 2020 IBM Corp. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Content addressed cache stored on the file system."""
+
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import tempfile
+from typing import Any, Dict, Optional
+
+from trestle.core.err import TrestleError
+
+logger = logging.getLogger(__name__)
+
+# size of the chunks read when hashing files
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(file_path: pathlib.Path) -> str:
+    """Return the sha256 hex digest of the content of a file."""
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as fp:
+        for chunk in iter(lambda: fp.read(HASH_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def make_key(*parts: str) -> str:
+    """Combine several strings into a single cache key."""
+    hasher = hashlib.sha256()
+    for part in parts:
+        encoded = part.encode('utf8')
+        hasher.update(b'%d:' % len(encoded))
+        hasher.update(encoded)
+    return hasher.hexdigest()
+
+
+class DiskCache:
+    """Cache of JSON serializable values stored in a directory.
+
+    Entries are stored as `<cache_dir>/<namespace>/<key[:2]>/<key>.json`. Nothing in the directory depends on the
+    machine or the location of the project, so that it can be persisted and restored between CI runs.
+    """
+
+    def __init__(self, cache_dir: pathlib.Path, namespace: str):
+        """Initialize a cache for the namespace under the cache directory."""
+        if not namespace or os.sep in namespace:
+            raise TrestleError(f'Invalid cache namespace "{namespace}"')
+
+        self._dir = pathlib.Path(cache_dir) / namespace
+        self._hits = 0
+        self._misses = 0
+
+    def get_dir(self) -> pathlib.Path:
+        """Return the directory of the cache namespace."""
+        return self._dir
+
+    def _entry_path(self, key: str) -> pathlib.Path:
+        return self._dir / key[:2] / f'{key}.json'
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the value stored for the key or None, and count the hit or miss."""
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'r', encoding='utf8') as fp:
+                value = json.load(fp)
+        except (OSError, ValueError):
+            # a missing or corrupted entry is a miss
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store the value for the key.
+
+        The entry is written to a temporary file first and then moved in place, so concurrent readers never see a
+        partial entry.
+        """
+        entry_path = self._entry_path(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=entry_path.parent, prefix='.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf8') as fp:
+                json.dump(value, fp)
+            os.replace(tmp_name, entry_path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return the number of hits and misses since the cache was created."""
+        return {'hits': self._hits, 'misses': self._misses}
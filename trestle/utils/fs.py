@@ -19,7 +19,7 @@ import json
 import logging
 import os
 import pathlib
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple, Type
 
 from pydantic import create_model
 
@@ -28,6 +28,7 @@ from trestle.core import err
 from trestle.core import utils
 from trestle.core.base_model import OscalBaseModel
 from trestle.core.err import TrestleError
+from trestle.core.traversal import traverse
 
 import yaml
 
@@ -257,7 +258,7 @@ def load_file(file_name: str):
     _, file_extension = os.path.splitext(file_name)
 
     with open(file_name) as f:
-        if file_extension == '.yaml':
+        if file_extension in ['.yaml', '.yml']:
             return yaml.load(f, yaml.FullLoader)
         elif file_extension == '.json':
             return json.load(f)
@@ -265,22 +266,90 @@ def load_file(file_name: str):
             raise TrestleError(f'Invalid file extension "{file_extension}"')
 
 
-def find_node(data: dict, key: str, depth: int = 0, max_depth: int = 1, instance_type: type = list):
-    """Find a node of an instance_type in the data recursively."""
-    if depth > max_depth:
-        return
+def get_root_model_by_alias(root_alias: str) -> Tuple[Type[OscalBaseModel], str]:
+    """Get the root model class and its project directory name (e.g. `catalogs`) based on the root alias."""
+    for model_dir, module_name in const.MODELTYPE_TO_MODELMODULE.items():
+        model_type, model_alias = utils.get_root_model(module_name)
+        if root_alias == model_alias:
+            return model_type, model_dir
+
+    raise err.TrestleError(f'{root_alias} is an invalid root model alias.')
+
+
+def get_root_alias(data: dict) -> str:
+    """Get the root model alias of the content of an OSCAL file, e.g. `catalog`."""
+    if not isinstance(data, dict) or len(data) != 1:
+        raise err.TrestleError('OSCAL content must have a single root key')
+
+    return next(iter(data))
+
+
+def is_model_file(path: pathlib.Path) -> bool:
+    """Check if the path is a JSON or YAML file that can hold an OSCAL model."""
+    return path.is_file() and path.suffix in const.MODEL_FILE_EXTENSIONS and not should_ignore(path.name)
+
+
+def get_project_model_files(project_root: pathlib.Path, split: bool = False) -> List[pathlib.Path]:
+    """Get the root files of all models in a trestle project.
+
+    These are the files directly in each model directory (e.g. `catalogs/mycatalog/catalog.json`) and the assembled
+    models under `dist`. Files of split sub-elements (e.g. `catalogs/mycatalog/catalog/metadata.json`) are only included
+    if split is True, after the root file of their model.
+    """
+    model_files: List[pathlib.Path] = []
+    for model_dir in const.MODELTYPE_TO_MODELMODULE.keys():
+        models_path = project_root / model_dir
+        if models_path.is_dir():
+            for model_path in sorted(models_path.iterdir()):
+                if model_path.is_dir() and not should_ignore(model_path.name):
+                    model_files.extend(f for f in sorted(model_path.iterdir()) if is_model_file(f))
+                    if split:
+                        for f in sorted(model_path.rglob('*')):
+                            parts = f.relative_to(model_path).parts
+                            if len(parts) > 1 and is_model_file(f) and not any(should_ignore(p) for p in parts):
+                                model_files.append(f)
+
+        dist_path = project_root / const.TRESTLE_DIST_DIR / model_dir
+        if dist_path.is_dir():
+            model_files.extend(f for f in sorted(dist_path.iterdir()) if is_model_file(f))
+
+    return model_files
+
+
+def get_model_file_element_path(path: pathlib.Path) -> Optional[str]:
+    """Get the element path of the content of a file in a trestle model directory, e.g. `catalog.groups.1`.
+
+    The path is derived from the directory structure written by split, where list items are prefixed by their index
+    (`catalog/groups/00001__group.json`) and dict items by their key. Return None if the file is not in a model
+    directory.
+    """
+    path = pathlib.Path(path).absolute()
+    if not is_valid_project_model_path(path):
+        return None
 
-    if key in data and isinstance(data[key], instance_type):
-        yield data[key]
+    relative_path = path.relative_to(get_trestle_project_root(path))
+    if len(relative_path.parts) < 3:
+        return None
 
-    for _, v in data.items():
-        if isinstance(v, dict):
-            for i in find_node(v, key, depth + 1, max_depth, instance_type):
-                yield i
-        elif isinstance(v, list):
-            for item in v:
-                for i in find_node(item, key, depth + 1, max_depth, instance_type):
-                    yield i
+    element_path = []
+    for part in relative_path.parts[2:]:
+        name = pathlib.Path(part).with_suffix('').name if part == relative_path.name else part
+        prefix, sep, _ = name.partition(const.IDX_SEP)
+        if sep and prefix.isdigit() and len(prefix) == const.FILE_DIGIT_PREFIX_LENGTH:
+            element_path.append(str(int(prefix)))
+        else:
+            element_path.append(prefix)
+    return '.'.join(element_path)
+
+
+def find_node(data: dict, key: str, depth: int = 0, max_depth: int = 1, instance_type: type = list):
+    """Find the nodes of an instance_type under the key in the data, in pre-order.
+
+    Only the dicts up to max_depth levels below the data (at the given depth) are searched for the key.
+    """
+    for node in traverse(data, prune=lambda node: depth + node.depth > max_depth, track_paths=False):
+        if node.key == key and depth + node.depth - 1 <= max_depth and isinstance(node.value, instance_type):
+            yield node.value
 
 
 def get_singular_alias(alias_path: str, contextual_mode: bool = False) -> str:
@@ -308,21 +377,9 @@ def get_singular_alias(alias_path: str, contextual_mode: bool = False) -> str:
     if len(path_parts) < 2:
         raise err.TrestleError('Invalid jsonpath.')
 
-    model_types = []
-
-    root_model_alias = path_parts[0]
-    found = False
-    for module_name in const.MODELTYPE_TO_MODELMODULE.values():
-        model_type, model_alias = utils.get_root_model(module_name)
-        if root_model_alias == model_alias:
-            found = True
-            model_types.append(model_type)
-            break
-
-    if not found:
-        raise err.TrestleError(f'{root_model_alias} is an invalid root model alias.')
+    model_type, _ = get_root_model_by_alias(path_parts[0])
+    model_types = [model_type]
 
-    model_type = model_types[0]
     for i in range(1, len(path_parts)):
         if utils.is_collection_field_type(model_type):
             model_type = utils.get_inner_type(model_type)